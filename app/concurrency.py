@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.config import settings
+from app.db import init_pool_thread
+from app.profiling import profiled_call
+
+T = TypeVar("T")
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def _executor(name: str) -> ThreadPoolExecutor:
+    executor = _executors.get(name)
+    if executor is not None:
+        return executor
+    with _lock:
+        executor = _executors.get(name)
+        if executor is None:
+            if name == "sqlite":
+                executor = ThreadPoolExecutor(
+                    max_workers=settings.db_pool_size,
+                    thread_name_prefix="sqlite",
+                    initializer=init_pool_thread,
+                )
+            else:
+                executor = ThreadPoolExecutor(max_workers=settings.io_pool_size, thread_name_prefix=name)
+            _executors[name] = executor
+    return executor
+
+
+async def _run_in(name: str, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, profiled_call, func, *args, **kwargs)
+    return await loop.run_in_executor(_executor(name), call)
+
+
+async def run_db(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Ejecuta acceso a SQLite en el pool dedicado (conexiones reutilizadas por hilo)."""
+    return await _run_in("sqlite", func, *args, **kwargs)
+
+
+async def run_io(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Ejecuta trabajo bloqueante de filesystem/imágenes fuera del event loop."""
+    return await _run_in("static-io", func, *args, **kwargs)
+
+
+def shutdown_executors() -> None:
+    with _lock:
+        for executor in _executors.values():
+            executor.shutdown(wait=False, cancel_futures=True)
+        _executors.clear()
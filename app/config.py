@@ -4,9 +4,37 @@ import os
 from dataclasses import dataclass
 from pathlib import Path
 
-from dotenv import load_dotenv
+ROOT = Path(__file__).resolve().parents[1]
 
-load_dotenv()
+
+def _parse_env_line(line: str) -> tuple[str, str] | None:
+    line = line.strip()
+    if not line or line.startswith("#") or "=" not in line:
+        return None
+    key, _, value = line.removeprefix("export ").partition("=")
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        value = value[1:-1]
+    elif " #" in value:
+        value = value.split(" #", 1)[0].rstrip()
+    return key.strip(), value
+
+
+def load_env_file() -> None:
+    """Carga `.env` (raíz del repo y luego cwd) sin pisar variables ya definidas.
+
+    Lector mínimo KEY=VALUE en lugar de python-dotenv para no sumar ese import al arranque de los workers.
+    """
+    for path in dict.fromkeys((ROOT / ".env", Path.cwd() / ".env")):
+        if not path.is_file():
+            continue
+        for line in path.read_text(encoding="utf-8").splitlines():
+            parsed = _parse_env_line(line)
+            if parsed and parsed[0]:
+                os.environ.setdefault(*parsed)
+
+
+load_env_file()
 
 
 @dataclass
@@ -17,6 +45,24 @@ class Settings:
     db_path: str = os.getenv("DB_PATH", "data/indoor.db")
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     openai_model: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    app_env: str = os.getenv("APP_ENV", "development")
+    template_cache_dir: str = os.getenv("TEMPLATE_CACHE_DIR", "data/template_cache")
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "8"))
+    io_pool_size: int = int(os.getenv("IO_POOL_SIZE", "8"))
+    fragment_cache_size: int = int(os.getenv("FRAGMENT_CACHE_SIZE", "5000"))
+    server_timing_sample_rate: float = float(os.getenv("SERVER_TIMING_SAMPLE_RATE", "0.1"))
+    metrics_dir: str = os.getenv("METRICS_DIR", "data/metrics")
+    image_exists_cache_ttl: float = float(os.getenv("IMAGE_EXISTS_CACHE_TTL", "5"))
+    profiling_token: str = os.getenv("PROFILING_TOKEN", "")
+    profiles_dir: str = os.getenv("PROFILES_DIR", "data/profiles")
+    api_cache_size: int = int(os.getenv("API_CACHE_SIZE", "512"))
+    api_batch_max_ids: int = int(os.getenv("API_BATCH_MAX_IDS", "50"))
+    suggest_recheck_ms: float = float(os.getenv("SUGGEST_RECHECK_MS", "500"))
+    warmup_enabled: bool = os.getenv("WARMUP_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+
+    @property
+    def is_production(self) -> bool:
+        return self.app_env.strip().lower() == "production"
 
 
 settings = Settings()
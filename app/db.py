@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
+import time
 from contextlib import contextmanager
 
 from app.config import ensure_dirs, settings
+from app.metrics import SQLITE_QUERY_DURATION
+from app.text import fold_key_sql
+from app.timing import phase
 
 SCHEMA_SQL = """
 CREATE TABLE IF NOT EXISTS stages (
@@ -12,7 +17,9 @@ CREATE TABLE IF NOT EXISTS stages (
     order_index INTEGER NOT NULL,
     image_card_1 TEXT,
     image_card_2 TEXT,
-    image_hero TEXT
+    image_hero TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
 );
 CREATE INDEX IF NOT EXISTS idx_stages_order_index ON stages(order_index);
 
@@ -24,9 +31,12 @@ CREATE TABLE IF NOT EXISTS tutorial_steps (
     tools_json TEXT NOT NULL DEFAULT '[]',
     estimated_cost_usd REAL,
     image TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
     FOREIGN KEY(stage_id) REFERENCES stages(id) ON DELETE CASCADE
 );
 CREATE INDEX IF NOT EXISTS idx_tutorial_steps_stage_id ON tutorial_steps(stage_id);
+CREATE INDEX IF NOT EXISTS idx_tutorial_steps_title ON tutorial_steps(title);
 
 CREATE TABLE IF NOT EXISTS products (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -35,9 +45,13 @@ CREATE TABLE IF NOT EXISTS products (
     price REAL NOT NULL,
     affiliate_url TEXT NOT NULL,
     internal_product INTEGER NOT NULL DEFAULT 0,
-    image TEXT
+    image TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
 );
-CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
+-- (category, name) cubre también los filtros por category: el índice de una sola columna sobraba.
+DROP INDEX IF EXISTS idx_products_category;
+CREATE INDEX IF NOT EXISTS idx_products_category_name ON products(category, name);
 
 CREATE TABLE IF NOT EXISTS kits (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -46,23 +60,317 @@ CREATE TABLE IF NOT EXISTS kits (
     price REAL NOT NULL,
     components_json TEXT NOT NULL DEFAULT '[]',
     image_card TEXT,
-    image_result TEXT
+    image_result TEXT,
+    created_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    updated_at TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+CREATE INDEX IF NOT EXISTS idx_kits_name ON kits(name);
+
+CREATE TABLE IF NOT EXISTS stage_summary (
+    stage_id INTEGER PRIMARY KEY,
+    step_count INTEGER NOT NULL DEFAULT 0,
+    total_cost_usd REAL NOT NULL DEFAULT 0,
+    updated_at TEXT NOT NULL,
+    FOREIGN KEY(stage_id) REFERENCES stages(id) ON DELETE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS step_tools (
+    step_id INTEGER NOT NULL,
+    tool TEXT NOT NULL COLLATE NOCASE,
+    tool_key TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (step_id, tool),
+    FOREIGN KEY(step_id) REFERENCES tutorial_steps(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_step_tools_tool ON step_tools(tool, step_id);
+
+CREATE TABLE IF NOT EXISTS kit_components (
+    kit_id INTEGER NOT NULL,
+    component TEXT NOT NULL COLLATE NOCASE,
+    component_key TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (kit_id, component),
+    FOREIGN KEY(kit_id) REFERENCES kits(id) ON DELETE CASCADE
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_kit_components_component ON kit_components(component, kit_id);
+
+CREATE TABLE IF NOT EXISTS tool_products (
+    tool_slug TEXT NOT NULL,
+    product_id INTEGER NOT NULL,
+    score REAL NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (tool_slug, product_id),
+    FOREIGN KEY(product_id) REFERENCES products(id) ON DELETE CASCADE
 );
+CREATE INDEX IF NOT EXISTS idx_tool_products_product ON tool_products(product_id);
+CREATE INDEX IF NOT EXISTS idx_tool_products_slug_position ON tool_products(tool_slug, position, product_id);
+
+CREATE TABLE IF NOT EXISTS change_log (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    entity TEXT NOT NULL,
+    entity_id INTEGER NOT NULL,
+    op TEXT NOT NULL CHECK (op IN ('insert', 'update', 'delete')),
+    changed_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS catalog_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_state(id, version) VALUES (1, 0);
 """
 
+CATALOG_TABLES = ("stages", "tutorial_steps", "products", "kits")
+
+# `s.*` se expande al crear la vista: se recrea en cada init para incluir columnas agregadas después.
+STAGES_VIEW_SQL = """
+DROP VIEW IF EXISTS stages_with_summary;
+-- Lectura de etapas con su resumen: un LEFT JOIN por PK, sin consulta extra.
+CREATE VIEW stages_with_summary AS
+SELECT s.*,
+       COALESCE(ss.step_count, 0) AS step_count,
+       ROUND(COALESCE(ss.total_cost_usd, 0), 2) AS total_cost_usd,
+       ss.updated_at AS summary_updated_at
+FROM stages s LEFT JOIN stage_summary ss ON ss.stage_id = s.id;
+"""
+
+# Cualquier escritura al catálogo incrementa catalog_state.version (usada por ETags y caches de la API).
+CATALOG_VERSION_TRIGGERS_SQL = "\n".join(
+    f"""
+CREATE TRIGGER IF NOT EXISTS trg_{table}_version_{event.lower()} AFTER {event} ON {table}
+BEGIN
+    UPDATE catalog_state SET version = version + 1 WHERE id = 1;
+END;"""
+    for table in CATALOG_TABLES
+    for event in ("INSERT", "UPDATE", "DELETE")
+)
+
+CHANGE_ENTITIES = {"stages": "stage", "tutorial_steps": "step", "products": "product", "kits": "kit"}
+
+
+def _change_tracking_sql(table: str, entity: str) -> str:
+    now = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+    log = "INSERT INTO change_log(entity, entity_id, op) VALUES ('{entity}', {row}.id, '{op}')"
+    return f"""
+CREATE TRIGGER IF NOT EXISTS trg_{table}_created AFTER INSERT ON {table}
+WHEN new.created_at IS NULL OR new.updated_at IS NULL
+BEGIN
+    UPDATE {table} SET created_at = COALESCE(created_at, {now}), updated_at = COALESCE(updated_at, {now}) WHERE id = new.id;
+END;
+DROP TRIGGER IF EXISTS trg_{table}_touch;
+CREATE TRIGGER trg_{table}_touch AFTER UPDATE ON {table}
+WHEN new.updated_at IS old.updated_at
+BEGIN
+    UPDATE {table} SET updated_at = CASE
+        WHEN new.updated_at IS NULL OR {now} > new.updated_at THEN {now}
+        ELSE strftime('%Y-%m-%dT%H:%M:%fZ', new.updated_at, '+0.001 seconds')
+    END WHERE id = new.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_{table}_log_insert AFTER INSERT ON {table}
+BEGIN
+    {log.format(entity=entity, row="new", op="insert")};
+END;
+CREATE TRIGGER IF NOT EXISTS trg_{table}_log_update AFTER UPDATE ON {table}
+WHEN old.updated_at IS NOT NULL AND new.updated_at IS NOT old.updated_at
+BEGIN
+    {log.format(entity=entity, row="new", op="update")};
+END;
+CREATE TRIGGER IF NOT EXISTS trg_{table}_log_delete AFTER DELETE ON {table}
+BEGIN
+    {log.format(entity=entity, row="old", op="delete")};
+END;"""
+
+
+# created_at/updated_at + change_log. Un UPDATE "de usuario" dispara `touch`, y el log se escribe
+# una sola vez, cuando cambia updated_at. `touch` hace updated_at estrictamente creciente por fila
+# (+1 ms si el reloj no avanzó), así dos UPDATE en el mismo milisegundo se registran los dos.
+CHANGE_TRACKING_SQL = "\n".join(_change_tracking_sql(table, entity) for table, entity in CHANGE_ENTITIES.items())
+
+
+# Índices FTS5 external-content: el texto vive en la tabla base y los triggers mantienen el índice.
+# `remove_diacritics 2` hace que "pasteurizacion" encuentre "pasteurización".
+FTS_TABLES = {
+    "steps_fts": ("tutorial_steps", ("title", "content", "tools_json")),
+    "products_fts": ("products", ("name", "category")),
+    "kits_fts": ("kits", ("name", "description", "components_json")),
+}
+
+
+def _fts_sql(fts: str, table: str, columns: tuple[str, ...]) -> str:
+    cols = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    return f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+    {cols}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS trg_{fts}_insert AFTER INSERT ON {table}
+BEGIN
+    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+END;
+CREATE TRIGGER IF NOT EXISTS trg_{fts}_delete AFTER DELETE ON {table}
+BEGIN
+    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+END;
+DROP TRIGGER IF EXISTS trg_{fts}_update;
+CREATE TRIGGER trg_{fts}_update AFTER UPDATE OF {cols} ON {table}
+BEGIN
+    INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_values});
+    INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_values});
+END;"""
+
+
+FTS_SQL = "\n".join(_fts_sql(fts, table, columns) for fts, (table, columns) in FTS_TABLES.items())
+
+
+# Tablas normalizadas de las columnas JSON (que se conservan por compatibilidad): (tabla, fk, valor, origen, columna JSON).
+# Cada valor guarda además `<valor>_key` = fold_key(valor) para filtrar por prefijo sin depender de NOCASE (solo ASCII).
+JSON_LIST_TABLES = (
+    ("step_tools", "step_id", "tool", "tutorial_steps", "tools_json"),
+    ("kit_components", "kit_id", "component", "kits", "components_json"),
+)
+
+
+def _json_items_sql(row: str, column: str) -> str:
+    # JSON inválido se trata como lista vacía en vez de abortar la escritura.
+    return f"json_each(CASE WHEN json_valid({row}.{column}) THEN {row}.{column} ELSE '[]' END)"
+
+
+def _json_list_sql(table: str, fk: str, value: str, source: str, column: str) -> str:
+    insert = (
+        f"INSERT OR IGNORE INTO {table}({fk}, {value}, {value}_key) SELECT new.id, trim(value), {fold_key_sql('value')} "
+        f"FROM {_json_items_sql('new', column)} WHERE type = 'text' AND trim(value) != ''"
+    )
+    # Se recrean en cada init: bases previas tienen la versión sin `<valor>_key`.
+    return f"""
+CREATE INDEX IF NOT EXISTS idx_{table}_{value}_key ON {table}({value}_key, {fk});
+DROP TRIGGER IF EXISTS trg_{table}_insert;
+DROP TRIGGER IF EXISTS trg_{table}_update;
+CREATE TRIGGER trg_{table}_insert AFTER INSERT ON {source}
+BEGIN
+    {insert};
+END;
+CREATE TRIGGER trg_{table}_update AFTER UPDATE OF {column} ON {source}
+BEGIN
+    DELETE FROM {table} WHERE {fk} = old.id;
+    {insert};
+END;"""
+
+
+JSON_LIST_SQL = "\n".join(_json_list_sql(*spec) for spec in JSON_LIST_TABLES)
+
+
+def _backfill_json_list(conn: sqlite3.Connection, table: str, fk: str, value: str, source: str, column: str) -> None:
+    conn.execute(
+        f"""
+        INSERT OR IGNORE INTO {table}({fk}, {value}, {value}_key)
+        SELECT {source}.id, trim(item.value), {fold_key_sql('item.value')}
+        FROM {source}, {_json_items_sql(source, column)} AS item
+        WHERE item.type = 'text' AND trim(item.value) != ''
+        """
+    )
+
+
+_NOW_SQL = "strftime('%Y-%m-%dT%H:%M:%fZ', 'now')"
+
+
+def _summary_delta_sql(row: str, sign: str) -> str:
+    return f"""INSERT INTO stage_summary(stage_id, step_count, total_cost_usd, updated_at)
+    VALUES ({row}.stage_id, {sign}1, {sign}COALESCE({row}.estimated_cost_usd, 0), {_NOW_SQL})
+    ON CONFLICT(stage_id) DO UPDATE SET
+        step_count = step_count + excluded.step_count,
+        total_cost_usd = total_cost_usd + excluded.total_cost_usd,
+        updated_at = excluded.updated_at"""
+
+
+# stage_summary se mantiene por deltas: cada escritura de un paso toca una sola fila del resumen.
+STAGE_SUMMARY_SQL = f"""
+CREATE TRIGGER IF NOT EXISTS trg_stage_summary_insert AFTER INSERT ON tutorial_steps
+BEGIN
+    {_summary_delta_sql("new", "")};
+END;
+CREATE TRIGGER IF NOT EXISTS trg_stage_summary_delete AFTER DELETE ON tutorial_steps
+WHEN EXISTS (SELECT 1 FROM stages WHERE id = old.stage_id)
+BEGIN
+    {_summary_delta_sql("old", "-")};
+END;
+CREATE TRIGGER IF NOT EXISTS trg_stage_summary_update AFTER UPDATE OF stage_id, estimated_cost_usd ON tutorial_steps
+BEGIN
+    {_summary_delta_sql("old", "-")};
+    {_summary_delta_sql("new", "")};
+END;"""
+
+STAGE_SUMMARY_BACKFILL_SQL = f"""
+INSERT OR REPLACE INTO stage_summary(stage_id, step_count, total_cost_usd, updated_at)
+SELECT stage_id, COUNT(*), COALESCE(SUM(estimated_cost_usd), 0), {_NOW_SQL}
+FROM tutorial_steps GROUP BY stage_id
+"""
+
+
+_pool = threading.local()
+
+
+def init_pool_thread() -> None:
+    """Marca el hilo actual como parte del pool: sus conexiones se reutilizan entre llamadas."""
+    _pool.connections = {}
+
+
+def _statement_kind(sql: str) -> str:
+    keyword = sql.lstrip().split(None, 1)[:1]
+    return keyword[0].upper() if keyword else "EMPTY"
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Conexión que reporta cantidad y duración de sentencias a `/metrics`."""
+
+    def execute(self, sql, parameters=(), /):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            SQLITE_QUERY_DURATION.observe(time.perf_counter() - started, statement=_statement_kind(sql))
+
+    def executemany(self, sql, parameters, /):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, parameters)
+        finally:
+            SQLITE_QUERY_DURATION.observe(time.perf_counter() - started, statement=_statement_kind(sql))
+
+    def executescript(self, sql_script, /):
+        started = time.perf_counter()
+        try:
+            return super().executescript(sql_script)
+        finally:
+            SQLITE_QUERY_DURATION.observe(time.perf_counter() - started, statement="SCRIPT")
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, factory=InstrumentedConnection)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
 
 @contextmanager
 def get_conn(db_path: str | None = None):
     """Entrega conexión SQLite con row_factory por nombre de columnas."""
     ensure_dirs()
-    conn = sqlite3.connect(db_path or settings.db_path)
-    conn.row_factory = sqlite3.Row
+    path = db_path or settings.db_path
+    pooled: dict[str, sqlite3.Connection] | None = getattr(_pool, "connections", None)
+    conn = pooled.get(path) if pooled is not None else None
+    if conn is None:
+        conn = _connect(path)
+        if pooled is not None:
+            pooled[path] = conn
     try:
-        conn.execute("PRAGMA foreign_keys = ON")
-        yield conn
-        conn.commit()
+        with phase("db"):
+            yield conn
+            conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
     finally:
-        conn.close()
+        if pooled is None:
+            conn.close()
 
 
 def _add_column_if_missing(conn: sqlite3.Connection, table: str, column: str, column_sql: str) -> None:
@@ -83,3 +391,36 @@ def init_db(db_path: str | None = None) -> None:
         _add_column_if_missing(conn, "products", "image", "TEXT")
         _add_column_if_missing(conn, "kits", "image_card", "TEXT")
         _add_column_if_missing(conn, "kits", "image_result", "TEXT")
+        for table, _, value, _, _ in JSON_LIST_TABLES:
+            _add_column_if_missing(conn, table, f"{value}_key", "TEXT NOT NULL DEFAULT ''")
+        for table in CATALOG_TABLES:
+            _add_column_if_missing(conn, table, "created_at", "TEXT")
+            _add_column_if_missing(conn, table, "updated_at", "TEXT")
+        conn.executescript(STAGES_VIEW_SQL)
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")}
+        conn.executescript(CATALOG_VERSION_TRIGGERS_SQL)
+        conn.executescript(FTS_SQL)
+        for fts in FTS_TABLES:
+            if fts not in existing:
+                # Base previa a FTS: indexa las filas que ya existían.
+                conn.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+        if "trg_stages_touch" not in existing:
+            # Filas previas a los timestamps: se marcan una vez, antes de que existan los triggers de log.
+            for table in CATALOG_TABLES:
+                conn.execute(
+                    f"UPDATE {table} SET created_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now'), "
+                    "updated_at = strftime('%Y-%m-%dT%H:%M:%fZ', 'now') WHERE created_at IS NULL"
+                )
+        conn.executescript(CHANGE_TRACKING_SQL)
+        conn.executescript(JSON_LIST_SQL)
+        conn.executescript(STAGE_SUMMARY_SQL)
+        if "trg_stage_summary_insert" not in existing:
+            conn.execute(STAGE_SUMMARY_BACKFILL_SQL)
+        for spec in JSON_LIST_TABLES:
+            if f"trg_{spec[0]}_insert" not in existing:
+                # Migración: la primera vez se completan desde las columnas JSON existentes.
+                _backfill_json_list(conn, *spec)
+            table, _, value = spec[:3]
+            # Filas previas a `<valor>_key` (o calculadas con otra normalización): se recalculan solo si difieren.
+            key_sql = fold_key_sql(value)
+            conn.execute(f"UPDATE {table} SET {value}_key = {key_sql} WHERE {value}_key IS NOT {key_sql}")
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from app.config import settings
+from app.static_files import asset_manifest_token
+
+
+class FragmentCache:
+    """LRU en memoria de fragmentos HTML ya renderizados."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[str, Markup] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Markup | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Markup) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+class FragmentCacheExtension(Extension):
+    """Agrega `{% cache key %}...{% endcache %}`; se desactiva cuando el entorno recarga templates."""
+
+    tags = {"cache"}
+
+    def __init__(self, environment) -> None:
+        super().__init__(environment)
+        environment.extend(fragment_cache=FragmentCache(settings.fragment_cache_size))
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        return nodes.CallBlock(self.call_method("_cache_support", args), [], [], body).set_lineno(lineno)
+
+    def _cache_support(self, key: str, caller) -> Markup:
+        if self.environment.auto_reload:
+            return caller()
+        cache: FragmentCache = self.environment.fragment_cache
+        full_key = f"{asset_manifest_token()}:{key}"
+        value = cache.get(full_key)
+        if value is None:
+            value = Markup(caller())
+            cache.set(full_key, value)
+        return value
+
+
+def fragment_key(kind: str, row: dict[str, object]) -> str:
+    """Clave de fragmento: id de la entidad + hash de sus datos y bindings de imagen ya resueltos."""
+    raw = json.dumps(row, sort_keys=True, ensure_ascii=False, default=str)
+    digest = hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+    return f"{kind}:{row.get('id')}:{digest}"
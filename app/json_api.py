@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+
+def to_plain(value: Any) -> Any:
+    """Convierte modelos pydantic anidados a dicts/listas sin pasar por `jsonable_encoder`."""
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+def dumps(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse que serializa con orjson cuando está instalado."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(to_plain(content))
+
+
+def parse_fields(raw: str | None) -> frozenset[str] | None:
+    if not raw:
+        return None
+    fields = frozenset(part.strip() for part in raw.split(",") if part.strip())
+    return fields or None
+
+
+def select_fields(payload: Any, fields: frozenset[str] | None) -> Any:
+    """Sparse fieldsets: recorta cada entidad (dicts con `id`) a las claves pedidas."""
+    if fields is None:
+        return payload
+    if isinstance(payload, list):
+        return [select_fields(item, fields) for item in payload]
+    if isinstance(payload, dict):
+        if "id" in payload:
+            return {key: value for key, value in payload.items() if key in fields}
+        return {key: select_fields(value, fields) for key, value in payload.items()}
+    return payload
+
+
+def strong_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {candidate.strip().removeprefix("W/") for candidate in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+class ResponseCache:
+    """LRU de cuerpos JSON ya serializados; la clave incluye la versión del catálogo."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._items: OrderedDict[tuple, tuple[bytes, str, dict[str, str]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> tuple[bytes, str, dict[str, str]] | None:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def set(self, key: tuple, value: tuple[bytes, str, dict[str, str]]) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+response_cache = ResponseCache(settings.api_cache_size)
+
+
+def json_response(request: Request, body: bytes, etag: str, headers: dict[str, str] | None = None) -> Response:
+    """200 con el cuerpo ya serializado, o 304 si el cliente ya tiene ese ETag."""
+    base = {"ETag": etag, "Cache-Control": "no-cache", **(headers or {})}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=base)
+    return Response(content=body, media_type="application/json", headers=base)
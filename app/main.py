@@ -1,13 +1,38 @@
 from __future__ import annotations
 
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, PlainTextResponse
 
+from app.concurrency import run_io, shutdown_executors
 from app.config import settings
+from app.metrics import MetricsMiddleware, generate_latest
+from app.profiling import ProfilingMiddleware
 from app.routes import admin, api, web
+from app.static_files import PrecompressedStaticFiles
+from app.timing import ServerTimingMiddleware
+from app.warmup import mark_ready_without_warmup, state as warmup_state, warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # El warmup corre en segundo plano: /health responde enseguida y /ready da 503 hasta terminar.
+    task = asyncio.create_task(warmup(app)) if settings.warmup_enabled else None
+    if task is None:
+        mark_ready_without_warmup()
+    yield
+    if task is not None and not task.done():
+        task.cancel()
+    shutdown_executors()
+
 
-app = FastAPI(title=settings.app_title)
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+app = FastAPI(title=settings.app_title, lifespan=lifespan)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.mount("/static", PrecompressedStaticFiles(directory="app/static"), name="static")
 
 # Routers additive: web/admin/api endpoints coexist.
 app.include_router(web.router)
@@ -16,5 +41,16 @@ app.include_router(api.router)
 
 
 @app.get("/health")
-def health() -> dict[str, bool]:
+async def health() -> dict[str, bool]:
     return {"ok": True}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    body = await run_io(generate_latest)
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/ready", include_in_schema=False)
+async def ready() -> JSONResponse:
+    return JSONResponse(warmup_state.as_dict(), status_code=200 if warmup_state.ready else 503)
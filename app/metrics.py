@@ -0,0 +1,407 @@
+from __future__ import annotations
+
+import functools
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+INF = float("inf")
+HTTP_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, INF)
+SQLITE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.1, 0.5, INF)
+AI_BUCKETS = (0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, INF)
+
+_INITIAL_FILE_SIZE = 64 * 1024
+_HEADER_SIZE = 8
+
+
+def _padded_key(encoded: bytes) -> bytes:
+    return encoded + b" " * (8 - (len(encoded) + 4) % 8)
+
+
+def _read_entries(data, used: int) -> Iterator[tuple[str, float, int]]:
+    pos = _HEADER_SIZE
+    while pos < used:
+        (key_len,) = struct.unpack_from("<I", data, pos)
+        pos += 4
+        key = bytes(data[pos : pos + key_len]).decode("utf-8")
+        pos += len(_padded_key(b" " * key_len))
+        (value,) = struct.unpack_from("<d", data, pos)
+        yield key, value, pos
+        pos += 8
+
+
+class MmapedDict:
+    """Diccionario clave->float persistido en un archivo mmap, escrito por un solo proceso."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._file = open(path, "a+b")
+        if os.fstat(self._file.fileno()).st_size == 0:
+            self._file.truncate(_INITIAL_FILE_SIZE)
+        self._capacity = os.fstat(self._file.fileno()).st_size
+        self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._positions: dict[str, int] = {}
+        (self._used,) = struct.unpack_from("<I", self._map, 0)
+        if self._used == 0:
+            self._used = _HEADER_SIZE
+            struct.pack_into("<I", self._map, 0, self._used)
+        for key, _, pos in _read_entries(self._map, self._used):
+            self._positions[key] = pos
+
+    def _init_key(self, key: str) -> int:
+        encoded = key.encode("utf-8")
+        padded = _padded_key(encoded)
+        entry = struct.pack(f"<I{len(padded)}sd", len(encoded), padded, 0.0)
+        while self._used + len(entry) > self._capacity:
+            self._capacity *= 2
+            self._file.truncate(self._capacity)
+            self._map.close()
+            self._map = mmap.mmap(self._file.fileno(), self._capacity)
+        self._map[self._used : self._used + len(entry)] = entry
+        self._used += len(entry)
+        struct.pack_into("<I", self._map, 0, self._used)
+        position = self._used - 8
+        self._positions[key] = position
+        return position
+
+    def add(self, key: str, amount: float) -> None:
+        position = self._positions.get(key)
+        if position is None:
+            position = self._init_key(key)
+        (current,) = struct.unpack_from("<d", self._map, position)
+        struct.pack_into("<d", self._map, position, current + amount)
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+def read_values(path: Path) -> Iterator[tuple[str, float]]:
+    data = path.read_bytes()
+    if len(data) < _HEADER_SIZE:
+        return
+    (used,) = struct.unpack_from("<I", data, 0)
+    for key, value, _ in _read_entries(data, min(used, len(data))):
+        yield key, value
+
+
+class _ProcessStore:
+    """Un archivo por tipo y por PID dentro de METRICS_DIR; se reabre tras un fork."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._owner: tuple[int, str] | None = None
+        self._files: dict[str, MmapedDict] = {}
+
+    def _file(self, kind: str) -> MmapedDict:
+        owner = (os.getpid(), settings.metrics_dir)
+        if owner != self._owner:
+            self._files = {}
+            self._owner = owner
+        store = self._files.get(kind)
+        if store is None:
+            directory = Path(settings.metrics_dir)
+            directory.mkdir(parents=True, exist_ok=True)
+            store = MmapedDict(directory / f"{kind}_{owner[0]}.db")
+            self._files[kind] = store
+        return store
+
+    def add(self, kind: str, items: list[tuple[str, float]]) -> None:
+        with self._lock:
+            store = self._file(kind)
+            for key, amount in items:
+                store.add(key, amount)
+
+
+_store = _ProcessStore()
+_registry: list["_Metric"] = []
+_buffered: list["BufferedCounter"] = []
+_collectors: list[Callable[[dict[str, float]], list[str]]] = []
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_key(sample: str, labels: tuple[tuple[str, str], ...]) -> str:
+    return json.dumps([sample, sorted(labels)], ensure_ascii=False)
+
+
+def _sample_key(sample: str, labels: dict[str, str]) -> str:
+    return _cached_key(sample, tuple(labels.items()))
+
+
+class _Metric:
+    kind = "counter"
+    prom_type = "counter"
+
+    def __init__(self, name: str, documentation: str) -> None:
+        self.name = name
+        self.documentation = documentation
+        _registry.append(self)
+
+
+class Counter(_Metric):
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        _store.add(self.kind, [(_sample_key(self.name, labels), amount)])
+
+
+class BufferedCounter(Counter):
+    """Counter para caminos calientes: suma en memoria y escribe al mmap por request o cada `flush_every`."""
+
+    flush_every = 256
+
+    def __init__(self, name: str, documentation: str) -> None:
+        super().__init__(name, documentation)
+        self._pending_lock = threading.Lock()
+        self._pending: dict[str, float] = {}
+        self._pending_count = 0
+        _buffered.append(self)
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = _sample_key(self.name, labels)
+        with self._pending_lock:
+            self._pending[key] = self._pending.get(key, 0.0) + amount
+            self._pending_count += 1
+            if self._pending_count < self.flush_every:
+                return
+        self.flush()
+
+    def flush(self) -> None:
+        with self._pending_lock:
+            items = list(self._pending.items())
+            self._pending.clear()
+            self._pending_count = 0
+        if items:
+            _store.add(self.kind, items)
+
+
+def flush_buffered() -> None:
+    for metric in _buffered:
+        metric.flush()
+
+
+class Gauge(_Metric):
+    """Gauge sumado entre procesos vivos (p. ej. requests en curso)."""
+
+    kind = "gauge_live"
+    prom_type = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        _store.add(self.kind, [(_sample_key(self.name, labels), amount)])
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    prom_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: tuple[float, ...] = HTTP_BUCKETS) -> None:
+        super().__init__(name, documentation)
+        self.buckets = buckets
+
+    @functools.lru_cache(maxsize=1024)
+    def _series_keys(self, labels: tuple[tuple[str, str], ...]) -> tuple[tuple[str, ...], str, str]:
+        series = dict(labels)
+        buckets = tuple(_sample_key(f"{self.name}_bucket", {**series, "le": _format_value(b)}) for b in self.buckets)
+        return buckets, _sample_key(f"{self.name}_sum", series), _sample_key(f"{self.name}_count", series)
+
+    def observe(self, value: float, **labels: str) -> None:
+        bucket_keys, sum_key, count_key = self._series_keys(tuple(labels.items()))
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        _store.add(self.kind, [(bucket_keys[index], 1.0), (sum_key, value), (count_key, 1.0)])
+
+
+def register_collector(func: Callable[[dict[str, float]], list[str]]) -> None:
+    """Agrega líneas calculadas al exponer (métricas derivadas o leídas de otra fuente)."""
+    _collectors.append(func)
+
+
+def _format_value(value: float) -> str:
+    if value == INF:
+        return "+Inf"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_sample(name: str, labels: list[tuple[str, str]] | tuple, value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    if os.name == "nt":
+        # os.kill(pid, 0) termina el proceso en Windows; se asume vivo.
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _absorb_dead_file(path: Path, kind: str) -> None:
+    """Suma los valores de un worker muerto al archivo de este proceso y borra el suyo (los totales no retroceden)."""
+    claimed = path.with_name(f"{path.name}.{os.getpid()}.absorbing")
+    try:
+        # El rename es atómico: si dos workers lo intentan a la vez, solo uno lo absorbe.
+        path.rename(claimed)
+    except OSError:
+        return
+    try:
+        _store.add(kind, list(read_values(claimed)))
+    except (OSError, struct.error, UnicodeDecodeError, ValueError):
+        pass
+    claimed.unlink(missing_ok=True)
+
+
+def _merged_values() -> dict[str, float]:
+    merged: dict[str, float] = {}
+    directory = Path(settings.metrics_dir)
+    if not directory.exists():
+        return merged
+    for path in sorted(directory.glob("*.db")):
+        kind, _, pid = path.stem.rpartition("_")
+        if not pid.isdigit() or _pid_alive(int(pid)):
+            continue
+        if kind == Gauge.kind:
+            path.unlink(missing_ok=True)
+        else:
+            _absorb_dead_file(path, kind)
+    for path in sorted(directory.glob("*.db")):
+        try:
+            for key, value in read_values(path):
+                merged[key] = merged.get(key, 0.0) + value
+        except (OSError, struct.error, UnicodeDecodeError, ValueError):
+            continue
+    return merged
+
+
+def generate_latest() -> str:
+    """Expone todas las métricas de todos los workers en formato texto de Prometheus."""
+    flush_buffered()
+    merged = _merged_values()
+    samples: dict[str, list[tuple[tuple, float]]] = {}
+    for key, value in merged.items():
+        sample, labels = json.loads(key)
+        samples.setdefault(sample, []).append((tuple(tuple(item) for item in labels), value))
+
+    lines: list[str] = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.prom_type}")
+        if isinstance(metric, Histogram):
+            lines.extend(_histogram_lines(metric, samples))
+            continue
+        for labels, value in sorted(samples.get(metric.name, [])):
+            lines.append(_format_sample(metric.name, labels, value))
+
+    for collector in _collectors:
+        lines.extend(collector(merged))
+    return "\n".join(lines) + "\n"
+
+
+def _histogram_lines(metric: Histogram, samples: dict[str, list[tuple[tuple, float]]]) -> list[str]:
+    buckets_by_series: dict[tuple, dict[str, float]] = {}
+    for labels, value in samples.get(f"{metric.name}_bucket", []):
+        series = tuple(item for item in labels if item[0] != "le")
+        le = dict(labels)["le"]
+        buckets_by_series.setdefault(series, {})[le] = value
+
+    sums = dict(samples.get(f"{metric.name}_sum", []))
+    counts = dict(samples.get(f"{metric.name}_count", []))
+    lines: list[str] = []
+    for series in sorted(buckets_by_series):
+        observed = buckets_by_series[series]
+        cumulative = 0.0
+        for bound in metric.buckets:
+            le = _format_value(bound)
+            cumulative += observed.get(le, 0.0)
+            lines.append(_format_sample(f"{metric.name}_bucket", sorted([*series, ("le", le)]), cumulative))
+        lines.append(_format_sample(f"{metric.name}_sum", series, sums.get(series, 0.0)))
+        lines.append(_format_sample(f"{metric.name}_count", series, counts.get(series, 0.0)))
+    return lines
+
+
+HTTP_REQUEST_DURATION = Histogram("http_request_duration_seconds", "Latencia de requests HTTP por ruta.", HTTP_BUCKETS)
+HTTP_REQUESTS_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests HTTP en curso.")
+SQLITE_QUERY_DURATION = Histogram("sqlite_query_duration_seconds", "Duración de sentencias SQLite (execute).", SQLITE_BUCKETS)
+IMAGE_RESOLVER_CACHE = BufferedCounter("image_resolver_cache_lookups_total", "Consultas al cache de existencia de archivos del resolver.")
+AI_REQUEST_DURATION = Histogram("ai_request_duration_seconds", "Latencia de llamadas de generación IA.", AI_BUCKETS)
+AI_REQUEST_ERRORS = Counter("ai_request_errors_total", "Errores en llamadas de generación IA.")
+IMAGE_GENERATION_JOBS = Counter("image_generation_jobs_total", "Slots procesados por generate_site_images por estado.")
+
+
+def _resolver_hit_ratio(merged: dict[str, float]) -> list[str]:
+    hits = merged.get(_sample_key(IMAGE_RESOLVER_CACHE.name, {"result": "hit"}), 0.0)
+    misses = merged.get(_sample_key(IMAGE_RESOLVER_CACHE.name, {"result": "miss"}), 0.0)
+    ratio = hits / (hits + misses) if hits + misses else 0.0
+    return [
+        "# HELP image_resolver_cache_hit_ratio Proporción de consultas del resolver servidas desde cache.",
+        "# TYPE image_resolver_cache_hit_ratio gauge",
+        f"image_resolver_cache_hit_ratio {ratio:.6f}",
+    ]
+
+
+register_collector(_resolver_hit_ratio)
+
+
+def _route_label(scope: Scope) -> str:
+    route = scope.get("route")
+    path = getattr(route, "path", None)
+    if path:
+        return path
+    if scope.get("path", "").startswith("/static/"):
+        return "/static"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Registra latencia por ruta y requests en curso para `/metrics`."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            flush_buffered()
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.observe(
+                time.perf_counter() - started,
+                method=scope.get("method", ""),
+                route=_route_label(scope),
+                status=str(status["code"]),
+            )
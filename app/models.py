@@ -10,6 +10,11 @@ class Stage(BaseModel):
     image_card_1: str | None = None
     image_card_2: str | None = None
     image_hero: str | None = None
+    step_count: int = 0
+    total_cost_usd: float = 0
+    summary_updated_at: str | None = None
+    created_at: str | None = None
+    updated_at: str | None = None
 
 
 class TutorialStep(BaseModel):
@@ -20,6 +25,8 @@ class TutorialStep(BaseModel):
     tools_json: list[str] = Field(default_factory=list)
     estimated_cost_usd: float | None = None
     image: str | None = None
+    created_at: str | None = None
+    updated_at: str | None = None
 
 
 class Product(BaseModel):
@@ -30,6 +37,8 @@ class Product(BaseModel):
     affiliate_url: str
     internal_product: int = 0
     image: str | None = None
+    created_at: str | None = None
+    updated_at: str | None = None
 
 
 class Kit(BaseModel):
@@ -40,6 +49,25 @@ class Kit(BaseModel):
     components_json: list[str] = Field(default_factory=list)
     image_card: str | None = None
     image_result: str | None = None
+    created_at: str | None = None
+    updated_at: str | None = None
+
+
+class SearchHit(BaseModel):
+    kind: str
+    id: int
+    title: str
+    snippet: str
+    url: str
+    rank: float
+
+
+class ChangeEntry(BaseModel):
+    seq: int
+    entity: str
+    entity_id: int
+    op: str
+    changed_at: str
 
 
 class AIStep(BaseModel):
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 500
+
+
+def encode_cursor(values: tuple) -> str:
+    """Cursor opaco (base64url de la tupla de orden de la última fila entregada)."""
+    raw = json.dumps(list(values), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _matches(value: object, kind: type) -> bool:
+    if isinstance(value, bool):
+        return False
+    if kind is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, kind)
+
+
+def decode_cursor(cursor: str | None, types: tuple[type, ...]) -> tuple | None:
+    """Decodifica un cursor cuyos valores deben tener los tipos de las columnas de orden; lanza ValueError si no es válido."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("Cursor inválido") from exc
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError("Cursor inválido")
+    if not all(_matches(value, kind) for value, kind in zip(values, types)):
+        raise ValueError("Cursor inválido")
+    return tuple(values)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import cProfile
+import hmac
+import json
+import pstats
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Generator, TypeVar
+from urllib.parse import parse_qsl, urlencode
+from uuid import uuid4
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+PROFILE_HEADER = b"x-profile"
+PROFILE_QUERY_PARAM = "_profile"
+PROFILE_TOP_N = 40
+PROFILES_KEEP = 50
+_PROFILE_ID_RE = re.compile(r"^[0-9]{8}-[0-9]{6}-[0-9a-f]{6}$")
+
+T = TypeVar("T")
+
+# Perfiles de las llamadas run_db/run_io de la request perfilada; solo su contexto los ve, el resto de requests no.
+_thread_profiles: ContextVar[list[cProfile.Profile] | None] = ContextVar("thread_profiles", default=None)
+# cProfile es un solo perfilador por hilo: dos requests perfiladas a la vez en el loop chocan (o mezclan muestras).
+_profile_lock = threading.Lock()
+
+
+def profiled_call(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Ejecuta `func` en el hilo del pool, con su propio perfilador si la request actual se está perfilando."""
+    collected = _thread_profiles.get()
+    if collected is None:
+        return func(*args, **kwargs)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # Python 3.12+: otro perfilador ya está activo en el intérprete.
+        return func(*args, **kwargs)
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        collected.append(profiler)
+
+
+class _StepProfiled:
+    """Habilita el perfilador solo mientras avanza la corrutina envuelta, no la de otras requests del loop."""
+
+    def __init__(self, coro: Coroutine[Any, Any, T], profiler: cProfile.Profile) -> None:
+        self._coro = coro
+        self._profiler = profiler
+
+    def __await__(self) -> Generator[Any, Any, T]:
+        value, error = None, None
+        while True:
+            self._profiler.enable()
+            try:
+                yielded = self._coro.throw(error) if error is not None else self._coro.send(value)
+            except StopIteration as stop:
+                return stop.value
+            finally:
+                self._profiler.disable()
+            try:
+                value, error = (yield yielded), None
+            except BaseException as exc:
+                value, error = None, exc
+
+
+def _provided_token(scope: Scope) -> str:
+    for name, value in scope.get("headers", []):
+        if name == PROFILE_HEADER:
+            return value.decode("latin-1")
+    for name, value in parse_qsl(scope.get("query_string", b"").decode("latin-1")):
+        if name == PROFILE_QUERY_PARAM:
+            return value
+    return ""
+
+
+def profile_requested(scope: Scope) -> bool:
+    expected = settings.profiling_token
+    if not expected:
+        return False
+    provided = _provided_token(scope)
+    return bool(provided) and hmac.compare_digest(provided.encode(), expected.encode())
+
+
+def _public_query(scope: Scope) -> str:
+    pairs = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    return urlencode([(key, value) for key, value in pairs if key != PROFILE_QUERY_PARAM])
+
+
+def _top_functions(stats: pstats.Stats, limit: int = PROFILE_TOP_N) -> list[dict[str, object]]:
+    rows = []
+    for (filename, lineno, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append(
+            {
+                "function": name,
+                "location": f"{filename}:{lineno}",
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            }
+        )
+    rows.sort(key=lambda row: row["cumtime_ms"], reverse=True)
+    return rows[:limit]
+
+
+def _prune(directory: Path) -> None:
+    stored = sorted(directory.glob("*.json"))
+    for meta_path in stored[:-PROFILES_KEEP]:
+        meta_path.unlink(missing_ok=True)
+        meta_path.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def save_profile(profile_id: str, profilers: list[cProfile.Profile], meta: dict[str, object]) -> Path:
+    """Fusiona los perfiles de la request, guarda el volcado pstats (`.prof`) y un resumen JSON con el top acumulado."""
+    directory = Path(settings.profiles_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    stats = pstats.Stats(*profilers)
+    stats.dump_stats(str(directory / f"{profile_id}.prof"))
+    payload = {**meta, "id": profile_id, "top": _top_functions(stats)}
+    meta_path = directory / f"{profile_id}.json"
+    meta_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    _prune(directory)
+    return meta_path
+
+
+def list_profiles() -> list[dict[str, object]]:
+    directory = Path(settings.profiles_dir)
+    if not directory.exists():
+        return []
+    rows = []
+    for meta_path in sorted(directory.glob("*.json"), reverse=True):
+        try:
+            payload = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            continue
+        payload.pop("top", None)
+        rows.append(payload)
+    return rows
+
+
+def profile_path(profile_id: str, suffix: str) -> Path | None:
+    if not _PROFILE_ID_RE.match(profile_id):
+        return None
+    path = Path(settings.profiles_dir) / f"{profile_id}{suffix}"
+    return path if path.exists() else None
+
+
+def load_profile(profile_id: str) -> dict[str, object] | None:
+    path = profile_path(profile_id, ".json")
+    if path is None:
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+class ProfilingMiddleware:
+    """Perfila con cProfile las requests que traen el token de PROFILING_TOKEN (header o query)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not profile_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if not _profile_lock.acquire(blocking=False):
+            response = PlainTextResponse("Ya hay una request perfilada en curso; reintentar.", status_code=409)
+            await response(scope, receive, send)
+            return
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            _profile_lock.release()
+
+    async def _profile(self, scope: Scope, receive: Receive, send: Send) -> None:
+        from app.concurrency import run_io  # app.concurrency importa este módulo
+
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%d-%H%M%S}-{uuid4().hex[:6]}"
+        status = {"code": 500}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        profiler = cProfile.Profile()
+        thread_profiles: list[cProfile.Profile] = []
+        token = _thread_profiles.set(thread_profiles)
+        started = time.perf_counter()
+        try:
+            await _StepProfiled(self.app(scope, receive, send_wrapper), profiler)
+        finally:
+            _thread_profiles.reset(token)
+            await run_io(
+                save_profile,
+                profile_id,
+                [profiler, *thread_profiles],
+                {
+                    "method": scope.get("method"),
+                    "path": scope.get("path"),
+                    "query": _public_query(scope),
+                    "status": status["code"],
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                },
+            )
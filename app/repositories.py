@@ -1,46 +1,143 @@
 from __future__ import annotations
 
+import html
 import json
+import os
+import re
 
+from app.config import settings
 from app.db import get_conn, init_db
-from app.models import Kit, Product, Stage, TutorialStep
+from app.models import ChangeEntry, Kit, Product, SearchHit, Stage, TutorialStep
+from app.text import prefix_range
+
+_ready_db_paths: set[str] = set()
 
 
 def _ensure_ready() -> None:
+    path = settings.db_path
+    if path in _ready_db_paths and os.path.exists(path):
+        return
     init_db()
+    _ready_db_paths.add(path)
+
+
+# Orden estable de cada listado; también define las columnas del cursor keyset.
+STAGE_ORDER = ("order_index", "id")
+PRODUCT_ORDER = ("category", "name", "id")
+KIT_ORDER = ("name", "id")
+# Tipo de cada columna de orden: los cursores se validan contra esto antes de llegar a SQLite.
+KEYSET_TYPES = {"order_index": int, "id": int, "category": str, "name": str}
+
+
+STAGE_COLUMNS = (
+    "id",
+    "name",
+    "order_index",
+    "image_card_1",
+    "image_card_2",
+    "image_hero",
+    "step_count",
+    "total_cost_usd",
+    "summary_updated_at",
+    "created_at",
+    "updated_at",
+)
+
+
+def _stage_from_row(row, prefix: str = "") -> Stage:
+    return Stage(**{column: row[prefix + column] for column in STAGE_COLUMNS})
+
+
+def _product_from_row(row) -> Product:
+    return Product(
+        id=row["id"],
+        name=row["name"],
+        category=row["category"],
+        price=row["price"],
+        affiliate_url=row["affiliate_url"],
+        internal_product=row["internal_product"],
+        image=row["image"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
+
+
+def _kit_from_row(row) -> Kit:
+    return Kit(
+        id=row["id"],
+        name=row["name"],
+        description=row["description"],
+        price=row["price"],
+        components_json=json.loads(row["components_json"] or "[]"),
+        image_card=row["image_card"],
+        image_result=row["image_result"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
+
+
+def _step_from_row(row) -> TutorialStep:
+    return TutorialStep(
+        id=row["id"],
+        stage_id=row["stage_id"],
+        title=row["title"],
+        content=row["content"],
+        tools_json=json.loads(row["tools_json"] or "[]"),
+        estimated_cost_usd=row["estimated_cost_usd"],
+        image=row["image"],
+        created_at=row["created_at"],
+        updated_at=row["updated_at"],
+    )
+
+
+def _keyset_rows(table: str, order: tuple[str, ...], after: tuple | None, limit: int) -> list:
+    order_sql = ", ".join(order)
+    with get_conn() as conn:
+        if after is None:
+            return conn.execute(f"SELECT * FROM {table} ORDER BY {order_sql} LIMIT ?", (limit,)).fetchall()
+        placeholders = ", ".join("?" for _ in order)
+        return conn.execute(
+            f"SELECT * FROM {table} WHERE ({order_sql}) > ({placeholders}) ORDER BY {order_sql} LIMIT ?",
+            (*after, limit),
+        ).fetchall()
+
+
+def keyset_values(item, order: tuple[str, ...]) -> tuple:
+    return tuple(getattr(item, column) for column in order)
+
+
+def keyset_types(order: tuple[str, ...]) -> tuple[type, ...]:
+    return tuple(KEYSET_TYPES[column] for column in order)
+
+
+def catalog_version() -> int:
+    """Versión monotónica del catálogo; los triggers la incrementan en cada escritura."""
+    _ensure_ready()
+    with get_conn() as conn:
+        row = conn.execute("SELECT version FROM catalog_state WHERE id = 1").fetchone()
+    return int(row["version"]) if row else 0
 
 
 def list_stages() -> list[Stage]:
     _ensure_ready()
     with get_conn() as conn:
-        rows = conn.execute("SELECT * FROM stages ORDER BY order_index ASC, id ASC").fetchall()
-    return [
-        Stage(
-            id=row["id"],
-            name=row["name"],
-            order_index=row["order_index"],
-            image_card_1=row["image_card_1"],
-            image_card_2=row["image_card_2"],
-            image_hero=row["image_hero"],
-        )
-        for row in rows
-    ]
+        rows = conn.execute("SELECT * FROM stages_with_summary ORDER BY order_index ASC, id ASC").fetchall()
+    return [_stage_from_row(row) for row in rows]
+
+
+def list_stages_page(after: tuple | None = None, limit: int = 100) -> list[Stage]:
+    """Página keyset por (order_index, id): `after` es la tupla de la última etapa ya entregada."""
+    _ensure_ready()
+    return [_stage_from_row(row) for row in _keyset_rows("stages_with_summary", STAGE_ORDER, after, limit)]
 
 
 def get_stage(stage_id: int) -> Stage | None:
     _ensure_ready()
     with get_conn() as conn:
-        row = conn.execute("SELECT * FROM stages WHERE id = ?", (stage_id,)).fetchone()
+        row = conn.execute("SELECT * FROM stages_with_summary WHERE id = ?", (stage_id,)).fetchone()
     if not row:
         return None
-    return Stage(
-        id=row["id"],
-        name=row["name"],
-        order_index=row["order_index"],
-        image_card_1=row["image_card_1"],
-        image_card_2=row["image_card_2"],
-        image_hero=row["image_hero"],
-    )
+    return _stage_from_row(row)
 
 
 def create_stage(
@@ -85,18 +182,45 @@ def list_steps_by_stage(stage_id: int) -> list[TutorialStep]:
         rows = conn.execute(
             "SELECT * FROM tutorial_steps WHERE stage_id = ? ORDER BY id ASC", (stage_id,)
         ).fetchall()
-    return [
-        TutorialStep(
-            id=row["id"],
-            stage_id=row["stage_id"],
-            title=row["title"],
-            content=row["content"],
-            tools_json=json.loads(row["tools_json"] or "[]"),
-            estimated_cost_usd=row["estimated_cost_usd"],
-            image=row["image"],
-        )
-        for row in rows
-    ]
+    return [_step_from_row(row) for row in rows]
+
+
+def get_stages_with_steps(stage_ids: list[int], include_steps: bool = True) -> list[tuple[Stage, list[TutorialStep]]]:
+    """Etapas pedidas (en el orden de `stage_ids`) con sus pasos, en una sola consulta con LEFT JOIN."""
+    _ensure_ready()
+    if not stage_ids:
+        return []
+    placeholders = ", ".join("?" for _ in stage_ids)
+    stage_columns = ", ".join(f"s.{column} AS s_{column}" for column in STAGE_COLUMNS)
+    with get_conn() as conn:
+        if include_steps:
+            rows = conn.execute(
+                f"""
+                SELECT {stage_columns},
+                       t.id, t.stage_id, t.title, t.content, t.tools_json, t.estimated_cost_usd, t.image,
+                       t.created_at, t.updated_at
+                FROM stages_with_summary s
+                LEFT JOIN tutorial_steps t ON t.stage_id = s.id
+                WHERE s.id IN ({placeholders})
+                ORDER BY s.id, t.id
+                """,
+                tuple(stage_ids),
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                f"SELECT {stage_columns}, NULL AS id FROM stages_with_summary s WHERE s.id IN ({placeholders})",
+                tuple(stage_ids),
+            ).fetchall()
+
+    found: dict[int, tuple[Stage, list[TutorialStep]]] = {}
+    for row in rows:
+        entry = found.get(row["s_id"])
+        if entry is None:
+            stage = _stage_from_row(row, prefix="s_")
+            entry = found[row["s_id"]] = (stage, [])
+        if row["id"] is not None:
+            entry[1].append(_step_from_row(row))
+    return [found[stage_id] for stage_id in stage_ids if stage_id in found]
 
 
 def create_step(
@@ -144,20 +268,14 @@ def list_products() -> list[Product]:
     _ensure_ready()
     with get_conn() as conn:
         rows = conn.execute("SELECT * FROM products ORDER BY category, name").fetchall()
-    return [
-        Product(
-            id=row["id"],
-            name=row["name"],
-            category=row["category"],
-            price=row["price"],
-            affiliate_url=row["affiliate_url"],
-            internal_product=row["internal_product"],
-            image=row["image"],
-        )
-        for row in rows
-    ]
+    return [_product_from_row(row) for row in rows]
 
 
+def list_products_page(after: tuple | None = None, limit: int = 100) -> list[Product]:
+    """Página keyset por (category, name, id)."""
+    _ensure_ready()
+    return [_product_from_row(row) for row in _keyset_rows("products", PRODUCT_ORDER, after, limit)]
+
 
 def get_product(product_id: int) -> Product | None:
     _ensure_ready()
@@ -165,15 +283,7 @@ def get_product(product_id: int) -> Product | None:
         row = conn.execute("SELECT * FROM products WHERE id = ?", (product_id,)).fetchone()
     if not row:
         return None
-    return Product(
-        id=row["id"],
-        name=row["name"],
-        category=row["category"],
-        price=row["price"],
-        affiliate_url=row["affiliate_url"],
-        internal_product=row["internal_product"],
-        image=row["image"],
-    )
+    return _product_from_row(row)
 
 def create_product(product: Product) -> None:
     _ensure_ready()
@@ -189,18 +299,22 @@ def list_kits() -> list[Kit]:
     _ensure_ready()
     with get_conn() as conn:
         rows = conn.execute("SELECT * FROM kits ORDER BY name").fetchall()
-    return [
-        Kit(
-            id=row["id"],
-            name=row["name"],
-            description=row["description"],
-            price=row["price"],
-            components_json=json.loads(row["components_json"] or "[]"),
-            image_card=row["image_card"],
-            image_result=row["image_result"],
-        )
-        for row in rows
-    ]
+    return [_kit_from_row(row) for row in rows]
+
+
+def get_kit(kit_id: int) -> Kit | None:
+    _ensure_ready()
+    with get_conn() as conn:
+        row = conn.execute("SELECT * FROM kits WHERE id = ?", (kit_id,)).fetchone()
+    if not row:
+        return None
+    return _kit_from_row(row)
+
+
+def list_kits_page(after: tuple | None = None, limit: int = 100) -> list[Kit]:
+    """Página keyset por (name, id)."""
+    _ensure_ready()
+    return [_kit_from_row(row) for row in _keyset_rows("kits", KIT_ORDER, after, limit)]
 
 
 def create_kit(kit: Kit) -> None:
@@ -220,3 +334,186 @@ def create_kit(kit: Kit) -> None:
                 kit.image_result,
             ),
         )
+
+
+SEARCH_KINDS = ("step", "product", "kit")
+# Marcadores de control para highlight/snippet: se escapan recién después de traer el texto.
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+
+# Por tipo: (consulta con el mejor `rank` primero, plantilla de URL). El título pesa más que el resto.
+_SEARCH_SQL = {
+    "step": (
+        """
+        SELECT t.id, t.stage_id AS parent_id, highlight(steps_fts, 0, ?, ?) AS title,
+               snippet(steps_fts, 1, ?, ?, '…', 16) AS snippet, rank
+        FROM steps_fts JOIN tutorial_steps t ON t.id = steps_fts.rowid
+        WHERE steps_fts MATCH ? AND rank MATCH 'bm25(10.0, 1.0, 2.0)'
+        ORDER BY rank LIMIT ?
+        """,
+        "/stages/{parent_id}",
+    ),
+    "product": (
+        """
+        SELECT rowid AS id, NULL AS parent_id, highlight(products_fts, 0, ?, ?) AS title,
+               highlight(products_fts, 1, ?, ?) AS snippet, rank
+        FROM products_fts
+        WHERE products_fts MATCH ? AND rank MATCH 'bm25(10.0, 2.0)'
+        ORDER BY rank LIMIT ?
+        """,
+        "/products/{id}",
+    ),
+    "kit": (
+        """
+        SELECT rowid AS id, NULL AS parent_id, highlight(kits_fts, 0, ?, ?) AS title,
+               snippet(kits_fts, -1, ?, ?, '…', 16) AS snippet, rank
+        FROM kits_fts
+        WHERE kits_fts MATCH ? AND rank MATCH 'bm25(10.0, 1.0, 1.0)'
+        ORDER BY rank LIMIT ?
+        """,
+        "/kits",
+    ),
+}
+
+
+def fts_query(text: str) -> str | None:
+    """Texto libre -> consulta FTS5: AND de términos entre comillas, el último como prefijo."""
+    tokens = re.findall(r"\w+", text or "")
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _marked_html(text: str | None) -> str:
+    return html.escape(text or "").replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+def search_catalog(text: str, limit: int = 20, kinds: tuple[str, ...] = SEARCH_KINDS) -> list[SearchHit]:
+    """Búsqueda full-text en pasos, productos y kits; `title`/`snippet` vienen como HTML escapado con `<mark>`."""
+    _ensure_ready()
+    query = fts_query(text)
+    if query is None:
+        return []
+    hits: list[SearchHit] = []
+    with get_conn() as conn:
+        for kind in kinds:
+            sql, url = _SEARCH_SQL[kind]
+            rows = conn.execute(sql, (_MARK_OPEN, _MARK_CLOSE, _MARK_OPEN, _MARK_CLOSE, query, limit)).fetchall()
+            hits.extend(
+                SearchHit(
+                    kind=kind,
+                    id=row["id"],
+                    title=_marked_html(row["title"]),
+                    snippet=_marked_html(row["snippet"]),
+                    url=url.format(id=row["id"], parent_id=row["parent_id"]),
+                    rank=row["rank"],
+                )
+                for row in rows
+            )
+    hits.sort(key=lambda hit: hit.rank)
+    return hits[:limit]
+
+
+def suggestion_sources() -> list[tuple[str, str]]:
+    """Etiquetas para autocompletar: nombres de productos y kits, títulos de pasos y herramientas distintas."""
+    _ensure_ready()
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT name AS label, 'product' AS kind FROM products
+            UNION ALL SELECT name, 'kit' FROM kits
+            UNION ALL SELECT title, 'step' FROM tutorial_steps
+            UNION ALL SELECT tool, 'tool' FROM step_tools GROUP BY tool
+            """
+        ).fetchall()
+    return [(row["label"], row["kind"]) for row in rows]
+
+
+def list_distinct_tools() -> list[str]:
+    _ensure_ready()
+    with get_conn() as conn:
+        rows = conn.execute("SELECT DISTINCT tool FROM step_tools ORDER BY tool").fetchall()
+    return [row["tool"] for row in rows]
+
+
+def replace_tool_products(rows: list[tuple[str, int, float, int]]) -> None:
+    """Reemplaza el índice herramienta -> producto con filas (tool_slug, product_id, score, position)."""
+    _ensure_ready()
+    with get_conn() as conn:
+        conn.execute("DELETE FROM tool_products")
+        conn.executemany("INSERT INTO tool_products(tool_slug, product_id, score, position) VALUES(?, ?, ?, ?)", rows)
+
+
+def products_for_tool_slugs(slugs: list[str]) -> dict[str, list[Product]]:
+    """Productos precalculados por herramienta (ya ordenados); una sola consulta para todos los slugs."""
+    _ensure_ready()
+    unique = list(dict.fromkeys(slug for slug in slugs if slug))
+    if not unique:
+        return {}
+    placeholders = ", ".join("?" for _ in unique)
+    with get_conn() as conn:
+        rows = conn.execute(
+            f"""
+            SELECT tp.tool_slug, p.*
+            FROM tool_products tp JOIN products p ON p.id = tp.product_id
+            WHERE tp.tool_slug IN ({placeholders})
+            ORDER BY tp.tool_slug, tp.position
+            """,
+            tuple(unique),
+        ).fetchall()
+    found: dict[str, list[Product]] = {}
+    for row in rows:
+        found.setdefault(row["tool_slug"], []).append(_product_from_row(row))
+    return found
+
+
+def list_stages_with_tool(tool: str) -> list[Stage]:
+    """Etapas con algún paso que usa una herramienta que empieza con `tool` (sin mayúsculas ni acentos)."""
+    _ensure_ready()
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT * FROM stages_with_summary s
+            WHERE EXISTS (
+                SELECT 1 FROM tutorial_steps t JOIN step_tools st ON st.step_id = t.id
+                WHERE t.stage_id = s.id AND st.tool_key >= ? AND st.tool_key < ?
+            )
+            ORDER BY s.order_index, s.id
+            """,
+            prefix_range(tool),
+        ).fetchall()
+    return [_stage_from_row(row) for row in rows]
+
+
+def list_kits_with_component(component: str) -> list[Kit]:
+    """Kits con algún componente que empieza con `component` (sin mayúsculas ni acentos)."""
+    _ensure_ready()
+    with get_conn() as conn:
+        rows = conn.execute(
+            """
+            SELECT * FROM kits k
+            WHERE EXISTS (
+                SELECT 1 FROM kit_components kc
+                WHERE kc.kit_id = k.id AND kc.component_key >= ? AND kc.component_key < ?
+            )
+            ORDER BY k.name, k.id
+            """,
+            prefix_range(component),
+        ).fetchall()
+    return [_kit_from_row(row) for row in rows]
+
+
+def list_changes(after_seq: int = 0, limit: int = 500) -> list[ChangeEntry]:
+    """Entradas de `change_log` posteriores a `after_seq`, en orden de secuencia.
+
+    Las filas que ya existían antes de la migración que creó `change_log` no tienen entrada:
+    un consumidor nuevo hace primero una sincronización completa y después sigue el feed.
+    """
+    _ensure_ready()
+    with get_conn() as conn:
+        rows = conn.execute(
+            "SELECT seq, entity, entity_id, op, changed_at FROM change_log WHERE seq > ? ORDER BY seq LIMIT ?",
+            (after_seq, limit),
+        ).fetchall()
+    return [ChangeEntry(**dict(row)) for row in rows]
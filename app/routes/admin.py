@@ -3,11 +3,12 @@ from __future__ import annotations
 from pathlib import Path
 from uuid import uuid4
 
-from fastapi import APIRouter, File, Form, Request, UploadFile
-from fastapi.responses import RedirectResponse
-from PIL import Image
+from fastapi import APIRouter, File, Form, HTTPException, Request, UploadFile
+from fastapi.responses import FileResponse, RedirectResponse
 
+from app.concurrency import run_db, run_io
 from app.db import get_conn, init_db
+from app.profiling import list_profiles, load_profile, profile_path
 from app.templating import templates
 from app.repositories import (
     create_stage,
@@ -16,7 +17,8 @@ from app.repositories import (
     list_stages,
     list_steps_by_stage,
 )
-from app.services.ai_content import generate_stage_tutorial
+from app.services.ai_content import generate_stage_tutorial_async
+from app.services.image_resolver import invalidate_static_cache
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -54,54 +56,63 @@ def _save_upload(upload: UploadFile | None, section: str, slot: str) -> str | No
     original_path = folder / f"original{suffix}"
     original_path.write_bytes(raw)
 
+    from PIL import Image
+
     image = Image.open(original_path).convert("RGB")
     image.resize((1120, 480)).save(folder / "lg.jpg", format="JPEG", quality=88, optimize=True)
     image.resize((560, 220)).save(folder / "md.jpg", format="JPEG", quality=86, optimize=True)
     image.resize((560, 220)).save(folder / "md.webp", format="WEBP", quality=82, method=6)
     image.resize((280, 140)).save(folder / "sm.jpg", format="JPEG", quality=82, optimize=True)
     image.resize((280, 140)).save(folder / "sm.webp", format="WEBP", quality=80, method=6)
+    invalidate_static_cache()
 
     return f"img/generated/{section}/{slot}/md.jpg"
 
 
 @router.get("")
-def dashboard(request: Request, message: str = ""):
+async def dashboard(request: Request, message: str = ""):
+    stages = await run_db(list_stages)
     return templates.TemplateResponse(
-        "admin/dashboard.html", {"request": request, "message": message, "stages": list_stages(), "stage_illustration": _stage_illustration}
+        "admin/dashboard.html", {"request": request, "message": message, "stages": stages, "stage_illustration": _stage_illustration}
     )
 
 
 @router.get("/editor")
-def editor(request: Request, stage_id: int | None = None):
-    selected_stage = get_stage(stage_id) if stage_id else None
-    steps = list_steps_by_stage(stage_id) if stage_id else []
+async def editor(request: Request, stage_id: int | None = None):
+    selected_stage = await run_db(get_stage, stage_id) if stage_id else None
+    steps = await run_db(list_steps_by_stage, stage_id) if stage_id else []
+    stages = await run_db(list_stages)
     return templates.TemplateResponse(
         "admin/editor.html",
-        {"request": request, "stages": list_stages(), "selected_stage": selected_stage, "steps": steps},
+        {"request": request, "stages": stages, "selected_stage": selected_stage, "steps": steps},
     )
 
 
 @router.post("/init-db")
-def init_db_action():
-    init_db()
+async def init_db_action():
+    await run_db(init_db)
     return RedirectResponse(url="/admin?message=Base+de+datos+inicializada", status_code=303)
 
 
-@router.post("/seed-demo")
-def seed_demo_action():
+def _init_and_seed() -> None:
     init_db()
     _seed_demo_data()
+
+
+@router.post("/seed-demo")
+async def seed_demo_action():
+    await run_db(_init_and_seed)
     return RedirectResponse(url="/admin?message=Datos+demo+cargados", status_code=303)
 
 
 @router.post("/generate/{stage_id}")
-def generate_action(stage_id: int):
-    stage = get_stage(stage_id)
+async def generate_action(stage_id: int):
+    stage = await run_db(get_stage, stage_id)
     if not stage:
         return RedirectResponse(url="/admin?message=Etapa+no+encontrada", status_code=303)
 
     try:
-        tutorial = generate_stage_tutorial(stage.name)
+        tutorial = await generate_stage_tutorial_async(stage.name)
     except Exception as exc:
         msg = str(exc).replace(" ", "+")
         return RedirectResponse(url=f"/admin?message={msg}", status_code=303)
@@ -127,12 +138,12 @@ def generate_action(stage_id: int):
                 "estimated_cost_usd": step.estimated_cost_usd,
             }
         )
-    replace_steps(stage_id, payload)
+    await run_db(replace_steps, stage_id, payload)
     return RedirectResponse(url="/admin?message=Contenido+IA+generado", status_code=303)
 
 
 @router.post("/editor/stage")
-def create_or_update_stage(
+async def create_or_update_stage(
     stage_id: int | None = Form(default=None),
     name: str = Form(...),
     order_index: int = Form(...),
@@ -146,14 +157,14 @@ def create_or_update_stage(
     img2 = image_card_2.strip() or None
     hero = image_hero.strip() or None
     if stage_id:
-        update_stage(stage_id, name, order_index, img1, img2, hero)
+        await run_db(update_stage, stage_id, name, order_index, img1, img2, hero)
     else:
-        create_stage(name, order_index, img1, img2, hero)
+        await run_db(create_stage, name, order_index, img1, img2, hero)
     return RedirectResponse(url="/admin/editor", status_code=303)
 
 
 @router.post("/editor/step")
-def add_step(
+async def add_step(
     stage_id: int = Form(...),
     title: str = Form(...),
     content: str = Form(...),
@@ -165,34 +176,64 @@ def add_step(
     tools = [item.strip() for item in tools_csv.split(",") if item.strip()]
     stored_image = image.strip() or None
     if image_file and image_file.filename:
-        saved = _save_upload(image_file, "stages", f"step-{uuid4().hex[:8]}")
+        saved = await run_io(_save_upload, image_file, "stages", f"step-{uuid4().hex[:8]}")
         if saved:
             stored_image = saved
-    create_step(stage_id, title, content, tools, estimated_cost_usd, stored_image)
+    await run_db(create_step, stage_id, title, content, tools, estimated_cost_usd, stored_image)
     return RedirectResponse(url=f"/admin/editor?stage_id={stage_id}", status_code=303)
 
 
+def _set_product_image(product_id: int, path: str) -> None:
+    with get_conn() as conn:
+        conn.execute("UPDATE products SET image = ? WHERE id = ?", (path, product_id))
+
+
+def _set_kit_images(kit_id: int, main_path: str | None, result_path: str | None) -> None:
+    with get_conn() as conn:
+        if main_path:
+            conn.execute("UPDATE kits SET image_card = ? WHERE id = ?", (main_path, kit_id))
+        if result_path:
+            conn.execute("UPDATE kits SET image_result = ? WHERE id = ?", (result_path, kit_id))
+
+
 @router.post("/uploads/product/{product_id}")
-def upload_product_image(product_id: int, image_file: UploadFile = File(...)):
-    path = _save_upload(image_file, "products", f"product-{product_id}")
+async def upload_product_image(product_id: int, image_file: UploadFile = File(...)):
+    path = await run_io(_save_upload, image_file, "products", f"product-{product_id}")
     if not path:
         return RedirectResponse(url="/admin?message=Formato+de+imagen+inválido", status_code=303)
-    with get_conn() as conn:
-        conn.execute("UPDATE products SET image = ? WHERE id = ?", (path, product_id))
+    await run_db(_set_product_image, product_id, path)
     return RedirectResponse(url="/admin?message=Imagen+de+producto+actualizada", status_code=303)
 
 
 @router.post("/uploads/kit/{kit_id}")
-def upload_kit_images(
+async def upload_kit_images(
     kit_id: int,
     image_main: UploadFile | None = File(default=None),
     image_result: UploadFile | None = File(default=None),
 ):
-    main_path = _save_upload(image_main, "kits", f"kit-{kit_id}") if image_main else None
-    result_path = _save_upload(image_result, "kits", f"kit-result-{kit_id}") if image_result else None
-    with get_conn() as conn:
-        if main_path:
-            conn.execute("UPDATE kits SET image_card = ? WHERE id = ?", (main_path, kit_id))
-        if result_path:
-            conn.execute("UPDATE kits SET image_result = ? WHERE id = ?", (result_path, kit_id))
+    main_path = await run_io(_save_upload, image_main, "kits", f"kit-{kit_id}") if image_main else None
+    result_path = await run_io(_save_upload, image_result, "kits", f"kit-result-{kit_id}") if image_result else None
+    await run_db(_set_kit_images, kit_id, main_path, result_path)
     return RedirectResponse(url="/admin?message=Imágenes+de+kit+actualizadas", status_code=303)
+
+
+@router.get("/profiles")
+async def profiles(request: Request):
+    rows = await run_io(list_profiles)
+    return templates.TemplateResponse("admin/profiles.html", {"request": request, "profiles": rows, "profile": None})
+
+
+@router.get("/profiles/{profile_id}")
+async def profile_detail(request: Request, profile_id: str):
+    profile = await run_io(load_profile, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return templates.TemplateResponse("admin/profiles.html", {"request": request, "profiles": [], "profile": profile})
+
+
+@router.get("/profiles/{profile_id}/download")
+async def profile_download(profile_id: str):
+    path = profile_path(profile_id, ".prof")
+    if path is None:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+    return FileResponse(path, media_type="application/octet-stream", filename=path.name)
@@ -1,39 +1,277 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException
+from typing import Any, AsyncIterator, Awaitable, Callable
 
-from app.repositories import get_stage, list_stages, list_steps_by_stage, replace_steps
-from app.services.ai_content import generate_stage_tutorial
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 
-router = APIRouter(prefix="/api", tags=["api"])
+from app.concurrency import run_db, run_io
+from app.config import settings
+from app.json_api import FastJSONResponse, dumps, json_response, parse_fields, response_cache, select_fields, strong_etag, to_plain
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, STREAM_CHUNK_SIZE, decode_cursor, encode_cursor
+from app.repositories import (
+    KIT_ORDER,
+    PRODUCT_ORDER,
+    SEARCH_KINDS,
+    STAGE_ORDER,
+    catalog_version,
+    get_stage,
+    get_stages_with_steps,
+    list_changes,
+    keyset_types,
+    keyset_values,
+    list_kits_page,
+    list_products_page,
+    list_stages_page,
+    list_steps_by_stage,
+    replace_steps,
+    search_catalog,
+)
+from app.services.ai_content import generate_stage_tutorial_async
+from app.services.image_resolver import stage_image_bindings
+from app.suggest import suggest_index
+
+router = APIRouter(prefix="/api", tags=["api"], default_response_class=FastJSONResponse)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+BATCH_INCLUDES = frozenset({"steps", "images"})
+SEARCH_MAX_LIMIT = 100
+SUGGEST_MAX_LIMIT = 50
+
+Payload = tuple[Any, dict[str, str]]
+
+
+async def _cached_json(request: Request, build: Callable[[], Awaitable[Payload]], cache: bool = True) -> Response:
+    """Sirve bytes JSON cacheados por (ruta, query, versión de catálogo) con ETag fuerte y 304.
+
+    `cache=False` para respuestas que dependen de algo más que la base (p. ej. imágenes en disco):
+    se construyen siempre, pero mantienen ETag y 304.
+    """
+    key = None
+    cached = None
+    if cache:
+        version = await run_db(catalog_version)
+        key = (settings.db_path, request.url.path, tuple(sorted(request.query_params.multi_items())), version)
+        cached = response_cache.get(key)
+    if cached is None:
+        payload, headers = await build()
+        body = dumps(select_fields(to_plain(payload), parse_fields(request.query_params.get("fields"))))
+        cached = (body, strong_etag(body), headers)
+        if key is not None:
+            response_cache.set(key, cached)
+    body, etag, headers = cached
+    return json_response(request, body, etag, headers)
+
+
+async def _keyset_page(request: Request, fetch: Callable, order: tuple[str, ...], cursor: str | None, limit: int) -> Payload:
+    """Una página como array JSON; si hay más, el cursor va en `X-Next-Cursor` y `Link: rel="next"`."""
+    try:
+        after = decode_cursor(cursor, keyset_types(order))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    items = await run_db(fetch, after, limit + 1)
+    headers: dict[str, str] = {}
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(keyset_values(items[-1], order))
+        headers["X-Next-Cursor"] = next_cursor
+        headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor, limit=limit)}>; rel="next"'
+    return items, headers
+
+
+async def _ndjson_chunks(fetch: Callable, order: tuple[str, ...]) -> AsyncIterator[str]:
+    # Cada chunk es una consulta keyset corta: nunca se materializa el catálogo completo.
+    after = None
+    while True:
+        items = await run_db(fetch, after, STREAM_CHUNK_SIZE)
+        if not items:
+            return
+        yield "".join(item.model_dump_json() + "\n" for item in items)
+        if len(items) < STREAM_CHUNK_SIZE:
+            return
+        after = keyset_values(items[-1], order)
 
 
 @router.get("/health")
-def health():
+async def health():
     return {"ok": True}
 
 
 @router.get("/stages")
-def api_stages():
-    return list_stages()
+async def api_stages(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
+):
+    return await _cached_json(request, lambda: _keyset_page(request, list_stages_page, STAGE_ORDER, cursor, limit))
 
 
-@router.get("/stages/{stage_id}")
-def api_stage_detail(stage_id: int):
-    stage = get_stage(stage_id)
+@router.get("/stages.ndjson")
+async def api_stages_ndjson():
+    return StreamingResponse(_ndjson_chunks(list_stages_page, STAGE_ORDER), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/products")
+async def api_products(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
+):
+    return await _cached_json(request, lambda: _keyset_page(request, list_products_page, PRODUCT_ORDER, cursor, limit))
+
+
+@router.get("/products.ndjson")
+async def api_products_ndjson():
+    return StreamingResponse(_ndjson_chunks(list_products_page, PRODUCT_ORDER), media_type=NDJSON_MEDIA_TYPE)
+
+
+@router.get("/kits")
+async def api_kits(
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: str | None = None,
+):
+    return await _cached_json(request, lambda: _keyset_page(request, list_kits_page, KIT_ORDER, cursor, limit))
+
+
+@router.get("/kits.ndjson")
+async def api_kits_ndjson():
+    return StreamingResponse(_ndjson_chunks(list_kits_page, KIT_ORDER), media_type=NDJSON_MEDIA_TYPE)
+
+
+def _parse_batch_ids(raw: str) -> list[int]:
+    try:
+        ids = [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="ids debe ser una lista de enteros separados por coma") from exc
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="ids no puede estar vacío")
+    if len(ids) > settings.api_batch_max_ids:
+        raise HTTPException(status_code=400, detail=f"Máximo {settings.api_batch_max_ids} etapas por request")
+    return ids
+
+
+def _parse_includes(raw: str | None) -> frozenset[str]:
+    includes = frozenset(part.strip() for part in (raw or "").split(",") if part.strip())
+    unknown = includes - BATCH_INCLUDES
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"include no soportado: {', '.join(sorted(unknown))}")
+    return includes
+
+
+def _batch_images(entries: list[tuple]) -> dict[int, dict[str, object]]:
+    return {stage.id: stage_image_bindings(stage, steps) for stage, steps in entries}
+
+
+async def _stages_batch(ids: list[int], includes: frozenset[str]) -> Payload:
+    entries = await run_db(get_stages_with_steps, ids, "steps" in includes)
+    images = await run_io(_batch_images, entries) if "images" in includes else {}
+    items = []
+    for stage, steps in entries:
+        item: dict[str, object] = {"stage": stage}
+        if "steps" in includes:
+            item["steps"] = steps
+        if "images" in includes:
+            item["images"] = images[stage.id]
+        items.append(item)
+    found = {stage.id for stage, _ in entries}
+    return {"stages": items, "missing": [stage_id for stage_id in ids if stage_id not in found]}, {}
+
+
+@router.get("/stages/batch")
+async def api_stages_batch(request: Request, ids: str, include: str | None = None, fields: str | None = None):
+    stage_ids = _parse_batch_ids(ids)
+    includes = _parse_includes(include)
+    # Las imágenes salen del disco (generate_site_images no toca la base): sin cache por versión.
+    return await _cached_json(request, lambda: _stages_batch(stage_ids, includes), cache="images" not in includes)
+
+
+def _parse_kinds(raw: str | None) -> tuple[str, ...]:
+    kinds = tuple(part.strip() for part in (raw or "").split(",") if part.strip()) or SEARCH_KINDS
+    unknown = set(kinds) - set(SEARCH_KINDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"kind no soportado: {', '.join(sorted(unknown))}")
+    return kinds
+
+
+async def _search(q: str, limit: int, kinds: tuple[str, ...]) -> Payload:
+    hits = await run_db(search_catalog, q, limit, kinds)
+    return {"query": q, "results": hits}, {}
+
+
+@router.get("/search")
+async def api_search(
+    request: Request,
+    q: str = "",
+    limit: int = Query(default=20, ge=1, le=SEARCH_MAX_LIMIT),
+    kind: str | None = None,
+    fields: str | None = None,
+):
+    kinds = _parse_kinds(kind)
+    return await _cached_json(request, lambda: _search(q, limit, kinds))
+
+
+@router.get("/suggest")
+async def api_suggest(q: str = "", limit: int = Query(default=10, ge=1, le=SUGGEST_MAX_LIMIT)):
+    index = suggest_index.fresh()
+    if index is None:
+        index = await run_db(suggest_index.current)
+    return {"query": q, "suggestions": index.complete(q, limit)}
+
+
+async def _changes(since: str | None, limit: int) -> Payload:
+    try:
+        after = decode_cursor(since, (int,))
+        if after and after[0] < 0:
+            raise ValueError("Cursor inválido")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    after_seq = after[0] if after else 0
+    changes = await run_db(list_changes, after_seq, limit + 1)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    last_seq = changes[-1].seq if changes else after_seq
+    return {"changes": changes, "next_cursor": encode_cursor((last_seq,)), "has_more": has_more}, {}
+
+
+@router.get("/changes")
+async def api_changes(
+    request: Request,
+    since: str | None = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE * 5, ge=1, le=MAX_PAGE_SIZE),
+):
+    """Feed de cambios: guardar `next_cursor` y pedir `?since=<next_cursor>` en la siguiente corrida.
+
+    Solo incluye cambios posteriores a la migración de `change_log`: sincronizar primero el catálogo completo
+    (`/api/stages`, `/api/products`, `/api/kits`) y recién después seguir el feed desde `since` vacío.
+    """
+    return await _cached_json(request, lambda: _changes(since, limit))
+
+
+async def _stage_detail(stage_id: int) -> Payload:
+    stage = await run_db(get_stage, stage_id)
     if not stage:
         raise HTTPException(status_code=404, detail="Etapa no encontrada")
-    steps = list_steps_by_stage(stage_id)
-    return {"stage": stage, "steps": steps}
+    steps = await run_db(list_steps_by_stage, stage_id)
+    return {"stage": stage, "steps": steps}, {}
+
+
+@router.get("/stages/{stage_id}")
+async def api_stage_detail(request: Request, stage_id: int, fields: str | None = None):
+    return await _cached_json(request, lambda: _stage_detail(stage_id))
 
 
 @router.post("/generate/stage/{stage_id}")
-def api_generate(stage_id: int):
-    stage = get_stage(stage_id)
+async def api_generate(stage_id: int):
+    stage = await run_db(get_stage, stage_id)
     if not stage:
         raise HTTPException(status_code=404, detail="Etapa no encontrada")
 
-    tutorial = generate_stage_tutorial(stage.name)
+    tutorial = await generate_stage_tutorial_async(stage.name)
     steps = []
     for step in tutorial.steps:
         content_lines = [f"Objetivo: {step.objective}", "", "Instrucciones:"]
@@ -54,5 +292,5 @@ def api_generate(stage_id: int):
             }
         )
 
-    replace_steps(stage_id, steps)
+    await run_db(replace_steps, stage_id, steps)
     return {"ok": True, "stage_id": stage_id, "generated_steps": len(steps)}
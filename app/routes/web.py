@@ -5,9 +5,24 @@ from pathlib import Path
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import HTMLResponse
 
+from app.concurrency import run_db, run_io
+from app.fragment_cache import fragment_key
 from app.templating import templates
 
-from app.repositories import get_product, get_stage, list_kits, list_products, list_stages, list_steps_by_stage
+from app.repositories import (
+    get_kit,
+    get_product,
+    get_stage,
+    list_kits,
+    list_kits_page,
+    list_products,
+    list_products_page,
+    list_stages,
+    list_stages_page,
+    list_steps_by_stage,
+    products_for_tool_slugs,
+    search_catalog,
+)
 from app.services.image_resolver import (
     entity_slot,
     build_picture_sources,
@@ -20,6 +35,7 @@ from app.services.image_resolver import (
     stage_list_images,
     step_image_cards,
 )
+from app.services.tool_index import tool_slug
 
 router = APIRouter()
 
@@ -44,155 +60,199 @@ def _home_images() -> dict[str, str]:
     }
 
 
-@router.get("/")
-def home(request: Request):
-    return templates.TemplateResponse("home.html", {"request": request, "img": _home_images()})
-
-
-@router.get("/stages")
-def stages(request: Request):
-    stage_rows = []
-    for stage in list_stages():
-        stage_rows.append(
-            {
-                "id": stage.id,
-                "name": stage.name,
-                "order_index": stage.order_index,
-                "images": stage_list_images(stage),
-                "image_variants": {k: build_picture_sources(v) for k, v in stage_list_images(stage).items()},
-            }
-        )
-    return templates.TemplateResponse("stage_list.html", {"request": request, "stages": stage_rows, "hero_path": resolve_static_path("stages", "hero", "md")})
-
-
-@router.get("/stages/{stage_id}")
-def stage_detail(stage_id: int, request: Request):
-    stage = get_stage(stage_id)
-    if not stage:
-        raise HTTPException(status_code=404, detail="Etapa no encontrada")
-    steps = list_steps_by_stage(stage_id)
-    step_rows = []
+def _stage_rows(stages) -> list[dict[str, object]]:
+    rows = []
+    for stage in stages:
+        images = stage_list_images(stage)
+        row = {
+            "id": stage.id,
+            "name": stage.name,
+            "order_index": stage.order_index,
+            "step_count": stage.step_count,
+            "total_cost_usd": stage.total_cost_usd,
+            "images": images,
+            "image_variants": {k: build_picture_sources(v) for k, v in images.items()},
+        }
+        row["cache_key"] = fragment_key("stage-card", row)
+        rows.append(row)
+    return rows
+
+
+def _step_rows(stage, steps, tool_products=None) -> list[dict[str, object]]:
+    tool_products = tool_products or {}
+    rows = []
     for step in steps:
         cards = step_image_cards(step, stage=stage)
-        step_rows.append(
+        rows.append(
             {
                 "id": step.id,
                 "title": step.title,
                 "content": step.content,
                 "tools_json": step.tools_json,
+                "tool_links": [{"name": tool, "products": tool_products.get(tool_slug(tool), [])} for tool in step.tools_json],
                 "estimated_cost_usd": step.estimated_cost_usd,
                 "image_cards": cards,
                 "image_variants": {"card_1": build_picture_sources(cards["card_1"]), "card_2": build_picture_sources(cards["card_2"])},
             }
         )
+    return rows
+
+
+def _product_rows(products) -> list[dict[str, object]]:
+    rows = []
+    for product in products:
+        image_path = product_image(product)
+        row = {
+            "id": product.id,
+            "name": product.name,
+            "category": product.category,
+            "price": product.price,
+            "affiliate_url": product.affiliate_url,
+            "internal_product": product.internal_product,
+            "image_path": image_path,
+            "image_variants": build_picture_sources(image_path),
+        }
+        row["cache_key"] = fragment_key("product-card", row)
+        rows.append(row)
+    return rows
+
+
+def _kit_rows(kits) -> list[dict[str, object]]:
+    rows = []
+    for kit in kits:
+        image_path = kit_card_image(kit)
+        result_image_path = kit_result_image(kit)
+        row = {
+            "id": kit.id,
+            "name": kit.name,
+            "description": kit.description,
+            "price": kit.price,
+            "components_json": kit.components_json,
+            "image_path": image_path,
+            "result_image_path": result_image_path,
+            "image_variants": build_picture_sources(image_path),
+            "result_image_variants": build_picture_sources(result_image_path),
+        }
+        row["cache_key"] = fragment_key("kit-card", row)
+        rows.append(row)
+    return rows
+
+
+def _hero(section: str) -> tuple[str, dict[str, str | None]]:
+    hero_path = resolve_static_path(section, "hero", "md")
+    return hero_path, build_picture_sources(hero_path)
+
+
+def _stage_hero(stage) -> tuple[str, dict[str, str | None]]:
+    hero_path = stage_hero_image(stage)
+    return hero_path, build_picture_sources(hero_path)
+
+
+def _product_image(product) -> tuple[str, dict[str, str | None]]:
+    image_path = product_image(product)
+    return image_path, build_picture_sources(image_path)
+
+
+@router.get("/")
+async def home(request: Request):
+    images = await run_io(_home_images)
+    return templates.TemplateResponse("home.html", {"request": request, "img": images})
+
+
+@router.get("/stages")
+async def stages(request: Request):
+    stage_rows = await run_io(_stage_rows, await run_db(list_stages))
+    hero_path, _ = await run_io(_hero, "stages")
+    return templates.TemplateResponse("stage_list.html", {"request": request, "stages": stage_rows, "hero_path": hero_path})
+
+
+@router.get("/stages/{stage_id}")
+async def stage_detail(stage_id: int, request: Request):
+    stage = await run_db(get_stage, stage_id)
+    if not stage:
+        raise HTTPException(status_code=404, detail="Etapa no encontrada")
+    steps = await run_db(list_steps_by_stage, stage_id)
+    tool_products = await run_db(products_for_tool_slugs, [tool_slug(tool) for step in steps for tool in step.tools_json])
+    step_rows = await run_io(_step_rows, stage, steps, tool_products)
+    stage_image_path, stage_image_variants = await run_io(_stage_hero, stage)
     return templates.TemplateResponse(
         "stage_detail.html",
         {
             "request": request,
             "stage": stage,
             "steps": step_rows,
-            "stage_image_path": stage_hero_image(stage),
-            "stage_image_variants": build_picture_sources(stage_hero_image(stage)),
+            "stage_image_path": stage_image_path,
+            "stage_image_variants": stage_image_variants,
         },
     )
 
 
 @router.get("/products")
-def products(request: Request):
-    product_rows = []
-    for product in list_products():
-        image_path = product_image(product)
-        product_rows.append(
-            {
-                "id": product.id,
-                "name": product.name,
-                "category": product.category,
-                "price": product.price,
-                "affiliate_url": product.affiliate_url,
-                "internal_product": product.internal_product,
-                "image_path": image_path,
-                "image_variants": build_picture_sources(image_path),
-            }
-        )
-    hero_path = resolve_static_path("products", "hero", "md")
+async def products(request: Request):
+    product_rows = await run_io(_product_rows, await run_db(list_products))
+    hero_path, hero_variants = await run_io(_hero, "products")
     return templates.TemplateResponse(
         "product_list.html",
-        {"request": request, "products": product_rows, "hero_path": hero_path, "hero_variants": build_picture_sources(hero_path)},
+        {"request": request, "products": product_rows, "hero_path": hero_path, "hero_variants": hero_variants},
     )
 
 
 @router.get("/products/{product_id}")
-def product_detail(product_id: int, request: Request):
-    product = get_product(product_id)
+async def product_detail(product_id: int, request: Request):
+    product = await run_db(get_product, product_id)
     if not product:
         raise HTTPException(status_code=404, detail="Producto no encontrado")
 
-    image_path = product_image(product)
+    image_path, image_variants = await run_io(_product_image, product)
     return templates.TemplateResponse(
         "product_detail.html",
-        {"request": request, "product": product, "image_path": image_path, "image_variants": build_picture_sources(image_path)},
+        {"request": request, "product": product, "image_path": image_path, "image_variants": image_variants},
     )
 
 
 @router.get("/kits")
-def kits(request: Request):
-    kit_rows = []
-    for kit in list_kits():
-        kit_rows.append(
-            {
-                "id": kit.id,
-                "name": kit.name,
-                "description": kit.description,
-                "price": kit.price,
-                "components_json": kit.components_json,
-                "image_path": kit_card_image(kit),
-                "result_image_path": kit_result_image(kit),
-                "image_variants": build_picture_sources(kit_card_image(kit)),
-                "result_image_variants": build_picture_sources(kit_result_image(kit)),
-            }
-        )
-    hero_path = resolve_static_path("kits", "hero", "md")
-    return templates.TemplateResponse("kit_list.html", {"request": request, "kits": kit_rows, "hero_path": hero_path, "hero_variants": build_picture_sources(hero_path)})
+async def kits(request: Request):
+    kit_rows = await run_io(_kit_rows, await run_db(list_kits))
+    hero_path, hero_variants = await run_io(_hero, "kits")
+    return templates.TemplateResponse("kit_list.html", {"request": request, "kits": kit_rows, "hero_path": hero_path, "hero_variants": hero_variants})
 
 
-@router.get("/debug/image-bindings")
-def debug_image_bindings(request: Request, stage_id: int | None = None, kit_id: int | None = None):
+@router.get("/search")
+async def search(request: Request, q: str = ""):
+    results = await run_db(search_catalog, q, 50) if q.strip() else []
+    return templates.TemplateResponse("search.html", {"request": request, "title": "Buscar", "q": q, "results": results})
+
+
+def _image_bindings_payload(request: Request, stage, steps, kit) -> dict[str, object]:
     rows: list[dict[str, object]] = []
 
-    if stage_id is not None:
-        stage = get_stage(stage_id)
-        if not stage:
-            raise HTTPException(status_code=404, detail="Etapa no encontrada")
+    if stage is not None:
         stage_slot = entity_slot("stage", stage.id, stage.name)
         rows.append({"entity": f"stage:{stage.id}", "kind": "hero", **resolution_debug("stages", stage_slot, stage.image_hero)})
         rows.append({"entity": f"stage:{stage.id}", "kind": "card-1", **resolution_debug("stages", f"{stage_slot}-card-1", stage.image_card_1)})
         rows.append({"entity": f"stage:{stage.id}", "kind": "card-2", **resolution_debug("stages", f"{stage_slot}-card-2", stage.image_card_2)})
 
-        for step in list_steps_by_stage(stage_id):
+        for step in steps:
             step_slot = entity_slot("step", step.id, step.title)
             debug_row = resolution_debug("stages", step_slot, step.image)
             rows.append({"entity": f"step:{step.id}", "kind": "step", **debug_row})
 
-    if kit_id is not None:
-        kit = next((item for item in list_kits() if item.id == kit_id), None)
-        if not kit:
-            raise HTTPException(status_code=404, detail="Kit no encontrado")
+    if kit is not None:
         kit_slot = entity_slot("kit", kit.id, kit.name)
         result_slot = entity_slot("kit-result", kit.id, kit.name)
         rows.append({"entity": f"kit:{kit.id}", "kind": "main", **resolution_debug("kits", kit_slot, kit.image_card)})
         rows.append({"entity": f"kit:{kit.id}", "kind": "result", **resolution_debug("kits", result_slot, kit.image_result)})
 
-    if stage_id is None and kit_id is None:
+    if stage is None and kit is None:
         return {"hint": "Pasá stage_id y/o kit_id en query params", "rows": rows}
 
     for row in rows:
-        row["public_url"] = _static_url(request, row["selected_path"])
+        row["public_url"] = _static_url(request, row["chosen"])
 
-    return {"stage_id": stage_id, "kit_id": kit_id, "rows": rows}
+    return {"stage_id": getattr(stage, "id", None), "kit_id": getattr(kit, "id", None), "rows": rows}
 
 
-@router.get("/debug/static-check")
-def debug_static_check(request: Request):
+def _static_check_html(request: Request, stage, product, kit) -> str:
     generated_root = Path("app/static/img/generated")
     sections = ["home", "stages", "products", "kits"]
     files = []
@@ -218,12 +278,7 @@ def debug_static_check(request: Request):
             total_bytes += size
 
     expected_examples: list[dict[str, str]] = []
-    stages_rows = list_stages()
-    product_rows = list_products()
-    kit_rows = list_kits()
-
-    if stages_rows:
-        stage = stages_rows[0]
+    if stage is not None:
         stage_slot = entity_slot("stage", stage.id, stage.name)
         expected_examples.extend(
             [
@@ -231,12 +286,10 @@ def debug_static_check(request: Request):
                 {"label": f"stage:{stage.id} lg", "path": f"img/generated/stages/{stage_slot}/lg.webp"},
             ]
         )
-    if product_rows:
-        product = product_rows[0]
+    if product is not None:
         product_slot = entity_slot("product", product.id, product.name)
         expected_examples.append({"label": f"product:{product.id} md", "path": f"img/generated/products/{product_slot}/md.webp"})
-    if kit_rows:
-        kit = kit_rows[0]
+    if kit is not None:
         kit_slot = entity_slot("kit", kit.id, kit.name)
         kit_result_slot = entity_slot("kit-result", kit.id, kit.name)
         expected_examples.extend(
@@ -296,4 +349,29 @@ def debug_static_check(request: Request):
             f"<img src='{url}' alt='{item['relative']}' width='260' loading='lazy'></li><br>"
         )
     html_parts.extend(["</ul>", "</body></html>"])
-    return HTMLResponse("".join(html_parts))
+    return "".join(html_parts)
+
+
+@router.get("/debug/image-bindings")
+async def debug_image_bindings(request: Request, stage_id: int | None = None, kit_id: int | None = None):
+    stage, steps, kit = None, [], None
+    if stage_id is not None:
+        stage = await run_db(get_stage, stage_id)
+        if not stage:
+            raise HTTPException(status_code=404, detail="Etapa no encontrada")
+        steps = await run_db(list_steps_by_stage, stage_id)
+    if kit_id is not None:
+        kit = await run_db(get_kit, kit_id)
+        if not kit:
+            raise HTTPException(status_code=404, detail="Kit no encontrado")
+    # Filas por el pool de SQLite; la resolución de imágenes (stat de archivos) por el de I/O.
+    return await run_io(_image_bindings_payload, request, stage, steps, kit)
+
+
+@router.get("/debug/static-check")
+async def debug_static_check(request: Request):
+    # Primera fila de cada listado (mismo orden que las páginas) por el pool de SQLite; el recorrido de archivos por el de I/O.
+    stage = next(iter(await run_db(list_stages_page, None, 1)), None)
+    product = next(iter(await run_db(list_products_page, None, 1)), None)
+    kit = next(iter(await run_db(list_kits_page, None, 1)), None)
+    return HTMLResponse(await run_io(_static_check_html, request, stage, product, kit))
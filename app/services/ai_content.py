@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import json
-
-from openai import OpenAI
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Iterator
 
 from app.config import settings
+from app.metrics import AI_REQUEST_DURATION, AI_REQUEST_ERRORS
 from app.models import AIStageTutorial
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
 BASE_PROMPT = """
 Sos un experto en cultivo indoor de hongos gourmet (Ostra y Melena de León).
 Generá contenido educativo para la etapa: "{stage_name}".
@@ -31,29 +36,77 @@ Devolvé SOLO JSON válido sin markdown y sin comentarios, con esta forma exacta
 def _client() -> OpenAI:
     if not settings.openai_api_key:
         raise ValueError("Falta OPENAI_API_KEY. Configurala en el archivo .env")
+    # El SDK pesa ~0.5 s de import: se carga recién en la primera generación.
+    from openai import OpenAI
+
     return OpenAI(api_key=settings.openai_api_key)
 
 
+def _async_client() -> AsyncOpenAI:
+    if not settings.openai_api_key:
+        raise ValueError("Falta OPENAI_API_KEY. Configurala en el archivo .env")
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=settings.openai_api_key)
+
+
+def _stage_prompt(stage_name: str) -> str:
+    # `str.format` no sirve: el ejemplo JSON del prompt tiene llaves literales.
+    return BASE_PROMPT.replace("{stage_name}", stage_name)
+
+
+def _repair_prompt(raw_text: str) -> str:
+    return (
+        "El JSON anterior no fue válido. Reparalo y devolvé SOLO JSON válido "
+        "con la estructura solicitada, sin texto extra. JSON a reparar:\n"
+        f"{raw_text}"
+    )
+
+
 def _parse_or_raise(text: str) -> AIStageTutorial:
     payload = json.loads(text)
     return AIStageTutorial.model_validate(payload)
 
 
+@contextmanager
+def _observed(operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception as exc:
+        AI_REQUEST_ERRORS.inc(operation=operation, error=type(exc).__name__)
+        raise
+    finally:
+        AI_REQUEST_DURATION.observe(time.perf_counter() - started, operation=operation)
+
+
 def generate_stage_tutorial(stage_name: str) -> AIStageTutorial:
     """Genera tutorial por etapa; reintenta una vez con prompt de reparación."""
-    client = _client()
-    prompt = BASE_PROMPT.format(stage_name=stage_name)
+    with _observed("stage_tutorial"):
+        client = _client()
+        prompt = _stage_prompt(stage_name)
 
-    response = client.responses.create(model=settings.openai_model, input=prompt)
-    raw_text = response.output_text
+        response = client.responses.create(model=settings.openai_model, input=prompt)
+        raw_text = response.output_text
 
-    try:
-        return _parse_or_raise(raw_text)
-    except Exception:
-        repair_prompt = (
-            "El JSON anterior no fue válido. Reparalo y devolvé SOLO JSON válido "
-            "con la estructura solicitada, sin texto extra. JSON a reparar:\n"
-            f"{raw_text}"
-        )
-        repaired = client.responses.create(model=settings.openai_model, input=repair_prompt)
-        return _parse_or_raise(repaired.output_text)
+        try:
+            return _parse_or_raise(raw_text)
+        except Exception:
+            repaired = client.responses.create(model=settings.openai_model, input=_repair_prompt(raw_text))
+            return _parse_or_raise(repaired.output_text)
+
+
+async def generate_stage_tutorial_async(stage_name: str) -> AIStageTutorial:
+    """Variante async para los handlers: no ocupa un hilo mientras espera a OpenAI."""
+    with _observed("stage_tutorial"):
+        prompt = _stage_prompt(stage_name)
+        # `async with` cierra el pool httpx del cliente al terminar la generación.
+        async with _async_client() as client:
+            response = await client.responses.create(model=settings.openai_model, input=prompt)
+            raw_text = response.output_text
+
+            try:
+                return _parse_or_raise(raw_text)
+            except Exception:
+                repaired = await client.responses.create(model=settings.openai_model, input=_repair_prompt(raw_text))
+                return _parse_or_raise(repaired.output_text)
@@ -1,9 +1,15 @@
 from __future__ import annotations
 
 import re
+import threading
+import time
 import unicodedata
 from pathlib import Path
 
+from app.config import settings
+from app.metrics import IMAGE_RESOLVER_CACHE
+from app.timing import timed
+
 ROOT = Path(__file__).resolve().parents[2]
 STATIC_ROOT = ROOT / "app" / "static"
 PLACEHOLDER_STATIC_PATH = "img/placeholder.svg"
@@ -40,11 +46,38 @@ def entity_slot(prefix: str, entity_id: int | None, label: str | None) -> str:
     return f"{prefix}-{slug}-{safe_id}" if slug else f"{prefix}-{safe_id}"
 
 
-def _existing_static_path(path: str) -> bool:
+# Cache de existencia de archivos: path -> (expira_en, existe). Evita un stat por candidato en cada request.
+_exists_cache: dict[str, tuple[float, bool]] = {}
+_exists_lock = threading.Lock()
+
+
+def _stat_static_path(path: str) -> bool:
     candidate = STATIC_ROOT / path
     return candidate.exists() and candidate.stat().st_size > 0
 
 
+def _existing_static_path(path: str) -> bool:
+    ttl = settings.image_exists_cache_ttl
+    if ttl <= 0:
+        return _stat_static_path(path)
+    now = time.monotonic()
+    cached = _exists_cache.get(path)
+    if cached is not None and cached[0] > now:
+        IMAGE_RESOLVER_CACHE.inc(result="hit")
+        return cached[1]
+    IMAGE_RESOLVER_CACHE.inc(result="miss")
+    exists = _stat_static_path(path)
+    with _exists_lock:
+        _exists_cache[path] = (now + ttl, exists)
+    return exists
+
+
+def invalidate_static_cache() -> None:
+    """Descarta el cache de existencia (p. ej. tras subir o generar imágenes)."""
+    with _exists_lock:
+        _exists_cache.clear()
+
+
 def _generated_candidates(section: str, slot: str, sizes: tuple[str, ...]) -> list[str]:
     rows: list[str] = []
     for size in sizes:
@@ -76,6 +109,7 @@ def _section_fallback(section: str) -> str:
     return SECTION_DEFAULT_PLACEHOLDERS.get(section, PLACEHOLDER_STATIC_PATH)
 
 
+@timed("img")
 def resolve_static_path(section: str, slot: str, size: str = "md", fallback: str | None = None, raw_path: str | None = None) -> str:
     size_chain = (size, "md", "lg", "sm")
     ordered_sizes = tuple(dict.fromkeys(size_chain))
@@ -98,6 +132,7 @@ def resolve_static_path(section: str, slot: str, size: str = "md", fallback: str
     return slot_fallback
 
 
+@timed("img")
 def build_picture_sources(path: str) -> dict[str, str | None]:
     if path.endswith(".webp"):
         fallback = next((path[:-5] + ext for ext in (".jpg", ".png", ".jpeg", ".svg") if _existing_static_path(path[:-5] + ext)), path)
@@ -138,6 +173,15 @@ def step_image_cards(step, stage=None) -> dict[str, str]:
     return {"card_1": card_1, "card_2": card_2}
 
 
+def stage_image_bindings(stage, steps=()) -> dict[str, object]:
+    """Todas las imágenes de una etapa y sus pasos en una pasada (para la API batch)."""
+    return {
+        "hero": stage_hero_image(stage),
+        **stage_list_images(stage),
+        "steps": {str(step.id): step_image_cards(step, stage=stage) for step in steps},
+    }
+
+
 def step_image(step, stage=None) -> str:
     return step_image_cards(step, stage=stage)["card_1"]
 
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+from collections import defaultdict
+
+from app.models import Product
+from app.repositories import list_distinct_tools, list_products, replace_tool_products
+from app.services.image_resolver import slugify
+
+# Palabras que no identifican un producto ("Bolsas con filtro" ~ "Bolsas filtro x50").
+STOPWORDS = frozenset({"a", "al", "con", "de", "del", "el", "en", "la", "las", "los", "para", "por", "sin", "un", "una", "y"})
+# Fracción de tokens de la herramienta que debe aparecer en el nombre del producto.
+MIN_OVERLAP = 0.5
+MAX_PRODUCTS_PER_TOOL = 3
+
+
+def tool_slug(tool: str) -> str:
+    return slugify(tool)
+
+
+def tokens(text: str) -> tuple[str, ...]:
+    return tuple(dict.fromkeys(token for token in slugify(text).split("-") if token and token not in STOPWORDS))
+
+
+def build_tool_product_rows(tools: list[str], products: list[Product]) -> list[tuple[str, int, float, int]]:
+    """Índice invertido token -> productos; por herramienta guarda los mejores por solapamiento de tokens.
+
+    Devuelve filas (tool_slug, product_id, score, position). A igual score gana el nombre más
+    específico (menos tokens), después el más barato.
+    """
+    inverted: dict[str, list[int]] = defaultdict(list)
+    product_tokens: dict[int, int] = {}
+    by_id: dict[int, Product] = {}
+    for product in products:
+        if product.id is None:
+            continue
+        name_tokens = tokens(product.name)
+        product_tokens[product.id] = len(name_tokens)
+        by_id[product.id] = product
+        for token in name_tokens:
+            inverted[token].append(product.id)
+
+    rows: list[tuple[str, int, float, int]] = []
+    seen_slugs: set[str] = set()
+    for tool in tools:
+        slug = tool_slug(tool)
+        tool_tokens = tokens(tool)
+        if not slug or not tool_tokens or slug in seen_slugs:
+            continue
+        seen_slugs.add(slug)
+        overlap: dict[int, int] = defaultdict(int)
+        for token in tool_tokens:
+            for product_id in inverted.get(token, ()):
+                overlap[product_id] += 1
+        scored = [
+            (count / len(tool_tokens), product_id)
+            for product_id, count in overlap.items()
+            if count / len(tool_tokens) >= MIN_OVERLAP
+        ]
+        scored.sort(key=lambda item: (-item[0], product_tokens[item[1]], by_id[item[1]].price, item[1]))
+        rows.extend(
+            (slug, product_id, round(score, 4), position)
+            for position, (score, product_id) in enumerate(scored[:MAX_PRODUCTS_PER_TOOL])
+        )
+    return rows
+
+
+def rebuild_tool_index() -> dict[str, int]:
+    """Job offline: recalcula la tabla `tool_products` completa a partir de pasos y productos."""
+    tools = list_distinct_tools()
+    rows = build_tool_product_rows(tools, list_products())
+    replace_tool_products(rows)
+    return {"tools": len(tools), "tools_matched": len({row[0] for row in rows}), "links": len(rows)}
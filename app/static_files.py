@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import json
+import mimetypes
+import os
+import time
+from pathlib import Path
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+STATIC_DIR = Path("app/static")
+DIST_PREFIX = "dist/"
+ASSET_MANIFEST_PATH = STATIC_DIR / "dist" / "manifest.json"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+MANIFEST_RECHECK_SECONDS = 1.0
+
+_manifest_cache: dict[str, object] = {"path": None, "mtime": None, "checked_at": 0.0, "assets": {}}
+
+
+def _load_asset_manifest() -> dict[str, str]:
+    now = time.monotonic()
+    if _manifest_cache["path"] == ASSET_MANIFEST_PATH and now - _manifest_cache["checked_at"] < MANIFEST_RECHECK_SECONDS:
+        return _manifest_cache["assets"]  # type: ignore[return-value]
+    _manifest_cache.update(path=ASSET_MANIFEST_PATH, checked_at=now)
+    try:
+        mtime = ASSET_MANIFEST_PATH.stat().st_mtime_ns
+    except OSError:
+        _manifest_cache.update(mtime=None, assets={})
+        return {}
+    if _manifest_cache["mtime"] != mtime:
+        payload = json.loads(ASSET_MANIFEST_PATH.read_text(encoding="utf-8"))
+        _manifest_cache.update(mtime=mtime, assets=dict(payload.get("assets", {})))
+    return _manifest_cache["assets"]  # type: ignore[return-value]
+
+
+def asset_manifest_token() -> str:
+    """Identifica la versión vigente del manifest (sirve para invalidar HTML cacheado)."""
+    _load_asset_manifest()
+    return str(_manifest_cache["mtime"] or "0")
+
+
+def hashed_asset_path(path: str) -> str:
+    """Devuelve la ruta con hash de contenido si el asset figura en el manifest del build."""
+    return _load_asset_manifest().get(path, path)
+
+
+def _accepted_encodings(headers: Headers) -> set[str]:
+    accepted: set[str] = set()
+    for item in headers.get("accept-encoding", "").split(","):
+        token, _, params = item.strip().partition(";")
+        if not token:
+            continue
+        if params.strip().replace(" ", "") in {"q=0", "q=0.0", "q=0.00", "q=0.000"}:
+            continue
+        accepted.add(token.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """StaticFiles que sirve hermanos `.br`/`.gz` según Accept-Encoding y cachea assets con hash."""
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike[str],
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        served_path = str(full_path)
+        served_stat = stat_result
+        encoding: str | None = None
+
+        accepted = _accepted_encodings(request_headers)
+        for name, suffix in ENCODINGS:
+            if name not in accepted and "*" not in accepted:
+                continue
+            try:
+                candidate_stat = os.stat(served_path + suffix)
+            except OSError:
+                continue
+            served_path, served_stat, encoding = served_path + suffix, candidate_stat, name
+            break
+
+        media_type, _ = mimetypes.guess_type(str(full_path))
+        response = FileResponse(served_path, status_code=status_code, stat_result=served_stat, media_type=media_type)
+        if encoding:
+            response.headers["content-encoding"] = encoding
+        if encoding or any(os.path.exists(str(full_path) + suffix) for _, suffix in ENCODINGS):
+            response.headers["vary"] = "Accept-Encoding"
+        if self.get_path(scope).replace(os.sep, "/").startswith(DIST_PREFIX):
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
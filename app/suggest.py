@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from app.config import settings
+from app.repositories import catalog_version, suggestion_sources
+from app.text import normalize
+
+SUGGEST_KINDS = ("product", "kit", "step", "tool")
+
+
+class PrefixIndex:
+    """Arrays ordenados de claves normalizadas + bisect.
+
+    `head_keys` tiene la etiqueta completa y `word_keys` cada sufijo que empieza en una palabra
+    interna ("sustrato 236" para "Kit sustrato 236"): primero se completan coincidencias desde el
+    inicio y después las de palabras internas, ambas en orden alfabético.
+    """
+
+    def __init__(self, entries: list[tuple[str, str]]) -> None:
+        self.labels: list[str] = []
+        self.kinds = array("B")
+        seen: set[tuple[str, str]] = set()
+        heads: list[tuple[str, int]] = []
+        words: list[tuple[str, int]] = []
+        for label, kind in entries:
+            label = " ".join(label.split())
+            if not label or (label, kind) in seen:
+                continue
+            seen.add((label, kind))
+            label_id = len(self.labels)
+            self.labels.append(label)
+            self.kinds.append(SUGGEST_KINDS.index(kind))
+            parts = normalize(label).split(" ")
+            heads.append((" ".join(parts), label_id))
+            words.extend((" ".join(parts[position:]), label_id) for position in range(1, len(parts)))
+        heads.sort()
+        words.sort()
+        self.head_keys = [key for key, _ in heads]
+        self.head_refs = array("I", (label_id for _, label_id in heads))
+        self.word_keys = [key for key, _ in words]
+        self.word_refs = array("I", (label_id for _, label_id in words))
+
+    def __len__(self) -> int:
+        return len(self.head_keys) + len(self.word_keys)
+
+    @staticmethod
+    def _scan(keys: list[str], refs: array, needle: str, limit: int, found: dict[int, None]) -> None:
+        index = bisect_left(keys, needle)
+        while index < len(keys) and len(found) < limit and keys[index].startswith(needle):
+            found.setdefault(refs[index])
+            index += 1
+
+    def complete(self, prefix: str, limit: int = 10) -> list[dict[str, str]]:
+        needle = normalize(prefix)
+        if not needle or limit <= 0:
+            return []
+        found: dict[int, None] = {}
+        self._scan(self.head_keys, self.head_refs, needle, limit, found)
+        self._scan(self.word_keys, self.word_refs, needle, limit, found)
+        return [{"label": self.labels[label_id], "kind": SUGGEST_KINDS[self.kinds[label_id]]} for label_id in found]
+
+    def memory_bytes(self) -> int:
+        """Tamaño aproximado en memoria: contenedores más cada string."""
+        containers = (self.head_keys, self.head_refs, self.word_keys, self.word_refs, self.labels, self.kinds)
+        total = sum(sys.getsizeof(container) for container in containers)
+        total += sum(sys.getsizeof(key) for key in self.head_keys)
+        total += sum(sys.getsizeof(key) for key in self.word_keys)
+        total += sum(sys.getsizeof(label) for label in self.labels)
+        return total
+
+
+class SuggestIndex:
+    """Índice por base de datos que se reconstruye cuando cambia `catalog_state.version`.
+
+    Solo la primera construcción es síncrona. Después, si la versión cambió, se sigue sirviendo el
+    índice anterior y la reconstrucción corre en un hilo aparte; al terminar se reemplaza. La versión
+    se consulta como mucho cada `SUGGEST_RECHECK_MS`; en el medio `fresh()` sirve el índice sin tocar SQLite.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._built: dict[str, tuple[int, PrefixIndex]] = {}
+        self._checked: dict[str, float] = {}
+        self._rebuilding: dict[str, threading.Thread] = {}
+
+    def fresh(self) -> PrefixIndex | None:
+        """Índice ya armado si la versión se verificó hace menos de `SUGGEST_RECHECK_MS`; si no, None."""
+        path = settings.db_path
+        built = self._built.get(path)
+        checked = self._checked.get(path)
+        if built is None or checked is None or time.monotonic() - checked >= settings.suggest_recheck_ms / 1000:
+            return None
+        return built[1]
+
+    def current(self) -> PrefixIndex:
+        index = self.fresh()
+        if index is not None:
+            return index
+        path = settings.db_path
+        version = catalog_version()
+        self._checked[path] = time.monotonic()
+        built = self._built.get(path)
+        if built is None:
+            with self._lock:
+                built = self._built.get(path)
+                if built is None:
+                    built = self._built[path] = (version, PrefixIndex(suggestion_sources()))
+            return built[1]
+        if built[0] != version:
+            self._rebuild_in_background(path)
+        return built[1]
+
+    def _rebuild_in_background(self, path: str) -> None:
+        with self._lock:
+            if path in self._rebuilding:
+                return
+            thread = threading.Thread(target=self._rebuild, args=(path,), name="suggest-rebuild", daemon=True)
+            self._rebuilding[path] = thread
+        thread.start()
+
+    def _rebuild(self, path: str) -> None:
+        try:
+            # La versión se lee antes que las fuentes: si hay otra escritura en el medio, el próximo pedido reconstruye de nuevo.
+            version = catalog_version()
+            index = PrefixIndex(suggestion_sources())
+            with self._lock:
+                if settings.db_path == path:
+                    self._built[path] = (version, index)
+        finally:
+            with self._lock:
+                self._rebuilding.pop(path, None)
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Espera las reconstrucciones en curso (tests, scripts)."""
+        for thread in list(self._rebuilding.values()):
+            thread.join(timeout)
+
+    def clear(self) -> None:
+        self.wait()
+        with self._lock:
+            self._built.clear()
+            self._checked.clear()
+
+
+suggest_index = SuggestIndex()
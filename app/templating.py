@@ -1,20 +1,64 @@
 from __future__ import annotations
 
+from pathlib import Path
+
 from fastapi.templating import Jinja2Templates
-from jinja2 import pass_context
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, pass_context
+
+from app.config import settings
+from app.fragment_cache import FragmentCacheExtension
+from app.static_files import hashed_asset_path
+from app.timing import phase
+
+TEMPLATES_DIR = "app/templates"
+
+
+class TimedJinja2Templates(Jinja2Templates):
+    def TemplateResponse(self, *args, **kwargs):
+        with phase("render"):
+            return super().TemplateResponse(*args, **kwargs)
+
+
+def _production_env() -> Environment:
+    """Entorno sin chequeo de mtimes y con bytecode cache en disco compartido entre workers."""
+    cache_dir = Path(settings.template_cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=False,
+        bytecode_cache=FileSystemBytecodeCache(str(cache_dir)),
+        extensions=[FragmentCacheExtension],
+    )
+
+
+def precompile_templates(templates: Jinja2Templates) -> int:
+    """Compila todos los templates por adelantado y devuelve cuántos quedaron en cache."""
+    names = templates.env.list_templates(extensions=["html"])
+    for name in names:
+        templates.env.get_template(name)
+    return len(names)
 
 
 def _build_templates() -> Jinja2Templates:
-    templates = Jinja2Templates(directory="app/templates")
+    if settings.is_production:
+        templates = TimedJinja2Templates(env=_production_env())
+    else:
+        templates = TimedJinja2Templates(directory=TEMPLATES_DIR)
+        templates.env.add_extension(FragmentCacheExtension)
 
     @pass_context
     def _relative_url_for(context, name: str, **path_params: str) -> str:
         request = context.get("request")
         if request is None:
             raise RuntimeError("request is required in template context")
+        if name == "static" and "path" in path_params:
+            path_params["path"] = hashed_asset_path(path_params["path"])
         return str(request.app.url_path_for(name, **path_params))
 
     templates.env.globals["url_for"] = _relative_url_for
+    if settings.is_production:
+        precompile_templates(templates)
     return templates
 
 
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import unicodedata
+
+# Letras acentuadas del español -> base en minúscula. `fold_key` y `fold_key_sql` usan esta misma tabla,
+# así la clave calculada por los triggers (SQL puro, sin funciones de la app) coincide con la de la consulta.
+# Se limita al español: cada letra es un `replace()` anidado y el parser de SQLite no admite muchos más.
+_ACCENTS = {
+    "a": "áÁ",
+    "e": "éÉ",
+    "i": "íÍ",
+    "o": "óÓ",
+    "u": "úüÚÜ",
+    "n": "ñÑ",
+}
+_FOLD_PAIRS = tuple((accented, base) for base, letters in _ACCENTS.items() for accented in letters)
+# SQLite `lower()` solo pasa a minúscula A-Z: la versión Python hace lo mismo.
+_FOLD_TABLE = str.maketrans({**dict(_FOLD_PAIRS), **{chr(code): chr(code + 32) for code in range(ord("A"), ord("Z") + 1)}})
+
+
+def normalize(text: str) -> str:
+    """Minúsculas, sin acentos y con espacios colapsados (misma normalización para índice y consulta)."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(stripped.casefold().split())
+
+
+def fold_key(text: str) -> str:
+    """Clave de búsqueda de herramientas/componentes: sin espacios en los bordes, sin acentos, A-Z en minúscula."""
+    return text.strip(" ").translate(_FOLD_TABLE)
+
+
+def fold_key_sql(expr: str) -> str:
+    """Equivalente SQL de `fold_key` con funciones nativas (`trim`, `replace`, `lower`) para usar en triggers."""
+    folded = f"trim({expr})"
+    for accented, base in _FOLD_PAIRS:
+        folded = f"replace({folded}, '{accented}', '{base}')"
+    return f"lower({folded})"
+
+
+def prefix_range(text: str) -> tuple[str, str]:
+    """Rango [desde, hasta) de claves `fold_key` que empiezan con `text`, para `key >= ? AND key < ?`."""
+    key = fold_key(text)
+    return key, key + "\U0010ffff"
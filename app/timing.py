@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator, TypeVar
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import settings
+
+T = TypeVar("T")
+
+# Fases acumuladas por request muestreada: nombre -> [segundos, llamadas].
+_timings: ContextVar[dict[str, list[float]] | None] = ContextVar("request_timings", default=None)
+
+PHASE_DESCRIPTIONS = {
+    "db": "SQLite",
+    "img": "image_resolver",
+    "render": "Jinja2",
+}
+
+
+def _access_logger() -> logging.Logger:
+    logger = logging.getLogger("app.access")
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
+
+
+def record(name: str, seconds: float) -> None:
+    timings = _timings.get()
+    if timings is None:
+        return
+    slot = timings.setdefault(name, [0.0, 0])
+    slot[0] += seconds
+    slot[1] += 1
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Acumula la duración del bloque en la fase `name` si la request actual está muestreada."""
+    if _timings.get() is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def timed(name: str) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            if _timings.get() is None:
+                return func(*args, **kwargs)
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - started)
+
+        return wrapper
+
+    return decorator
+
+
+def server_timing_header(timings: dict[str, list[float]], total_s: float) -> str:
+    parts = []
+    for name, (seconds, calls) in sorted(timings.items()):
+        desc = f"{PHASE_DESCRIPTIONS.get(name, name)} x{int(calls)}"
+        parts.append(f'{name};dur={seconds * 1000:.2f};desc="{desc}"')
+    parts.append(f"total;dur={total_s * 1000:.2f}")
+    return ", ".join(parts)
+
+
+class ServerTimingMiddleware:
+    """Middleware ASGI: muestrea requests, emite `Server-Timing` y una línea de access log JSON."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or random.random() >= settings.server_timing_sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        timings: dict[str, list[float]] = {}
+        token = _timings.set(timings)
+        started = time.perf_counter()
+        status = {"code": 500}
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing_header(timings, time.perf_counter() - started))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _timings.reset(token)
+            total_ms = (time.perf_counter() - started) * 1000
+            _access_logger().info(
+                json.dumps(
+                    {
+                        "event": "access",
+                        "method": scope.get("method"),
+                        "path": scope.get("path"),
+                        "status": status["code"],
+                        "dur_ms": round(total_ms, 2),
+                        "phases": {name: {"ms": round(sec * 1000, 2), "calls": int(calls)} for name, (sec, calls) in timings.items()},
+                    },
+                    ensure_ascii=False,
+                )
+            )
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable
+
+import httpx
+from starlette.types import ASGIApp
+
+from app.concurrency import run_db, run_io
+from app.repositories import _ensure_ready, list_kits, list_products, list_stages, list_steps_by_stage
+from app.suggest import suggest_index
+from app.templating import precompile_templates, templates
+
+PUBLIC_ROUTES = ("/", "/stages", "/products", "/kits")
+
+# Logger de uvicorn: sale en la consola del worker con el nivel INFO por defecto.
+logger = logging.getLogger("uvicorn.error")
+
+
+@dataclass
+class WarmupState:
+    ready: bool = False
+    running: bool = False
+    steps_ms: dict[str, float] = field(default_factory=dict)
+    errors: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, object]:
+        return {"ready": self.ready, "running": self.running, "steps_ms": self.steps_ms, "errors": self.errors}
+
+
+state = WarmupState()
+
+
+def _preload_catalog() -> list[str]:
+    _ensure_ready()
+    stages = list_stages()
+    products = list_products()
+    list_kits()
+    if stages:
+        list_steps_by_stage(stages[0].id)
+    routes = list(PUBLIC_ROUTES)
+    if stages:
+        routes.append(f"/stages/{stages[0].id}")
+    if products:
+        routes.append(f"/products/{products[0].id}")
+    return routes
+
+
+async def _render_routes(app: ASGIApp, routes: list[str]) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://warmup") as client:
+        for route in routes:
+            response = await client.get(route)
+            if response.status_code >= 500:
+                state.errors.append(f"{route}: HTTP {response.status_code}")
+
+
+async def _step(name: str, func: Callable[[], Awaitable[object]]) -> object:
+    started = time.perf_counter()
+    try:
+        return await func()
+    except Exception as exc:
+        state.errors.append(f"{name}: {exc}")
+        return None
+    finally:
+        state.steps_ms[name] = round((time.perf_counter() - started) * 1000, 2)
+
+
+async def warmup(app: ASGIApp) -> None:
+    """Paga los costos fríos (schema, catálogo, autocompletado, templates, primer render) antes de marcar el worker listo."""
+    state.ready = False
+    state.running = True
+    state.steps_ms = {}
+    state.errors = []
+    try:
+        routes = await _step("catalog", lambda: run_db(_preload_catalog))
+        await _step("suggest", lambda: run_db(suggest_index.current))
+        await _step("templates", lambda: run_io(precompile_templates, templates))
+        await _step("render", lambda: _render_routes(app, routes or list(PUBLIC_ROUTES)))
+    finally:
+        state.running = False
+        # Aun con errores se marca listo: un warmup fallido no debe dejar al worker fuera de servicio.
+        state.ready = True
+        logger.info(json.dumps({"event": "warmup", **state.as_dict()}, ensure_ascii=False))
+
+
+def mark_ready_without_warmup() -> None:
+    state.ready = True
+    state.running = False
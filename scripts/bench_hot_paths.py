@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.config import settings
+from app.main import app
+from app.repositories import get_stage, list_kits, list_products, list_stages, list_steps_by_stage, products_for_tool_slugs
+from app.routes.web import _hero, _home_images, _kit_rows, _product_image, _product_rows, _stage_hero, _stage_rows, _step_rows
+from app.services.image_resolver import build_picture_sources, entity_slot, resolve_static_path, step_image_cards
+from app.services.tool_index import tool_slug
+from app.templating import templates
+from scripts.seed_large import CatalogSpec, seed_catalog
+
+CATALOG_SIZES = {
+    "small": CatalogSpec(stages=20, steps=400, products=500, kits=50),
+    "medium": CatalogSpec(stages=100, steps=4_000, products=5_000, kits=500),
+    "large": CatalogSpec(),
+}
+DEFAULT_OUTPUT = ROOT / "data" / "bench_hot_paths.json"
+DEFAULT_THRESHOLD = 0.15
+
+
+def measure(func: Callable[[], object], min_time_s: float = 0.2, min_rounds: int = 5, max_rounds: int = 2000) -> dict[str, float]:
+    """Repite `func` hasta cubrir `min_time_s` (y al menos `min_rounds`) y resume las duraciones en ms."""
+    func()
+    samples: list[float] = []
+    started = time.perf_counter()
+    while len(samples) < max_rounds and (len(samples) < min_rounds or time.perf_counter() - started < min_time_s):
+        t0 = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - t0) * 1000)
+    ordered = sorted(samples)
+    return {
+        "median_ms": round(statistics.median(ordered), 4),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 4),
+        "min_ms": round(ordered[0], 4),
+        "rounds": len(ordered),
+    }
+
+
+def _bench_request(path: str) -> Request:
+    scope = {"type": "http", "app": app, "method": "GET", "scheme": "http", "server": ("testserver", 80)}
+    return Request({**scope, "path": path, "root_path": "", "query_string": b"", "headers": []})
+
+
+def _template_contexts(stage, steps, products) -> dict[str, tuple[str, dict[str, object]]]:
+    """Contextos de cada página armados una sola vez, como en app/routes/web.py: `template.*` mide solo Jinja2."""
+    products_hero, products_hero_variants = _hero("products")
+    kits_hero, kits_hero_variants = _hero("kits")
+    contexts = {
+        "/": ("home.html", {"img": _home_images()}),
+        "/stages": ("stage_list.html", {"stages": _stage_rows(list_stages()), "hero_path": _hero("stages")[0]}),
+        "/products": (
+            "product_list.html",
+            {"products": _product_rows(products), "hero_path": products_hero, "hero_variants": products_hero_variants},
+        ),
+        "/kits": ("kit_list.html", {"kits": _kit_rows(list_kits()), "hero_path": kits_hero, "hero_variants": kits_hero_variants}),
+    }
+    if stage:
+        tool_products = products_for_tool_slugs([tool_slug(tool) for step in steps for tool in step.tools_json])
+        image_path, image_variants = _stage_hero(stage)
+        contexts[f"/stages/{stage.id}"] = (
+            "stage_detail.html",
+            {
+                "stage": stage,
+                "steps": _step_rows(stage, steps, tool_products),
+                "stage_image_path": image_path,
+                "stage_image_variants": image_variants,
+            },
+        )
+    if products:
+        image_path, image_variants = _product_image(products[0])
+        contexts[f"/products/{products[0].id}"] = (
+            "product_detail.html",
+            {"product": products[0], "image_path": image_path, "image_variants": image_variants},
+        )
+    return contexts
+
+
+def _cases(client: TestClient) -> dict[str, Callable[[], object]]:
+    stages = list_stages()
+    stage = get_stage(stages[0].id) if stages else None
+    steps = list_steps_by_stage(stage.id) if stage else []
+    products = list_products()
+    stage_slot = entity_slot("stage", stage.id, stage.name) if stage else "stage-x"
+    picture_path = resolve_static_path("stages", stage_slot)
+
+    cases: dict[str, Callable[[], object]] = {
+        "repo.list_stages": list_stages,
+        "repo.list_steps_by_stage": lambda: list_steps_by_stage(stage.id if stage else 0),
+        "repo.list_products": list_products,
+        "resolver.resolve_static_path": lambda: resolve_static_path("stages", stage_slot, raw_path=stage.image_hero if stage else None),
+        "resolver.build_picture_sources": lambda: build_picture_sources(picture_path),
+    }
+    if steps:
+        cases["resolver.step_image_cards"] = lambda: [step_image_cards(step, stage=stage) for step in steps]
+
+    routes = ["/", "/stages", "/products", "/kits"]
+    if stage:
+        routes.append(f"/stages/{stage.id}")
+    if products:
+        routes.append(f"/products/{products[0].id}")
+    # `e2e.*` pasa por todo el stack (middlewares, pools, resolver); `template.*` solo por TemplateResponse.
+    for route in routes:
+        cases[f"e2e.{route}"] = lambda route=route: client.get(route)
+    for route, (name, context) in _template_contexts(stage, steps, products).items():
+        context["request"] = _bench_request(route)
+        cases[f"template.{route}"] = lambda name=name, context=context: templates.TemplateResponse(name, context)
+    return cases
+
+
+def run_size(name: str, spec: CatalogSpec, min_time_s: float) -> dict[str, dict[str, float]]:
+    workdir = Path(tempfile.mkdtemp(prefix=f"bench-{name}-"))
+    previous = (settings.db_path, settings.metrics_dir, settings.server_timing_sample_rate)
+    try:
+        settings.db_path = str(workdir / "bench.db")
+        settings.metrics_dir = str(workdir / "metrics")
+        settings.server_timing_sample_rate = 0.0
+        seed_catalog(spec)
+        # Sin lifespan: el warmup en segundo plano competiría con las mediciones.
+        client = TestClient(app)
+        results = {}
+        for case, func in _cases(client).items():
+            results[case] = measure(func, min_time_s=min_time_s)
+            print(f"[bench] {name:<6} {case:<32} median={results[case]['median_ms']:>10.3f} ms rounds={results[case]['rounds']}")
+        return results
+    finally:
+        settings.db_path, settings.metrics_dir, settings.server_timing_sample_rate = previous
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[dict[str, object]]:
+    """Devuelve los casos cuya mediana empeoró más que `threshold` (0.15 = +15%) respecto del baseline."""
+    regressions = []
+    for size, cases in current.get("results", {}).items():
+        for case, stats in cases.items():
+            before = baseline.get("results", {}).get(size, {}).get(case)
+            if not before or not before.get("median_ms"):
+                continue
+            ratio = stats["median_ms"] / before["median_ms"]
+            if ratio > 1 + threshold:
+                regressions.append(
+                    {
+                        "size": size,
+                        "case": case,
+                        "baseline_ms": before["median_ms"],
+                        "current_ms": stats["median_ms"],
+                        "ratio": round(ratio, 3),
+                    }
+                )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks de repositorio, resolver de imágenes y render")
+    parser.add_argument("--sizes", default="small,medium", help=f"Tamaños de catálogo: {','.join(CATALOG_SIZES)}")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Segundos mínimos de medición por caso")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Archivo JSON de resultados")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline JSON contra el cual comparar")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Regresión tolerada (0.15 = +15%%)")
+    args = parser.parse_args()
+
+    sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in sizes if size not in CATALOG_SIZES]
+    if unknown:
+        raise SystemExit(f"Tamaños desconocidos: {', '.join(unknown)}")
+
+    payload = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "app_env": settings.app_env,
+            "sizes": {size: CATALOG_SIZES[size].__dict__ for size in sizes},
+        },
+        "results": {size: run_size(size, CATALOG_SIZES[size], args.min_time) for size in sizes},
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    print(f"[bench] resultados en {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare(payload, baseline, args.threshold)
+        for row in regressions:
+            print(
+                f"[bench] REGRESIÓN {row['size']} {row['case']}: {row['baseline_ms']:.3f} -> {row['current_ms']:.3f} ms "
+                f"(x{row['ratio']})"
+            )
+        if regressions:
+            raise SystemExit(1)
+        print(f"[bench] sin regresiones mayores a {args.threshold:.0%} contra {args.compare}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+PHASES = ("generate_mock", "optimize_existing", "admin_upload")
+SIZES = ("sm", "md", "lg")
+
+
+def _peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KiB, macOS bytes.
+    return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+
+
+def _snapshot(root: Path) -> dict[Path, tuple[int, int]]:
+    return {path: (stat.st_mtime_ns, stat.st_size) for path in root.rglob("*") if path.is_file() and (stat := path.stat())}
+
+
+def _bytes_by_variant(root: Path, before: dict[Path, tuple[int, int]]) -> dict[str, dict[str, int]]:
+    """Variantes escritas durante la medición: archivos nuevos o reescritos respecto de `before`, sin `original.*`."""
+    totals: dict[str, dict[str, int]] = {}
+    for path, signature in _snapshot(root).items():
+        if before.get(path) == signature or path.stem == "original":
+            continue
+        row = totals.setdefault(path.name, {"files": 0, "bytes": 0})
+        row["files"] += 1
+        row["bytes"] += signature[1]
+    return dict(sorted(totals.items()))
+
+
+def _slots(count: int):
+    import scripts.generate_site_images as gsi
+
+    return [
+        gsi.SlotSpec(
+            slot_id=f"stages.bench-slot-{index}",
+            section="stages",
+            entity={"type": "stage", "id": index, "slug": f"bench-slot-{index}"},
+            prompt=f"Slot sintético {index} para benchmark del pipeline de imágenes.",
+            alt=f"Slot {index}",
+            sizes=SIZES,
+        )
+        for index in range(count)
+    ]
+
+
+def _mock_upload_bytes() -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (1536, 1024), (196, 180, 150)).save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def run_phase(phase: str, count: int, workdir: Path) -> dict[str, object]:
+    """Ejecuta una fase sobre `count` slots sintéticos dentro de `workdir` y devuelve sus métricas."""
+    import scripts.generate_site_images as gsi
+
+    gsi.ROOT = workdir
+    gsi.OUTPUT_ROOT = workdir / "app" / "static" / "img" / "generated"
+    gsi.MANIFEST_PATH = workdir / "data" / "generated_images_manifest.json"
+    slots = _slots(count)
+    sink = io.StringIO()
+
+    if phase == "generate_mock":
+        options = gsi.GenerationOptions(mock=True, force=True, optimize_existing=False, continue_on_error=False)
+
+        def work() -> None:
+            with contextlib.redirect_stdout(sink):
+                gsi.generate(slots, options)
+
+    elif phase == "optimize_existing":
+        with contextlib.redirect_stdout(sink):
+            gsi.generate(slots, gsi.GenerationOptions(mock=True, force=True, optimize_existing=False, continue_on_error=False))
+
+        def work() -> None:
+            for slot in slots:
+                section, slot_name = slot.slot_id.split(".", 1)
+                gsi._optimize_existing(section, slot_name, slot.sizes)
+
+    elif phase == "admin_upload":
+        from fastapi import UploadFile
+
+        from app.routes.admin import _save_upload
+
+        payload = _mock_upload_bytes()
+        gsi.OUTPUT_ROOT.mkdir(parents=True, exist_ok=True)
+        os.chdir(workdir)
+
+        def work() -> None:
+            for index in range(count):
+                upload = UploadFile(file=io.BytesIO(payload), filename=f"bench-{index}.jpg")
+                _save_upload(upload, "products", f"product-bench-{index}")
+
+    else:
+        raise ValueError(f"Fase desconocida: {phase}")
+
+    gsi.OUTPUT_ROOT.mkdir(parents=True, exist_ok=True)
+    before = _snapshot(gsi.OUTPUT_ROOT)
+    wall_started = time.perf_counter()
+    cpu_started = time.process_time()
+    work()
+    wall_s = time.perf_counter() - wall_started
+    cpu_s = time.process_time() - cpu_started
+    variants = _bytes_by_variant(gsi.OUTPUT_ROOT, before)
+    files = sum(row["files"] for row in variants.values())
+    return {
+        "phase": phase,
+        "slots": count,
+        "wall_s": round(wall_s, 3),
+        "slots_per_s": round(count / wall_s, 2) if wall_s else 0.0,
+        "images_per_s": round(files / wall_s, 2) if wall_s else 0.0,
+        "cpu_s_per_slot": round(cpu_s / count, 4) if count else 0.0,
+        "peak_rss_mb": _peak_rss_mb(),
+        "bytes_by_variant": variants,
+    }
+
+
+def _run_isolated(phase: str, count: int) -> dict[str, object]:
+    # Un proceso por fase: así el pico de RSS corresponde solo a esa fase.
+    workdir = Path(tempfile.mkdtemp(prefix=f"bench-images-{phase}-"))
+    try:
+        completed = subprocess.run(
+            [sys.executable, str(Path(__file__).resolve()), "--phase", phase, "--slots", str(count), "--workdir", str(workdir)],
+            cwd=ROOT,
+            env={**os.environ, "METRICS_DIR": str(workdir / "metrics")},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline de imágenes (generación mock, optimización y uploads)")
+    parser.add_argument("--slots", type=int, default=20, help="Cantidad de slots sintéticos por fase")
+    parser.add_argument("--phases", default=",".join(PHASES), help=f"Fases a medir: {','.join(PHASES)}")
+    parser.add_argument("--json", action="store_true", help="Imprime los resultados como JSON")
+    parser.add_argument("--output", type=Path, default=None, help="Guarda los resultados JSON en este archivo")
+    parser.add_argument("--phase", default=None, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", type=Path, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        print(json.dumps(run_phase(args.phase, args.slots, args.workdir)))
+        return
+
+    phases = [phase.strip() for phase in args.phases.split(",") if phase.strip()]
+    results = [_run_isolated(phase, args.slots) for phase in phases]
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for row in results:
+        print(
+            f"[images-bench] {row['phase']:<18} slots={row['slots']} wall={row['wall_s']:.2f}s "
+            f"slots/s={row['slots_per_s']:.2f} images/s={row['images_per_s']:.2f} "
+            f"cpu/slot={row['cpu_s_per_slot']:.3f}s peak_rss={row['peak_rss_mb']} MB"
+        )
+        for variant, stats in row["bytes_by_variant"].items():
+            average = stats["bytes"] // stats["files"] if stats["files"] else 0
+            print(f"[images-bench]     {variant:<14} files={stats['files']:>5} bytes={stats['bytes']:>10} avg={average:>8}")
+
+
+if __name__ == "__main__":
+    main()
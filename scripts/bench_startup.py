@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Se ejecuta en un intérprete nuevo para medir un worker realmente frío.
+PROBE = r"""
+import json, sys, time
+t0 = time.perf_counter()
+from fastapi.testclient import TestClient
+import app.main
+t_import = time.perf_counter()
+with TestClient(app.main.app) as client:
+    response = client.get(sys.argv[1])
+    t_first = time.perf_counter()
+    response = client.get(sys.argv[1])
+    t_second = time.perf_counter()
+print(json.dumps({
+    "status": response.status_code,
+    "import_ms": (t_import - t0) * 1000,
+    "first_response_ms": (t_first - t_import) * 1000,
+    "time_to_first_response_ms": (t_first - t0) * 1000,
+    "second_response_ms": (t_second - t_first) * 1000,
+}))
+"""
+
+
+def _run_probe(path: str, env: dict[str, str]) -> dict[str, float]:
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE, path],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _summarize(samples: list[dict[str, float]]) -> dict[str, float]:
+    keys = ("import_ms", "first_response_ms", "time_to_first_response_ms", "second_response_ms")
+    return {key: round(statistics.median(sample[key] for sample in samples), 2) for key in keys}
+
+
+def bench(path: str, runs: int) -> dict[str, dict[str, float]]:
+    """Mide time-to-first-response de workers nuevos en modo development y production."""
+    results: dict[str, dict[str, float]] = {}
+    cache_dir = Path(tempfile.mkdtemp(prefix="template-cache-"))
+    try:
+        base_env = {**os.environ, "TEMPLATE_CACHE_DIR": str(cache_dir)}
+        results["development"] = _summarize([_run_probe(path, {**base_env, "APP_ENV": "development"}) for _ in range(runs)])
+
+        prod_env = {**base_env, "APP_ENV": "production"}
+        results["production_cold_cache"] = _summarize([_run_probe(path, prod_env)])
+        results["production"] = _summarize([_run_probe(path, prod_env) for _ in range(runs)])
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark de arranque: time-to-first-response de un worker nuevo")
+    parser.add_argument("--path", default="/stages", help="Ruta a pedir como primera request")
+    parser.add_argument("--runs", type=int, default=5, help="Corridas por modo (se reporta la mediana)")
+    parser.add_argument("--json", action="store_true", help="Imprime el resultado como JSON")
+    args = parser.parse_args()
+
+    results = bench(args.path, args.runs)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"[startup] path={args.path} runs={args.runs} (mediana, ms)")
+    for mode, row in results.items():
+        print(
+            f"[startup] {mode:<22} import={row['import_ms']:>8.1f} first={row['first_response_ms']:>8.1f} "
+            f"ttfr={row['time_to_first_response_ms']:>8.1f} second={row['second_response_ms']:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.suggest import SUGGEST_KINDS, PrefixIndex
+from scripts.bench_hot_paths import measure
+from scripts.seed_large import PRODUCT_NOUNS, PRODUCT_TRAITS, STEP_OBJECTS, STEP_VERBS
+
+PREFIXES = ("s", "sus", "term", "kit l", "guant", "bolsas 1", "zz")
+
+
+def synthetic_entries(count: int, seed: int = 42) -> list[tuple[str, str]]:
+    rng = random.Random(seed)
+    entries = []
+    for index in range(count):
+        kind = SUGGEST_KINDS[index % len(SUGGEST_KINDS)]
+        if kind == "step":
+            label = f"{rng.choice(STEP_VERBS)} {rng.choice(STEP_OBJECTS)} {index}"
+        else:
+            label = f"{rng.choice(PRODUCT_NOUNS)} {rng.choice(PRODUCT_TRAITS)} {index}"
+        entries.append((label, kind))
+    return entries
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tamaño y latencia del índice de autocompletado")
+    parser.add_argument("--entries", type=int, default=100_000, help="Etiquetas sintéticas a indexar")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Segundos mínimos de medición por prefijo")
+    args = parser.parse_args()
+
+    entries = synthetic_entries(args.entries)
+    started = time.perf_counter()
+    index = PrefixIndex(entries)
+    build_s = time.perf_counter() - started
+    # Segunda construcción bajo tracemalloc (que la hace varias veces más lenta) solo para medir memoria.
+    del index
+    tracemalloc.start()
+    index = PrefixIndex(entries)
+    traced, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"[suggest] etiquetas={len(index.labels)} claves={len(index)} build={build_s:.2f}s")
+    print(f"[suggest] memoria: memory_bytes={index.memory_bytes() / 1e6:.1f} MB tracemalloc={traced / 1e6:.1f} MB")
+    for prefix in PREFIXES:
+        stats = measure(lambda prefix=prefix: index.complete(prefix, 10), min_time_s=args.min_time)
+        print(f"[suggest] {prefix!r:<12} median={stats['median_ms'] * 1000:>7.1f} us p95={stats['p95_ms'] * 1000:>7.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+STATIC_ROOT = ROOT / "app" / "static"
+DIST_ROOT = STATIC_ROOT / "dist"
+MANIFEST_PATH = DIST_ROOT / "manifest.json"
+COMPRESSIBLE_SUFFIXES = {".css", ".js", ".svg", ".json", ".txt", ".html", ".xml", ".map"}
+SKIPPED_NAMES = {".gitkeep"}
+GENERATED_PREFIX = "img/generated/"
+HASH_LENGTH = 12
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+
+@dataclass(frozen=True)
+class BuildResult:
+    assets: dict[str, str]
+    written: list[str]
+    removed: list[str]
+    compressed: int
+
+
+def _source_files(include_generated: bool) -> list[Path]:
+    rows: list[Path] = []
+    for path in sorted(STATIC_ROOT.rglob("*")):
+        if not path.is_file() or path.name in SKIPPED_NAMES:
+            continue
+        rel = path.relative_to(STATIC_ROOT).as_posix()
+        if rel.startswith("dist/"):
+            continue
+        if rel.startswith(GENERATED_PREFIX) and not include_generated:
+            continue
+        rows.append(path)
+    return rows
+
+
+def _hashed_name(rel: str, data: bytes) -> str:
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    parent, _, name = rel.rpartition("/")
+    stem, dot, suffix = name.rpartition(".")
+    hashed = f"{stem}.{digest}.{suffix}" if dot and stem else f"{name}.{digest}"
+    return f"dist/{parent}/{hashed}" if parent else f"dist/{hashed}"
+
+
+def _write_if_changed(target: Path, data: bytes) -> bool:
+    if target.exists() and target.stat().st_size == len(data) and target.read_bytes() == data:
+        return False
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_bytes(data)
+    return True
+
+
+def build(include_generated: bool = False) -> BuildResult:
+    """Copia assets a `dist/` con hash de contenido, genera `.gz`/`.br` y escribe el manifest."""
+    assets: dict[str, str] = {}
+    written: list[str] = []
+    keep: set[Path] = {MANIFEST_PATH}
+    compressed = 0
+
+    for source in _source_files(include_generated):
+        rel = source.relative_to(STATIC_ROOT).as_posix()
+        data = source.read_bytes()
+        hashed_rel = _hashed_name(rel, data)
+        target = STATIC_ROOT / hashed_rel
+        assets[rel] = hashed_rel
+        keep.add(target)
+        if _write_if_changed(target, data):
+            written.append(hashed_rel)
+
+        if source.suffix.lower() not in COMPRESSIBLE_SUFFIXES:
+            continue
+        variants = [(target.with_name(target.name + ".gz"), lambda raw: gzip.compress(raw, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append((target.with_name(target.name + ".br"), lambda raw: brotli.compress(raw, quality=11)))
+        for variant_path, encode in variants:
+            keep.add(variant_path)
+            if not variant_path.exists():
+                variant_path.write_bytes(encode(data))
+            compressed += 1
+
+    removed: list[str] = []
+    if DIST_ROOT.exists():
+        for path in sorted(DIST_ROOT.rglob("*")):
+            if path.is_file() and path not in keep:
+                path.unlink()
+                removed.append(path.relative_to(STATIC_ROOT).as_posix())
+
+    payload = {
+        "manifest_version": 1,
+        "built_at": datetime.now(timezone.utc).isoformat(),
+        "assets": dict(sorted(assets.items())),
+    }
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    MANIFEST_PATH.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    return BuildResult(assets=assets, written=written, removed=removed, compressed=compressed)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Genera assets estáticos con hash de contenido y variantes precomprimidas")
+    parser.add_argument(
+        "--include-generated",
+        action="store_true",
+        help="Incluye img/generated (re-ejecutar el build tras regenerar o subir imágenes)",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if brotli is None:
+        print("[assets] WARN: brotli no instalado; solo se generan variantes .gz")
+    result = build(include_generated=args.include_generated)
+    print(
+        "[assets] summary "
+        f"assets={len(result.assets)} written={len(result.written)} "
+        f"compressed={result.compressed} removed={len(result.removed)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
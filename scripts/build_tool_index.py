@@ -0,0 +1,13 @@
+from pathlib import Path
+import sys
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.db import init_db
+from app.services.tool_index import rebuild_tool_index
+
+
+if __name__ == "__main__":
+    init_db()
+    stats = rebuild_tool_index()
+    print(f"✅ Índice herramienta → producto: {stats['tools_matched']}/{stats['tools']} herramientas con {stats['links']} productos")
@@ -6,7 +6,12 @@ import sys
 import traceback
 from pathlib import Path
 
-from dotenv import load_dotenv
+ROOT = Path(__file__).resolve().parents[1]
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import load_env_file
 
 
 def _mask_key(value: str) -> str:
@@ -40,7 +45,7 @@ def _print_env_summary(api_key: str, model_from_env: str, model_effective: str)
 
 def main() -> int:
     # Igual que app/config.py: carga variables desde .env si existe.
-    load_dotenv()
+    load_env_file()
 
     api_key = os.getenv("OPENAI_API_KEY", "").strip()
     model_from_env = os.getenv("OPENAI_MODEL", "").strip()
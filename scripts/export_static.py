@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.repositories import list_kits, list_products, list_stages, list_steps_by_stage, products_for_tool_slugs
+from app.services.image_resolver import (
+    build_picture_sources,
+    kit_card_image,
+    kit_result_image,
+    product_image,
+    resolve_static_path,
+    stage_hero_image,
+    stage_list_images,
+    step_image_cards,
+)
+from app.services.tool_index import tool_slug
+from app.static_files import asset_manifest_token
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+    brotli = None
+
+DEFAULT_OUT_DIR = ROOT / "dist" / "site"
+MANIFEST_PATH = ROOT / "data" / "static_export_manifest.json"
+TEMPLATES_ROOT = ROOT / "app" / "templates"
+HOME_SLOTS = (
+    "hero",
+    "beneficios-1",
+    "beneficios-2",
+    "beneficios-3",
+    "como-funciona-1",
+    "como-funciona-2",
+    "como-funciona-3",
+    "testimonios-1",
+    "testimonios-2",
+    "testimonios-3",
+    "faq",
+)
+
+
+@dataclass(frozen=True)
+class PageSpec:
+    path: str
+    fingerprint: str
+
+
+@dataclass(frozen=True)
+class ExportResult:
+    rendered: list[str]
+    skipped: list[str]
+    removed: list[str]
+    failures: list[str]
+
+
+def _digest(payload: object) -> str:
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _templates_digest() -> str:
+    digest = hashlib.sha256()
+    for template in sorted(TEMPLATES_ROOT.rglob("*.html")):
+        digest.update(template.relative_to(TEMPLATES_ROOT).as_posix().encode("utf-8"))
+        digest.update(template.read_bytes())
+    return digest.hexdigest()
+
+
+def _binding(path: str) -> dict[str, object]:
+    return {"path": path, "variants": build_picture_sources(path)}
+
+
+def collect_pages() -> list[PageSpec]:
+    """Lista las rutas públicas con la huella de filas e imágenes de las que depende cada una."""
+    # Templates y manifest de assets: cambiar cualquiera reescribe todas las páginas (rutas con hash).
+    global_digest = _digest([_templates_digest(), asset_manifest_token()])
+
+    def page(path: str, payload: object) -> PageSpec:
+        return PageSpec(path=path, fingerprint=_digest([global_digest, payload]))
+
+    stages = list_stages()
+    products = list_products()
+    kits = list_kits()
+
+    pages = [
+        page("/", {slot: resolve_static_path("home", slot) for slot in HOME_SLOTS}),
+        page(
+            "/stages",
+            {
+                "hero": resolve_static_path("stages", "hero", "md"),
+                "rows": [
+                    {"row": stage.model_dump(), "images": {k: _binding(v) for k, v in stage_list_images(stage).items()}}
+                    for stage in stages
+                ],
+            },
+        ),
+        page(
+            "/products",
+            {
+                "hero": _binding(resolve_static_path("products", "hero", "md")),
+                "rows": [{"row": product.model_dump(), "image": _binding(product_image(product))} for product in products],
+            },
+        ),
+        page(
+            "/kits",
+            {
+                "hero": _binding(resolve_static_path("kits", "hero", "md")),
+                "rows": [
+                    {"row": kit.model_dump(), "card": _binding(kit_card_image(kit)), "result": _binding(kit_result_image(kit))}
+                    for kit in kits
+                ],
+            },
+        ),
+    ]
+
+    for stage in stages:
+        steps = list_steps_by_stage(stage.id)
+        tool_products = products_for_tool_slugs([tool_slug(tool) for step in steps for tool in step.tools_json])
+        pages.append(
+            page(
+                f"/stages/{stage.id}",
+                {
+                    "stage": stage.model_dump(),
+                    "hero": _binding(stage_hero_image(stage)),
+                    "steps": [
+                        {"row": step.model_dump(), "cards": {k: _binding(v) for k, v in step_image_cards(step, stage=stage).items()}}
+                        for step in steps
+                    ],
+                    "tool_products": {
+                        slug: [product.model_dump() for product in rows] for slug, rows in sorted(tool_products.items())
+                    },
+                },
+            )
+        )
+
+    for product in products:
+        pages.append(page(f"/products/{product.id}", {"row": product.model_dump(), "image": _binding(product_image(product))}))
+
+    return pages
+
+
+def _output_file(out_dir: Path, path: str) -> Path:
+    relative = path.strip("/")
+    return out_dir / relative / "index.html" if relative else out_dir / "index.html"
+
+
+def _compressed_siblings(target: Path) -> list[Path]:
+    return [target.with_name(target.name + ".gz"), target.with_name(target.name + ".br")]
+
+
+def _write_atomic(target: Path, data: bytes) -> None:
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(target.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(target)
+
+
+def _write_page(target: Path, html: bytes) -> int:
+    _write_atomic(target, html)
+    _write_atomic(target.with_name(target.name + ".gz"), gzip.compress(html, compresslevel=9, mtime=0))
+    if brotli is not None:
+        _write_atomic(target.with_name(target.name + ".br"), brotli.compress(html, quality=11))
+    return len(html)
+
+
+def _load_manifest(manifest_path: Path) -> dict:
+    if not manifest_path.exists():
+        return {"manifest_version": 1, "exported_at": "", "out_dir": "", "pages": {}}
+    payload = json.loads(manifest_path.read_text(encoding="utf-8"))
+    if not isinstance(payload, dict) or not isinstance(payload.get("pages"), dict):
+        raise SystemExit(f"Manifest de export inválido: {manifest_path}")
+    return payload
+
+
+def _save_manifest(manifest_path: Path, payload: dict) -> None:
+    payload["exported_at"] = datetime.now(timezone.utc).isoformat()
+    payload["manifest_version"] = 1
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(payload, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def export(out_dir: Path = DEFAULT_OUT_DIR, force: bool = False, manifest_path: Path = MANIFEST_PATH) -> ExportResult:
+    """Renderiza solo las páginas cuya huella cambió desde el último export."""
+    out_dir = out_dir.resolve()
+    manifest = _load_manifest(manifest_path)
+    same_target = manifest.get("out_dir") == str(out_dir)
+    previous: dict[str, dict] = manifest["pages"] if same_target else {}
+
+    rendered: list[str] = []
+    skipped: list[str] = []
+    removed: list[str] = []
+    failures: list[str] = []
+    pages_out: dict[str, dict] = {}
+
+    client = TestClient(app)
+    now = datetime.now(timezone.utc).isoformat()
+
+    for spec in collect_pages():
+        target = _output_file(out_dir, spec.path)
+        entry = previous.get(spec.path)
+        if not force and entry and entry.get("fingerprint") == spec.fingerprint and target.exists():
+            pages_out[spec.path] = entry
+            skipped.append(spec.path)
+            continue
+
+        try:
+            response = client.get(spec.path)
+        except Exception as exc:
+            failures.append(f"{spec.path}: {exc}")
+            continue
+        if response.status_code != 200:
+            failures.append(f"{spec.path}: status {response.status_code}")
+            continue
+
+        size = _write_page(target, response.content)
+        pages_out[spec.path] = {
+            "fingerprint": spec.fingerprint,
+            "file": target.relative_to(out_dir).as_posix(),
+            "bytes": size,
+            "rendered_at": now,
+        }
+        rendered.append(spec.path)
+
+    for path, entry in previous.items():
+        if path in pages_out:
+            continue
+        target = out_dir / entry.get("file", "")
+        for stale in [target, *_compressed_siblings(target)]:
+            if stale.is_file():
+                stale.unlink()
+        removed.append(path)
+
+    manifest["out_dir"] = str(out_dir)
+    manifest["pages"] = pages_out
+    _save_manifest(manifest_path, manifest)
+    return ExportResult(rendered=rendered, skipped=skipped, removed=removed, failures=failures)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Exporta el catálogo público como HTML estático incremental")
+    parser.add_argument("--out", default=str(DEFAULT_OUT_DIR), help="Directorio de salida servible por nginx/CDN")
+    parser.add_argument("--force", action="store_true", help="Re-renderiza todas las páginas aunque no hayan cambiado")
+    parser.add_argument("--manifest", default=str(MANIFEST_PATH), help="Ruta del manifest de export")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    if brotli is None:
+        print("[export] WARN: brotli no instalado; solo se generan variantes .gz")
+
+    result = export(out_dir=Path(args.out), force=args.force, manifest_path=Path(args.manifest))
+    for path in result.rendered:
+        print(f"[export] {path} -> rendered")
+    for path in result.removed:
+        print(f"[export] {path} -> removed")
+    print(
+        "[export] summary "
+        f"rendered={len(result.rendered)} skipped={len(result.skipped)} "
+        f"removed={len(result.removed)} failed={len(result.failures)}"
+    )
+    if result.failures:
+        for failure in result.failures:
+            print(f" - {failure}")
+        raise SystemExit("Export completado con fallas")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,15 +6,22 @@ import base64
 import html
 import json
 import re
+import sys
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
 import httpx
-from dotenv import load_dotenv
 from openai import OpenAI
 
+ROOT = Path(__file__).resolve().parents[1]
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import load_env_file
+
 FALLBACK_PROMPTS = {
     "hero": "indoor gourmet mushrooms kit in a modern apartment, clean grow tent, soft light, premium brand aesthetic, wide composition, no text",
     "beneficios": "minimal still life of mushroom grow kit components on clean table, premium product photo, soft shadows, no text",
@@ -245,7 +252,7 @@ def main() -> None:
     parser.add_argument("--scan-only", action="store_true", help="Only inspect sections and write JSON outputs.")
     args = parser.parse_args()
 
-    load_dotenv()
+    load_env_file()
 
     homepage_html: str
     try:
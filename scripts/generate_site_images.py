@@ -3,9 +3,11 @@ from __future__ import annotations
 
 import argparse
 import base64
+import hashlib
 import json
 import os
-from dataclasses import dataclass
+import shutil
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from io import BytesIO
 from pathlib import Path
@@ -18,13 +20,18 @@ import sys
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
-from app.repositories import list_kits, list_products, list_stages, list_steps_by_stage
+from app.metrics import IMAGE_GENERATION_JOBS
+from app.repositories import get_stages_with_steps, list_kits, list_products, list_stages
 from app.services.image_resolver import entity_slot, slugify
 
 OUTPUT_ROOT = ROOT / "app" / "static" / "img" / "generated"
 MANIFEST_PATH = ROOT / "data" / "generated_images_manifest.json"
 STYLE_ID = "indoor-niche-lab.v1"
 DEFAULT_MODEL = os.environ.get("OPENAI_IMAGE_MODEL", "gpt-image-1")
+# Costo estimado por llamada (1536x1024, quality=high) para `--plan`; cada slot es una sola llamada.
+DEFAULT_COST_PER_IMAGE_USD = float(os.environ.get("OPENAI_IMAGE_COST_USD", "0.25"))
+# Estados del manifest que no cuentan como imagen final y se reintentan en modo incremental.
+RETRY_STATUSES = {"missing", "error", "blocked_billing", "placeholder_due_to_billing"}
 
 SIZE_DIMS = {
     "sm": (640, 426),
@@ -58,6 +65,20 @@ class GenerationOptions:
     force: bool
     optimize_existing: bool
     continue_on_error: bool
+    force_slots: frozenset[str] = field(default_factory=frozenset)
+
+
+@dataclass(frozen=True)
+class SlotPlan:
+    new: list[SlotSpec]
+    changed: list[SlotSpec]
+    retry: list[SlotSpec]
+    deleted: list[str]
+    unchanged: int
+
+    @property
+    def to_generate(self) -> list[SlotSpec]:
+        return sorted(self.new + self.changed + self.retry, key=lambda slot: slot.slot_id)
 
 
 @dataclass(frozen=True)
@@ -145,7 +166,8 @@ def _dynamic_slots() -> list[SlotSpec]:
         ),
     ]
 
-    for stage in list_stages():
+    stages = list_stages()
+    for stage, steps in get_stages_with_steps([stage.id for stage in stages]):
         stage_slot = entity_slot("stage", stage.id, stage.name)
         stage_entity = {"type": "stage", "id": stage.id, "slug": slugify(stage.name)}
         slots.append(
@@ -178,7 +200,7 @@ def _dynamic_slots() -> list[SlotSpec]:
                 )
             )
 
-        for step in list_steps_by_stage(stage.id):
+        for step in steps:
             step_slot = entity_slot("step", step.id, step.title)
             context = (step.content or "").strip().replace("\n", " ")[:220]
             tools = ", ".join(step.tools_json or [])
@@ -311,6 +333,76 @@ def _index_manifest(payload: dict) -> dict[str, dict]:
     return {row.get("slot_id", ""): row for row in payload.get("slots", []) if row.get("slot_id")}
 
 
+def _prompt_hash(prompt: str, sizes) -> str:
+    raw = json.dumps([STYLE_ID, prompt, NEGATIVE_PROMPT, sorted(sizes)], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def _slot_hash(slot: SlotSpec) -> str:
+    return _prompt_hash(slot.prompt, slot.sizes)
+
+
+def _recorded_hash(row: dict) -> str:
+    # Manifests previos a `prompt_hash`: se recalcula con el prompt y los tamaños guardados.
+    return row.get("prompt_hash") or _prompt_hash(row.get("prompt") or "", tuple(row.get("output_files") or ()))
+
+
+def plan_slots(slots: list[SlotSpec], manifest_map: dict[str, dict], sections: set[str] | None = None) -> SlotPlan:
+    """Diff entre los slots actuales y el manifest, sin tocar el disco.
+
+    `sections` limita qué entradas del manifest pueden figurar como borradas (None = todas).
+    """
+    new: list[SlotSpec] = []
+    changed: list[SlotSpec] = []
+    retry: list[SlotSpec] = []
+    unchanged = 0
+    for slot in slots:
+        row = manifest_map.get(slot.slot_id)
+        if row is None:
+            new.append(slot)
+        elif row.get("status") in RETRY_STATUSES:
+            retry.append(slot)
+        elif _recorded_hash(row) != _slot_hash(slot):
+            changed.append(slot)
+        else:
+            unchanged += 1
+    current = {slot.slot_id for slot in slots}
+    deleted = sorted(
+        slot_id
+        for slot_id, row in manifest_map.items()
+        if slot_id not in current and (sections is None or row.get("section", slot_id.split(".", 1)[0]) in sections)
+    )
+    return SlotPlan(new=new, changed=changed, retry=retry, deleted=deleted, unchanged=unchanged)
+
+
+def print_plan(plan: SlotPlan, cost_per_image: float, mock: bool) -> None:
+    print(
+        f"[plan] new={len(plan.new)} changed={len(plan.changed)} retry={len(plan.retry)} "
+        f"deleted={len(plan.deleted)} unchanged={plan.unchanged}"
+    )
+    for marker, rows in (("+", plan.new), ("~", plan.changed), ("!", plan.retry)):
+        for slot in rows:
+            print(f" {marker} {slot.slot_id}")
+    for slot_id in plan.deleted:
+        print(f" - {slot_id}")
+    calls = len(plan.to_generate)
+    cost = calls * cost_per_image
+    note = " (modo mock: sin costo real)" if mock else ""
+    print(f"[plan] llamadas a la API (máximo): {calls} x USD {cost_per_image:.2f} = USD {cost:.2f} con {DEFAULT_MODEL}{note}")
+
+
+def _prune_slots(slot_ids: list[str]) -> None:
+    """Quita del manifest y del disco los slots cuya entidad ya no existe."""
+    payload = _load_manifest()
+    doomed = set(slot_ids)
+    payload["slots"] = [row for row in payload.get("slots", []) if row.get("slot_id") not in doomed]
+    for slot_id in slot_ids:
+        section, slot_name = slot_id.split(".", 1)
+        shutil.rmtree(OUTPUT_ROOT / section / slot_name, ignore_errors=True)
+        print(f"[images] {slot_id} -> pruned")
+    _save_manifest(payload)
+
+
 def _is_complete(section: str, slot_name: str, sizes: tuple[str, ...]) -> bool:
     return all(_output_file(section, slot_name, size).exists() and _output_file(section, slot_name, size).stat().st_size > 0 for size in sizes)
 
@@ -390,6 +482,10 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--real", action="store_true", help="Usa OpenAI")
     parser.add_argument("--force", action="store_true", help="Regenera aunque existan archivos")
     parser.add_argument("--optimize-existing", action="store_true", help="Recomprime WEBP existentes sin regenerar prompt")
+    parser.add_argument("--plan", action="store_true", help="Muestra slots nuevos/cambiados/borrados y el costo estimado, sin generar")
+    parser.add_argument("--incremental", action="store_true", help="Genera solo los slots nuevos, cambiados o fallidos según el manifest")
+    parser.add_argument("--prune", action="store_true", help="Con --incremental, borra del manifest y del disco los slots de entidades eliminadas")
+    parser.add_argument("--cost-per-image", type=float, default=DEFAULT_COST_PER_IMAGE_USD, help="USD por imagen para la estimación de --plan")
     parser.add_argument(
         "--continue-on-error",
         action="store_true",
@@ -452,6 +548,7 @@ def generate(slots: list[SlotSpec], options: GenerationOptions) -> GenerationRes
                         "section": slot.section,
                         "entity": slot.entity,
                         "prompt": slot.prompt,
+                        "prompt_hash": _slot_hash(slot),
                         "negative_prompt": NEGATIVE_PROMPT,
                         "alt": slot.alt,
                         "style_id": STYLE_ID,
@@ -475,7 +572,7 @@ def generate(slots: list[SlotSpec], options: GenerationOptions) -> GenerationRes
 
         try:
             complete = _is_complete(section, slot_name, slot.sizes)
-            if complete and not options.force:
+            if complete and not (options.force or slot.slot_id in options.force_slots):
                 if options.optimize_existing:
                     output_files = _optimize_existing(section, slot_name, slot.sizes)
                     status = "ok"
@@ -498,6 +595,7 @@ def generate(slots: list[SlotSpec], options: GenerationOptions) -> GenerationRes
                 "section": slot.section,
                 "entity": slot.entity,
                 "prompt": slot.prompt,
+                "prompt_hash": _slot_hash(slot),
                 "negative_prompt": NEGATIVE_PROMPT,
                 "alt": slot.alt,
                 "style_id": STYLE_ID,
@@ -523,6 +621,7 @@ def generate(slots: list[SlotSpec], options: GenerationOptions) -> GenerationRes
                     "section": slot.section,
                     "entity": slot.entity,
                     "prompt": slot.prompt,
+                    "prompt_hash": _slot_hash(slot),
                     "negative_prompt": NEGATIVE_PROMPT,
                     "alt": slot.alt,
                     "style_id": STYLE_ID,
@@ -549,6 +648,7 @@ def generate(slots: list[SlotSpec], options: GenerationOptions) -> GenerationRes
                 "section": slot.section,
                 "entity": slot.entity,
                 "prompt": slot.prompt,
+                "prompt_hash": _slot_hash(slot),
                 "negative_prompt": NEGATIVE_PROMPT,
                 "alt": slot.alt,
                 "style_id": STYLE_ID,
@@ -565,6 +665,9 @@ def generate(slots: list[SlotSpec], options: GenerationOptions) -> GenerationRes
 
     payload["slots"] = list(manifest_map.values())
     _save_manifest(payload)
+    for status, count in counters.items():
+        if count:
+            IMAGE_GENERATION_JOBS.inc(count, status=status)
     return GenerationResult(
         counters=counters,
         failures=failures,
@@ -573,14 +676,39 @@ def generate(slots: list[SlotSpec], options: GenerationOptions) -> GenerationRes
     )
 
 
+def _plan_sections(args: argparse.Namespace) -> set[str] | None:
+    if args.only_slot:
+        return set()
+    return None if args.only == "all" else {args.only}
+
+
 def main() -> None:
     args = parse_args()
-    mock = _resolve_mode(args)
     all_slots = _all_slots()
     selected = _filter_slots(all_slots, args.only, args.only_slot)
     if args.only_slot and not selected:
         raise SystemExit(f"No existe slot_id: {args.only_slot}")
 
+    force_slots: frozenset[str] = frozenset()
+    if args.plan or args.incremental:
+        manifest_map = _index_manifest(_load_manifest())
+        plan = plan_slots(selected, manifest_map, _plan_sections(args))
+        if args.plan:
+            print_plan(plan, args.cost_per_image, mock=args.mock or not os.environ.get("OPENAI_API_KEY"))
+            return
+        if args.prune and plan.deleted:
+            _prune_slots(plan.deleted)
+        selected = plan.to_generate
+        # Cambiados y reintentos pueden tener archivos viejos o placeholders en disco: se regeneran igual.
+        # "missing" (manifest migrado) no se fuerza: si los archivos existen solo se registra el hash.
+        force_slots = frozenset(
+            slot.slot_id
+            for slot in plan.changed + plan.retry
+            if manifest_map[slot.slot_id].get("status") != "missing"
+        )
+        print(f"[images] incremental: {len(selected)} slots a procesar, {plan.unchanged} sin cambios")
+
+    mock = _resolve_mode(args)
     result = generate(
         slots=selected,
         options=GenerationOptions(
@@ -588,6 +716,7 @@ def main() -> None:
             force=args.force,
             optimize_existing=args.optimize_existing,
             continue_on_error=args.continue_on_error,
+            force_slots=force_slots,
         ),
     )
 
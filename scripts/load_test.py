@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import uvicorn
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.repositories import list_kits, list_products, list_stages
+
+# Mezcla por defecto: ruta (template) -> peso relativo.
+DEFAULT_MIX = {
+    "/": 2,
+    "/stages": 3,
+    "/stages/{stage_id}": 3,
+    "/products": 2,
+    "/products/{product_id}": 2,
+    "/kits": 1,
+}
+ID_SAMPLE_SIZE = 50
+
+
+@dataclass
+class RouteStats:
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+
+    @property
+    def requests(self) -> int:
+        return len(self.latencies_ms) + self.errors
+
+
+@dataclass
+class LoadResult:
+    routes: dict[str, RouteStats] = field(default_factory=dict)
+    elapsed_s: float = 0.0
+
+    def record(self, route: str, latency_ms: float | None) -> None:
+        stats = self.routes.setdefault(route, RouteStats())
+        if latency_ms is None:
+            stats.errors += 1
+        else:
+            stats.latencies_ms.append(latency_ms)
+
+    @property
+    def latencies_ms(self) -> list[float]:
+        return [value for stats in self.routes.values() for value in stats.latencies_ms]
+
+    @property
+    def errors(self) -> int:
+        return sum(stats.errors for stats in self.routes.values())
+
+    @property
+    def requests(self) -> int:
+        return sum(stats.requests for stats in self.routes.values())
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _wait_for_ready(base_url: str, timeout_s: float = 60.0) -> None:
+    """Espera a que `/ready` responda 200 (warmup terminado); si el deploy no tiene `/ready` (404), usa `/health`."""
+    deadline = time.time() + timeout_s
+    probe = "/ready"
+    while time.time() < deadline:
+        try:
+            status = httpx.get(f"{base_url}{probe}", timeout=2).status_code
+            if status == 200:
+                return
+            if status == 404 and probe == "/ready":
+                probe = "/health"
+                continue
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"No fue posible levantar app en {base_url}")
+
+
+def parse_mix(raw: str | None) -> dict[str, float]:
+    """Parsea `"/stages=3,/products/{product_id}=1"`; sin valor usa DEFAULT_MIX."""
+    if not raw:
+        return dict(DEFAULT_MIX)
+    mix: dict[str, float] = {}
+    for part in raw.split(","):
+        route, _, weight = part.strip().partition("=")
+        if route:
+            mix[route] = float(weight or 1)
+    return mix
+
+
+def build_targets(mix: dict[str, float]) -> dict[str, list[str]]:
+    """Expande cada template de la mezcla a paths concretos con ids reales de la DB."""
+    ids = {
+        "{stage_id}": [stage.id for stage in list_stages()[:ID_SAMPLE_SIZE]],
+        "{product_id}": [product.id for product in list_products()[:ID_SAMPLE_SIZE]],
+        "{kit_id}": [kit.id for kit in list_kits()[:ID_SAMPLE_SIZE]],
+    }
+    targets: dict[str, list[str]] = {}
+    for route in mix:
+        placeholder = next((key for key in ids if key in route), None)
+        if placeholder is None:
+            targets[route] = [route]
+        elif ids[placeholder]:
+            targets[route] = [route.replace(placeholder, str(value)) for value in ids[placeholder]]
+    return targets
+
+
+class _Picker:
+    def __init__(self, mix: dict[str, float], targets: dict[str, list[str]], seed: int) -> None:
+        self.routes = [route for route in mix if route in targets]
+        if not self.routes:
+            raise ValueError("La mezcla no tiene rutas disponibles (¿DB vacía?)")
+        self.weights = [mix[route] for route in self.routes]
+        self.targets = targets
+        self.rng = random.Random(seed)
+
+    def next(self) -> tuple[str, str]:
+        route = self.rng.choices(self.routes, weights=self.weights)[0]
+        return route, self.rng.choice(self.targets[route])
+
+
+async def _fetch(client: httpx.AsyncClient, path: str) -> bool:
+    try:
+        response = await client.get(path)
+    except httpx.HTTPError:
+        return False
+    return response.status_code < 400
+
+
+async def run_load(
+    base_url: str,
+    mix: dict[str, float],
+    targets: dict[str, list[str]],
+    concurrency: int,
+    total_requests: int,
+    seed: int = 0,
+) -> LoadResult:
+    """Modo cerrado: `concurrency` clientes disparan `total_requests` requests tan rápido como responde la app."""
+    result = LoadResult()
+    picker = _Picker(mix, targets, seed)
+    counter = {"next": 0}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+
+        async def worker() -> None:
+            while counter["next"] < total_requests:
+                counter["next"] += 1
+                route, path = picker.next()
+                started = time.perf_counter()
+                ok = await _fetch(client, path)
+                result.record(route, (time.perf_counter() - started) * 1000 if ok else None)
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        result.elapsed_s = time.perf_counter() - started_at
+    return result
+
+
+async def run_rate(
+    base_url: str,
+    mix: dict[str, float],
+    targets: dict[str, list[str]],
+    rate: float,
+    duration_s: float,
+    max_in_flight: int,
+    seed: int = 0,
+) -> LoadResult:
+    """Modo abierto: agenda `rate` req/s durante `duration_s`; la latencia se mide desde el instante agendado."""
+    result = LoadResult()
+    picker = _Picker(mix, targets, seed)
+    semaphore = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight)
+    total = int(rate * duration_s)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        loop = asyncio.get_running_loop()
+        started_at = loop.time()
+
+        async def one(scheduled: float, route: str, path: str) -> None:
+            async with semaphore:
+                ok = await _fetch(client, path)
+            latency_ms = (loop.time() - scheduled) * 1000
+            result.record(route, latency_ms if ok else None)
+
+        tasks = []
+        for index in range(total):
+            scheduled = started_at + index / rate
+            delay = scheduled - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            route, path = picker.next()
+            tasks.append(asyncio.create_task(one(scheduled, route, path)))
+        await asyncio.gather(*tasks)
+        result.elapsed_s = loop.time() - started_at
+    return result
+
+
+def summarize(result: LoadResult) -> dict[str, dict[str, float]]:
+    rows: dict[str, dict[str, float]] = {}
+    groups = {**result.routes, "TOTAL": RouteStats(latencies_ms=result.latencies_ms, errors=result.errors)}
+    for route, stats in groups.items():
+        rows[route] = {
+            "requests": stats.requests,
+            "errors": stats.errors,
+            "error_rate": round(stats.errors / stats.requests, 4) if stats.requests else 0.0,
+            "throughput_rps": round(stats.requests / result.elapsed_s, 1) if result.elapsed_s else 0.0,
+            "p50_ms": round(_percentile(stats.latencies_ms, 50), 1),
+            "p95_ms": round(_percentile(stats.latencies_ms, 95), 1),
+            "p99_ms": round(_percentile(stats.latencies_ms, 99), 1),
+            "mean_ms": round(statistics.fmean(stats.latencies_ms), 1) if stats.latencies_ms else 0.0,
+        }
+    return rows
+
+
+def _start_in_process(host: str, port: int):
+    from app.main import app
+
+    config = uvicorn.Config(app, host=host, port=port, log_level="warning", backlog=4096)
+    server = uvicorn.Server(config=config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+
+    def stop() -> None:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+    return stop
+
+
+def _start_workers(host: str, port: int, workers: int):
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--host",
+            host,
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--log-level",
+            "warning",
+            "--backlog",
+            "4096",
+        ],
+        cwd=ROOT,
+        env=os.environ.copy(),
+    )
+
+    def stop() -> None:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+    return stop
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load test local: levanta la app con uvicorn y mide throughput y latencia por ruta")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8124)
+    parser.add_argument("--url", default=None, help="Apuntar a un servidor ya levantado en lugar de iniciar uno")
+    parser.add_argument("--workers", type=int, default=1, help="Con N>1 levanta `uvicorn --workers N` en un subproceso")
+    parser.add_argument("--mix", default=None, help='Mezcla ponderada, ej. "/stages=3,/stages/{stage_id}=2,/products=1"')
+    parser.add_argument("--concurrency", type=int, default=200, help="Clientes concurrentes (o máximo en vuelo con --rate)")
+    parser.add_argument("--requests", type=int, default=4000, help="Total de requests en modo cerrado")
+    parser.add_argument("--rate", type=float, default=None, help="Modo abierto: requests por segundo")
+    parser.add_argument("--duration", type=float, default=30.0, help="Segundos de carga en modo --rate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Imprime el resumen por ruta como JSON")
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    targets = build_targets(mix)
+    base_url = args.url or f"http://{args.host}:{args.port}"
+    stop = None
+    if not args.url:
+        stop = _start_workers(args.host, args.port, args.workers) if args.workers > 1 else _start_in_process(args.host, args.port)
+
+    try:
+        _wait_for_ready(base_url)
+        if args.rate:
+            result = asyncio.run(run_rate(base_url, mix, targets, args.rate, args.duration, args.concurrency, args.seed))
+        else:
+            result = asyncio.run(run_load(base_url, mix, targets, args.concurrency, args.requests, args.seed))
+    finally:
+        if stop:
+            stop()
+
+    summary = summarize(result)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        mode = f"rate={args.rate:g}/s duration={args.duration:g}s" if args.rate else f"concurrency={args.concurrency}"
+        print(f"[load] {base_url} workers={args.workers} {mode} elapsed={result.elapsed_s:.2f}s")
+        print(f"[load] {'ruta':<26} {'reqs':>6} {'err%':>6} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for route, row in summary.items():
+            print(
+                f"[load] {route:<26} {row['requests']:>6} {row['error_rate'] * 100:>5.1f}% {row['throughput_rps']:>8.1f} "
+                f"{row['p50_ms']:>8.1f} {row['p95_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+            )
+    if result.errors:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ import sys
 sys.path.append(str(Path(__file__).resolve().parents[1]))
 
 from app.db import get_conn, init_db
+from app.services.tool_index import rebuild_tool_index
 
 
 STAGE_CARD_1 = "section-images/stages/stage.card.1.v1.svg"
@@ -90,4 +91,5 @@ def seed_demo_data() -> None:
 if __name__ == "__main__":
     init_db()
     seed_demo_data()
+    rebuild_tool_index()
     print("✅ Datos demo insertados")
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parents[1]
+import sys
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.config import settings
+from app.db import get_conn, init_db
+from app.services.image_resolver import entity_slot
+
+DEFAULT_IMAGES_ROOT = ROOT / "app" / "static" / "img" / "generated"
+BATCH_SIZE = 5000
+
+STAGE_NAMES = (
+    "Preparación del sustrato",
+    "Pasteurización",
+    "Inoculación e incubación",
+    "Fructificación",
+    "Cosecha",
+    "Conservación",
+    "Limpieza de sala",
+    "Control ambiental",
+)
+STEP_VERBS = ("Hidratar", "Medir", "Mezclar", "Armar", "Controlar", "Ventilar", "Registrar", "Cortar", "Limpiar", "Pesar")
+STEP_OBJECTS = ("paja", "bolsas", "spawn", "sustrato", "humedad", "temperatura", "estantes", "racimos", "filtros", "guantes")
+TOOLS = ("Balde", "Termómetro", "Higrómetro", "Guantes", "Alcohol 70%", "Bolsas con filtro", "Precinto", "Rociador", "Olla", "Bandeja")
+CATEGORIES = ("Inóculo", "Consumibles", "Higiene", "Control", "Kits", "Iluminación", "Ventilación", "Sustratos")
+PRODUCT_NOUNS = ("Spawn", "Bolsas", "Termómetro", "Higrómetro", "Humidificador", "Extractor", "Lámpara", "Sustrato", "Filtro", "Estante")
+PRODUCT_TRAITS = ("Ostra", "Melena", "Pro", "Mini", "x50", "Digital", "LED", "HEPA", "1kg", "5kg", "Premium", "Eco")
+
+
+@dataclass(frozen=True)
+class CatalogSpec:
+    stages: int = 500
+    steps: int = 20_000
+    products: int = 50_000
+    kits: int = 5_000
+    seed: int = 42
+
+
+@dataclass
+class SeedResult:
+    counts: dict[str, int] = field(default_factory=dict)
+    elapsed_s: dict[str, float] = field(default_factory=dict)
+
+
+def _stage_rows(spec: CatalogSpec, rng: random.Random) -> list[tuple]:
+    rows = []
+    for stage_id in range(1, spec.stages + 1):
+        name = f"{rng.choice(STAGE_NAMES)} {stage_id}"
+        rows.append((stage_id, name, stage_id, None, None, None))
+    return rows
+
+
+def _step_rows(spec: CatalogSpec, rng: random.Random) -> list[tuple]:
+    rows = []
+    for step_id in range(1, spec.steps + 1):
+        stage_id = rng.randint(1, spec.stages) if spec.stages else 1
+        title = f"{rng.choice(STEP_VERBS)} {rng.choice(STEP_OBJECTS)} {step_id}"
+        content = f"Objetivo: paso sintético {step_id}.\n\nChecklist:\n- " + "\n- ".join(rng.sample(STEP_OBJECTS, 3))
+        tools = json.dumps(rng.sample(TOOLS, rng.randint(1, 4)), ensure_ascii=False)
+        rows.append((step_id, stage_id, title, content, tools, round(rng.uniform(2, 60), 2), None))
+    return rows
+
+
+def _product_rows(spec: CatalogSpec, rng: random.Random) -> list[tuple]:
+    rows = []
+    for product_id in range(1, spec.products + 1):
+        name = f"{rng.choice(PRODUCT_NOUNS)} {rng.choice(PRODUCT_TRAITS)} {product_id}"
+        category = rng.choice(CATEGORIES)
+        internal = 1 if category == "Kits" else 0
+        url = f"https://example.com/p/{product_id}"
+        rows.append((product_id, name, category, round(rng.uniform(3, 250), 2), url, internal, None))
+    return rows
+
+
+def _kit_rows(spec: CatalogSpec, rng: random.Random) -> list[tuple]:
+    rows = []
+    for kit_id in range(1, spec.kits + 1):
+        name = f"Kit {rng.choice(PRODUCT_TRAITS)} {kit_id}"
+        components = [f"{rng.choice(PRODUCT_NOUNS)} {rng.choice(PRODUCT_TRAITS)}" for _ in range(rng.randint(2, 6))]
+        rows.append(
+            (
+                kit_id,
+                name,
+                f"Kit sintético {kit_id} para pruebas de escala.",
+                round(rng.uniform(20, 300), 2),
+                json.dumps(components, ensure_ascii=False),
+                None,
+                None,
+            )
+        )
+    return rows
+
+
+def _insert_batched(conn, sql: str, rows: list[tuple]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.executemany(sql, rows[start : start + BATCH_SIZE])
+
+
+def seed_catalog(spec: CatalogSpec, db_path: str | None = None) -> tuple[SeedResult, dict[str, list[tuple]]]:
+    """Reemplaza el catálogo por uno sintético y reproducible (misma `seed` -> mismas filas)."""
+    rng = random.Random(spec.seed)
+    result = SeedResult()
+    started = time.perf_counter()
+    rows = {
+        "stages": _stage_rows(spec, rng),
+        "tutorial_steps": _step_rows(spec, rng),
+        "products": _product_rows(spec, rng),
+        "kits": _kit_rows(spec, rng),
+    }
+    result.elapsed_s["generate"] = time.perf_counter() - started
+
+    init_db(db_path)
+    started = time.perf_counter()
+    with get_conn(db_path) as conn:
+        conn.execute("PRAGMA synchronous = OFF")
+        for table in ("tutorial_steps", "stages", "products", "kits"):
+            conn.execute(f"DELETE FROM {table}")
+        _insert_batched(
+            conn,
+            "INSERT INTO stages(id, name, order_index, image_card_1, image_card_2, image_hero) VALUES(?, ?, ?, ?, ?, ?)",
+            rows["stages"],
+        )
+        _insert_batched(
+            conn,
+            """
+            INSERT INTO tutorial_steps(id, stage_id, title, content, tools_json, estimated_cost_usd, image)
+            VALUES(?, ?, ?, ?, ?, ?, ?)
+            """,
+            rows["tutorial_steps"],
+        )
+        _insert_batched(
+            conn,
+            "INSERT INTO products(id, name, category, price, affiliate_url, internal_product, image) VALUES(?, ?, ?, ?, ?, ?, ?)",
+            rows["products"],
+        )
+        _insert_batched(
+            conn,
+            "INSERT INTO kits(id, name, description, price, components_json, image_card, image_result) VALUES(?, ?, ?, ?, ?, ?, ?)",
+            rows["kits"],
+        )
+    result.elapsed_s["insert"] = time.perf_counter() - started
+    result.counts = {table: len(table_rows) for table, table_rows in rows.items()}
+    return result, rows
+
+
+def _mock_image_bytes(color: tuple[int, int, int], image_format: str) -> bytes:
+    buffer = BytesIO()
+    Image.new("RGB", (64, 43), color).save(buffer, format=image_format)
+    return buffer.getvalue()
+
+
+def _image_slots(rows: dict[str, list[tuple]]) -> list[tuple[str, str]]:
+    slots: list[tuple[str, str]] = []
+    for stage_id, name, *_ in rows["stages"]:
+        slot = entity_slot("stage", stage_id, name)
+        slots.extend([("stages", slot), ("stages", f"{slot}-card-1"), ("stages", f"{slot}-card-2")])
+    for step_id, _, title, *_ in rows["tutorial_steps"]:
+        slots.append(("stages", f"{entity_slot('step', step_id, title)}-card-1"))
+    for product_id, name, *_ in rows["products"]:
+        slots.append(("products", entity_slot("product", product_id, name)))
+    for kit_id, name, *_ in rows["kits"]:
+        slots.extend([("kits", entity_slot("kit", kit_id, name)), ("kits", entity_slot("kit-result", kit_id, name))])
+    return slots
+
+
+def write_mock_images(rows: dict[str, list[tuple]], root: Path, ratio: float, seed: int) -> int:
+    """Escribe `md.webp` + `md.jpg` mínimos para una fracción `ratio` de los slots del catálogo."""
+    rng = random.Random(seed)
+    webp = _mock_image_bytes((120, 140, 110), "WEBP")
+    jpg = _mock_image_bytes((120, 140, 110), "JPEG")
+    written = 0
+    for section, slot in _image_slots(rows):
+        if rng.random() >= ratio:
+            continue
+        folder = root / section / slot
+        folder.mkdir(parents=True, exist_ok=True)
+        (folder / "md.webp").write_bytes(webp)
+        (folder / "md.jpg").write_bytes(jpg)
+        written += 1
+    return written
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = CatalogSpec()
+    parser = argparse.ArgumentParser(description="Carga un catálogo sintético grande para pruebas de escala")
+    parser.add_argument("--stages", type=int, default=defaults.stages)
+    parser.add_argument("--steps", type=int, default=defaults.steps)
+    parser.add_argument("--products", type=int, default=defaults.products)
+    parser.add_argument("--kits", type=int, default=defaults.kits)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument("--db", default=None, help="Ruta SQLite (default: DB_PATH)")
+    parser.add_argument("--images", action="store_true", help="Generar árbol de imágenes mock en img/generated")
+    parser.add_argument("--image-ratio", type=float, default=0.5, help="Fracción de slots con imagen (0 a 1)")
+    parser.add_argument("--images-root", type=Path, default=DEFAULT_IMAGES_ROOT)
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    spec = CatalogSpec(stages=args.stages, steps=args.steps, products=args.products, kits=args.kits, seed=args.seed)
+    result, rows = seed_catalog(spec, db_path=args.db)
+    print(
+        f"[seed] db={args.db or settings.db_path} seed={spec.seed} "
+        + " ".join(f"{table}={count}" for table, count in result.counts.items())
+    )
+    print(f"[seed] generate={result.elapsed_s['generate']:.2f}s insert={result.elapsed_s['insert']:.2f}s")
+    if args.images:
+        started = time.perf_counter()
+        written = write_mock_images(rows, args.images_root, args.image_ratio, spec.seed)
+        print(f"[seed] images slots={written} root={args.images_root} elapsed={time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
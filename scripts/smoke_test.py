@@ -5,12 +5,13 @@ import subprocess
 import sys
 from pathlib import Path
 
-from dotenv import load_dotenv
 from fastapi.testclient import TestClient
 
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
+from app.config import load_env_file
+
 
 def _print(msg: str) -> None:
     print(f"[smoke] {msg}")
@@ -19,7 +20,7 @@ def _print(msg: str) -> None:
 def _load_env_if_present() -> None:
     env_file = ROOT / ".env"
     if env_file.exists():
-        load_dotenv(env_file)
+        load_env_file()
         _print(".env cargado")
     else:
         _print("WARN: .env no encontrado; continúo con variables de entorno exportadas")
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import app.services.ai_content as ai_content
+
+
+class _FakeAsyncClient:
+    def __init__(self) -> None:
+        self.closed = False
+        self.responses = self
+
+    async def create(self, **_kwargs):
+        payload = {"stage_title": "Inoculación", "steps": []}
+        return type("Response", (), {"output_text": json.dumps(payload)})()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_exc) -> None:
+        self.closed = True
+
+
+def test_async_generation_closes_its_client(monkeypatch):
+    client = _FakeAsyncClient()
+    monkeypatch.setattr(ai_content, "_async_client", lambda: client)
+
+    tutorial = asyncio.run(ai_content.generate_stage_tutorial_async("Inoculación"))
+
+    assert tutorial.stage_title == "Inoculación"
+    assert client.closed is True
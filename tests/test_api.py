@@ -1,6 +1,9 @@
 from fastapi.testclient import TestClient
 
+from app.config import settings
 from app.main import app
+from app.models import Kit
+from app.repositories import create_kit, create_stage, create_step, list_kits, list_stages
 
 
 client = TestClient(app)
@@ -22,3 +25,24 @@ def test_api_stages_returns_list():
     resp = client.get("/api/stages")
     assert resp.status_code == 200
     assert isinstance(resp.json(), list)
+
+
+def test_debug_image_bindings_lists_stage_and_kit_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "bindings.db"))
+    create_stage("Inoculación", 1)
+    stage = list_stages()[0]
+    create_step(stage.id, "Hidratar paja", "...", ["Rociador"], None)
+    create_kit(Kit(name="Kit Ostra", description="...", price=10, components_json=[]))
+    kit = list_kits()[0]
+
+    resp = client.get(f"/debug/image-bindings?stage_id={stage.id}&kit_id={kit.id}")
+
+    assert resp.status_code == 200
+    assert [row["kind"] for row in resp.json()["rows"]] == ["hero", "card-1", "card-2", "step", "main", "result"]
+    assert all(row["public_url"].startswith("/static/") for row in resp.json()["rows"])
+    assert client.get("/debug/image-bindings?stage_id=999").status_code == 404
+    assert client.get("/debug/image-bindings?kit_id=999").status_code == 404
+
+    check = client.get("/debug/static-check")
+    assert check.status_code == 200
+    assert f"stage:{stage.id} md" in check.text and f"kit:{kit.id} md" in check.text
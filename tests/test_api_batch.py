@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.routes import api
+from app.repositories import list_stages, list_steps_by_stage
+from scripts.seed_large import CatalogSpec, seed_catalog
+
+client = TestClient(app)
+
+
+def _seed(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "batch.db"))
+    seed_catalog(CatalogSpec(stages=5, steps=20, products=3, kits=1, seed=8))
+
+
+def test_batch_matches_single_stage_detail(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+    ids = [stage.id for stage in list_stages()][:3][::-1]
+
+    resp = client.get(f"/api/stages/batch?ids={','.join(map(str, ids))},999&include=steps,images")
+
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert [item["stage"]["id"] for item in payload["stages"]] == ids
+    assert payload["missing"] == [999]
+    for item in payload["stages"]:
+        single = client.get(f"/api/stages/{item['stage']['id']}").json()
+        assert item["steps"] == single["steps"]
+        assert item["images"]["hero"]
+        assert set(item["images"]["steps"]) == {str(step.id) for step in list_steps_by_stage(item["stage"]["id"])}
+
+
+def test_batch_validates_ids_and_includes(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+    monkeypatch.setattr(settings, "api_batch_max_ids", 2)
+
+    assert set(client.get("/api/stages/batch?ids=1").json()["stages"][0]) == {"stage"}
+    assert client.get("/api/stages/batch?ids=1,2,3").status_code == 400
+    assert client.get("/api/stages/batch?ids=1,x").status_code == 400
+    assert client.get("/api/stages/batch?ids=1&include=kits").status_code == 400
+
+
+def test_batch_images_are_not_served_from_response_cache(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+    stage_id = list_stages()[0].id
+    url = f"/api/stages/batch?ids={stage_id}&include=images"
+    hero = {"path": "img/placeholder.svg"}
+    monkeypatch.setattr(api, "_batch_images", lambda entries: {stage.id: {"hero": hero["path"]} for stage, _ in entries})
+
+    first = client.get(url)
+    hero["path"] = "img/generated/stages/nuevo/md.webp"
+    second = client.get(url)
+
+    assert first.json()["stages"][0]["images"]["hero"] == "img/placeholder.svg"
+    assert second.json()["stages"][0]["images"]["hero"] == "img/generated/stages/nuevo/md.webp"
+    assert client.get(url, headers={"If-None-Match": second.headers["etag"]}).status_code == 304
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.repositories import create_stage
+from scripts.seed_large import CatalogSpec, seed_catalog
+
+client = TestClient(app)
+
+
+def _seed(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "etag.db"))
+    seed_catalog(CatalogSpec(stages=4, steps=8, products=6, kits=2, seed=5))
+
+
+def test_etag_returns_304_until_catalog_changes(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+
+    first = client.get("/api/stages")
+    etag = first.headers["etag"]
+    assert first.status_code == 200
+    assert etag.startswith('"')
+
+    cached = client.get("/api/stages", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+    create_stage("Etapa nueva", 99)
+    changed = client.get("/api/stages", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert len(changed.json()) == 5
+
+
+def test_sparse_fieldsets_trim_entities(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+
+    rows = client.get("/api/products?fields=id,name").json()
+    assert rows and all(set(row) == {"id", "name"} for row in rows)
+
+    stage_id = client.get("/api/stages?limit=1&fields=id").json()[0]["id"]
+    detail = client.get(f"/api/stages/{stage_id}?fields=id,title").json()
+    assert detail["stage"] == {"id": stage_id}
+    assert all(set(step) <= {"id", "title"} for step in detail["steps"])
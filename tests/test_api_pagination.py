@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.pagination import encode_cursor
+from scripts.seed_large import CatalogSpec, seed_catalog
+
+client = TestClient(app)
+
+
+def _seed(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "pages.db"))
+    seed_catalog(CatalogSpec(stages=7, steps=10, products=23, kits=5, seed=3))
+
+
+def test_products_keyset_pages_cover_catalog_in_order(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+
+    seen: list[dict] = []
+    url = "/api/products?limit=10"
+    while url:
+        resp = client.get(url)
+        assert resp.status_code == 200
+        seen.extend(resp.json())
+        cursor = resp.headers.get("x-next-cursor")
+        url = f"/api/products?limit=10&cursor={cursor}" if cursor else None
+
+    assert len(seen) == 23
+    keys = [(row["category"], row["name"], row["id"]) for row in seen]
+    assert keys == sorted(keys)
+
+
+def test_stages_page_link_header_and_bad_cursor(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+
+    first = client.get("/api/stages?limit=5")
+    assert len(first.json()) == 5
+    assert 'rel="next"' in first.headers["link"]
+
+    last = client.get(f"/api/stages?limit=5&cursor={first.headers['x-next-cursor']}")
+    assert [row["order_index"] for row in last.json()] == [6, 7]
+    assert "x-next-cursor" not in last.headers
+
+    assert client.get("/api/stages?cursor=not-a-cursor").status_code == 400
+    for values in ([[1], 2], [1, {"id": 2}], ["1", 2], [True, 2], [1.5, 2]):
+        assert client.get(f"/api/stages?cursor={encode_cursor(tuple(values))}").status_code == 400
+    assert client.get(f"/api/products?cursor={encode_cursor(('Sustrato', None, 3))}").status_code == 400
+    assert client.get(f"/api/kits?cursor={encode_cursor(('Kit', 1))}").status_code == 200
+
+
+def test_ndjson_stream_returns_one_object_per_line(tmp_path, monkeypatch):
+    _seed(tmp_path, monkeypatch)
+
+    resp = client.get("/api/kits.ndjson")
+
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert len(rows) == 5
+    keys = [(row["name"], row["id"]) for row in rows]
+    assert keys == sorted(keys)
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from scripts.bench_hot_paths import compare, measure
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {"results": {"small": {"repo.list_stages": {"median_ms": 1.0}, "e2e./": {"median_ms": 2.0}}}}
+    current = {
+        "results": {
+            "small": {
+                "repo.list_stages": {"median_ms": 1.1},
+                "e2e./": {"median_ms": 3.0},
+                "e2e./kits": {"median_ms": 9.0},
+            }
+        }
+    }
+
+    regressions = compare(current, baseline, threshold=0.15)
+
+    assert [(row["size"], row["case"], row["ratio"]) for row in regressions] == [("small", "e2e./", 1.5)]
+
+
+def test_measure_reports_rounds_and_percentiles():
+    stats = measure(lambda: sum(range(100)), min_time_s=0.0, min_rounds=7)
+
+    assert stats["rounds"] == 7
+    assert stats["min_ms"] <= stats["median_ms"] <= stats["p95_ms"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.db import get_conn
+from app.main import app
+from app.models import Product
+from app.pagination import encode_cursor
+from app.repositories import create_product, create_stage, get_product, list_products
+
+client = TestClient(app)
+
+
+def test_timestamps_and_change_feed(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "changes.db"))
+    create_stage("Preparación", 1)
+    create_product(Product(name="Balde", category="Consumibles", price=5, affiliate_url="https://example.com"))
+    product = list_products()[0]
+    assert product.created_at and product.created_at == product.updated_at
+
+    first = client.get("/api/changes").json()
+    assert [(c["entity"], c["op"]) for c in first["changes"]] == [("stage", "insert"), ("product", "insert")]
+    assert first["has_more"] is False
+
+    with get_conn() as conn:
+        conn.execute("UPDATE products SET updated_at = '2000-01-01T00:00:00.000Z' WHERE id = ?", (product.id,))
+        conn.execute("UPDATE products SET price = 6 WHERE id = ?", (product.id,))
+        conn.execute("DELETE FROM stages")
+    assert get_product(product.id).updated_at > "2000"
+
+    second = client.get(f"/api/changes?since={first['next_cursor']}").json()
+    assert [(c["entity"], c["entity_id"], c["op"]) for c in second["changes"]] == [
+        ("product", product.id, "update"),
+        ("product", product.id, "update"),
+        ("stage", 1, "delete"),
+    ]
+
+    empty = client.get(f"/api/changes?since={second['next_cursor']}").json()
+    assert empty == {"changes": [], "next_cursor": second["next_cursor"], "has_more": False}
+
+    paged = client.get("/api/changes?limit=2").json()
+    assert len(paged["changes"]) == 2 and paged["has_more"] is True
+    assert client.get("/api/changes?since=nope").status_code == 400
+
+
+def test_change_feed_rejects_mistyped_cursors(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "changes.db"))
+    for value in ("x", None, [1], 1.5, True, -1):
+        assert client.get(f"/api/changes?since={encode_cursor((value,))}").status_code == 400
+    assert client.get(f"/api/changes?since={encode_cursor((0,))}").status_code == 200
+
+
+def test_back_to_back_updates_are_all_logged(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "changes.db"))
+    create_product(Product(name="Balde", category="Consumibles", price=5, affiliate_url="https://example.com"))
+    product = list_products()[0]
+
+    with get_conn() as conn:
+        for price in range(6, 11):
+            conn.execute("UPDATE products SET price = ? WHERE id = ?", (price, product.id))
+
+    ops = [change["op"] for change in client.get("/api/changes").json()["changes"]]
+    assert ops == ["insert"] + ["update"] * 5
+    assert get_product(product.id).updated_at > product.updated_at
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+import os
+
+from app import config
+
+
+def test_env_file_reader_parses_and_keeps_existing_values(tmp_path, monkeypatch):
+    (tmp_path / ".env").write_text(
+        "# comentario\n"
+        "APP_TITLE_TEST='Indoor Lab'\n"
+        'export DB_PATH_TEST="data/test.db"\n'
+        "OPENAI_KEY_TEST=sk-123 # clave\n"
+        "EMPTY_TEST=\n"
+        "ALREADY_SET_TEST=desde-env\n"
+        "sin-igual\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(config, "ROOT", tmp_path)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ALREADY_SET_TEST", "original")
+    for key in ("APP_TITLE_TEST", "DB_PATH_TEST", "OPENAI_KEY_TEST", "EMPTY_TEST"):
+        monkeypatch.delenv(key, raising=False)
+
+    config.load_env_file()
+
+    assert os.environ["APP_TITLE_TEST"] == "Indoor Lab"
+    assert os.environ["DB_PATH_TEST"] == "data/test.db"
+    assert os.environ["OPENAI_KEY_TEST"] == "sk-123"
+    assert os.environ["EMPTY_TEST"] == ""
+    assert os.environ["ALREADY_SET_TEST"] == "original"
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import scripts.export_static as export_static
+from app.config import settings
+from app.db import get_conn, init_db
+from scripts.seed_demo import seed_demo_data
+
+
+def _seeded_db(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "export.db"))
+    init_db()
+    seed_demo_data()
+
+
+def test_export_writes_html_and_gzip(tmp_path, monkeypatch):
+    _seeded_db(tmp_path, monkeypatch)
+    out_dir = tmp_path / "site"
+
+    result = export_static.export(out_dir=out_dir, manifest_path=tmp_path / "manifest.json")
+
+    assert result.failures == []
+    assert "/" in result.rendered
+    assert "/stages/23" in result.rendered
+    assert (out_dir / "index.html").exists()
+    assert (out_dir / "stages" / "23" / "index.html.gz").exists()
+    assert (out_dir / "products" / "index.html").read_text(encoding="utf-8").count("<article") == 8
+
+
+def test_export_only_rerenders_changed_pages(tmp_path, monkeypatch):
+    _seeded_db(tmp_path, monkeypatch)
+    out_dir = tmp_path / "site"
+    manifest = tmp_path / "manifest.json"
+    export_static.export(out_dir=out_dir, manifest_path=manifest)
+
+    unchanged = export_static.export(out_dir=out_dir, manifest_path=manifest)
+    assert unchanged.rendered == []
+
+    with get_conn() as conn:
+        product_id = conn.execute("SELECT id FROM products ORDER BY id LIMIT 1").fetchone()[0]
+        conn.execute("UPDATE products SET name = 'Spawn renombrado' WHERE id = ?", (product_id,))
+        conn.execute("DELETE FROM tutorial_steps WHERE stage_id = 24")
+        conn.execute("DELETE FROM stages WHERE id = 24")
+
+    changed = export_static.export(out_dir=out_dir, manifest_path=manifest)
+    assert sorted(changed.rendered) == sorted(["/products", f"/products/{product_id}", "/stages"])
+    assert changed.removed == ["/stages/24"]
+    assert not (out_dir / "stages" / "24" / "index.html").exists()
+
+
+def test_export_rerenders_stage_when_linked_product_changes(tmp_path, monkeypatch):
+    _seeded_db(tmp_path, monkeypatch)
+    out_dir = tmp_path / "site"
+    manifest = tmp_path / "manifest.json"
+    with get_conn() as conn:
+        tool = conn.execute(
+            "SELECT st.tool FROM step_tools st JOIN tutorial_steps t ON t.id = st.step_id WHERE t.stage_id = 23 LIMIT 1"
+        ).fetchone()[0]
+        product_id = conn.execute("SELECT id FROM products ORDER BY id LIMIT 1").fetchone()[0]
+        conn.execute(
+            "INSERT INTO tool_products (tool_slug, product_id, score, position) VALUES (?, ?, 1.0, 0)",
+            (export_static.tool_slug(tool), product_id),
+        )
+    export_static.export(out_dir=out_dir, manifest_path=manifest)
+
+    with get_conn() as conn:
+        conn.execute("UPDATE products SET name = 'Producto enlazado renombrado' WHERE id = ?", (product_id,))
+
+    changed = export_static.export(out_dir=out_dir, manifest_path=manifest)
+    assert "/stages/23" in changed.rendered
+    assert "Producto enlazado renombrado" in (out_dir / "stages" / "23" / "index.html").read_text(encoding="utf-8")
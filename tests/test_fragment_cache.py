@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from jinja2 import DictLoader, Environment
+
+from app.fragment_cache import FragmentCacheExtension, fragment_key
+
+TEMPLATE = "{% for row in rows %}{% cache row.cache_key %}<li>{{ render(row.name) }}</li>{% endcache %}{% endfor %}"
+
+
+def _env(auto_reload: bool) -> Environment:
+    return Environment(
+        loader=DictLoader({"list.html": TEMPLATE}),
+        autoescape=True,
+        auto_reload=auto_reload,
+        extensions=[FragmentCacheExtension],
+    )
+
+
+def _rows(*names: str) -> list[dict[str, object]]:
+    rows = []
+    for idx, name in enumerate(names, start=1):
+        row: dict[str, object] = {"id": idx, "name": name}
+        row["cache_key"] = fragment_key("card", row)
+        rows.append(row)
+    return rows
+
+
+def test_only_changed_cards_are_rendered_again():
+    env = _env(auto_reload=False)
+    calls: list[str] = []
+
+    def render(name: str) -> str:
+        calls.append(name)
+        return name
+
+    template = env.get_template("list.html")
+    first = template.render(rows=_rows("Ostra", "Melena <b>"), render=render)
+    assert first == "<li>Ostra</li><li>Melena &lt;b&gt;</li>"
+    assert calls == ["Ostra", "Melena <b>"]
+
+    calls.clear()
+    second = template.render(rows=_rows("Ostra", "Melena editada"), render=render)
+    assert second == "<li>Ostra</li><li>Melena editada</li>"
+    assert calls == ["Melena editada"]
+    assert env.fragment_cache.hits == 1
+
+
+def test_cache_is_bypassed_when_templates_auto_reload():
+    env = _env(auto_reload=True)
+    calls: list[str] = []
+
+    def render(name: str) -> str:
+        calls.append(name)
+        return name
+
+    template = env.get_template("list.html")
+    template.render(rows=_rows("Ostra"), render=render)
+    template.render(rows=_rows("Ostra"), render=render)
+    assert calls == ["Ostra", "Ostra"]
@@ -110,6 +110,10 @@ def test_main_exits_with_code_2_on_billing(monkeypatch):
                 "force": False,
                 "optimize_existing": False,
                 "continue_on_error": False,
+                "plan": False,
+                "incremental": False,
+                "prune": False,
+                "cost_per_image": gsi.DEFAULT_COST_PER_IMAGE_USD,
             },
         )(),
     )
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import scripts.generate_site_images as gsi
+
+
+def _slot(slot_id: str, prompt: str | None = None, sizes: tuple[str, ...] = ("md",)) -> gsi.SlotSpec:
+    section, _ = slot_id.split(".", 1)
+    return gsi.SlotSpec(
+        slot_id=slot_id,
+        section=section,
+        entity={"type": "page", "id": None, "slug": slot_id},
+        prompt=prompt or f"prompt {slot_id}",
+        alt=f"alt {slot_id}",
+        sizes=sizes,
+    )
+
+
+def _row(slot: gsi.SlotSpec, status: str = "ok", with_hash: bool = True) -> dict:
+    row = {
+        "slot_id": slot.slot_id,
+        "section": slot.section,
+        "prompt": slot.prompt,
+        "output_files": {size: f"/static/{size}.webp" for size in slot.sizes},
+        "status": status,
+    }
+    if with_hash:
+        row["prompt_hash"] = gsi._slot_hash(slot)
+    return row
+
+
+def test_plan_classifies_new_changed_retry_deleted():
+    same, edited, failed, added = _slot("home.hero"), _slot("stages.a"), _slot("stages.b"), _slot("kits.c")
+    manifest_map = {
+        same.slot_id: _row(same),
+        edited.slot_id: _row(_slot("stages.a", prompt="prompt viejo")),
+        failed.slot_id: _row(failed, status="placeholder_due_to_billing"),
+        "stages.gone": _row(_slot("stages.gone")),
+        "products.gone": _row(_slot("products.gone")),
+    }
+
+    plan = gsi.plan_slots([same, edited, failed, added], manifest_map)
+
+    assert [slot.slot_id for slot in plan.new] == ["kits.c"]
+    assert [slot.slot_id for slot in plan.changed] == ["stages.a"]
+    assert [slot.slot_id for slot in plan.retry] == ["stages.b"]
+    assert plan.deleted == ["products.gone", "stages.gone"]
+    assert plan.unchanged == 1
+    assert [slot.slot_id for slot in plan.to_generate] == ["kits.c", "stages.a", "stages.b"]
+
+    scoped = gsi.plan_slots([edited, failed], manifest_map, sections={"stages"})
+    assert scoped.deleted == ["stages.gone"]
+    assert gsi.plan_slots([edited], manifest_map, sections=set()).deleted == []
+
+
+def test_plan_uses_stored_prompt_for_legacy_entries_and_detects_size_changes():
+    slot = _slot("home.hero", sizes=("md", "lg"))
+    legacy = _row(slot, with_hash=False)
+
+    assert gsi.plan_slots([slot], {slot.slot_id: legacy}).unchanged == 1
+    resized = gsi.plan_slots([_slot("home.hero", sizes=("sm", "md", "lg"))], {slot.slot_id: legacy})
+    assert [row.slot_id for row in resized.changed] == ["home.hero"]
+
+
+def test_main_plan_prints_diff_and_cost_without_generating(monkeypatch, capsys):
+    existing = _slot("home.hero")
+    monkeypatch.setattr(
+        gsi,
+        "parse_args",
+        lambda: type(
+            "Args",
+            (),
+            {
+                "only": "all",
+                "only_slot": None,
+                "mock": False,
+                "real": True,
+                "force": False,
+                "optimize_existing": False,
+                "continue_on_error": False,
+                "plan": True,
+                "incremental": False,
+                "prune": False,
+                "cost_per_image": 0.5,
+            },
+        )(),
+    )
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(gsi, "_all_slots", lambda: [existing, _slot("home.faq"), _slot("stages.x", prompt="nuevo")])
+    monkeypatch.setattr(
+        gsi,
+        "_load_manifest",
+        lambda: {"slots": [_row(existing), _row(_slot("stages.x")), _row(_slot("kits.old"))]},
+    )
+    monkeypatch.setattr(gsi, "generate", lambda **_kwargs: (_ for _ in ()).throw(AssertionError("no debe generar")))
+
+    gsi.main()
+
+    out = capsys.readouterr().out
+    assert "new=1 changed=1 retry=0 deleted=1 unchanged=1" in out
+    assert " + home.faq" in out and " ~ stages.x" in out and " - kits.old" in out
+    assert "USD 1.00" in out
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# Presupuesto generoso para CI lentos; hoy `import app.main` ronda los 400 ms en un equipo de desarrollo.
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+LAZY_MODULES = ("openai", "PIL", "dotenv")
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$")
+
+
+def _import_report(module: str) -> dict[str, int]:
+    """Corre `python -X importtime -c "import <module>"` y devuelve módulo -> microsegundos acumulados."""
+    env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report: dict[str, int] = {}
+    for line in completed.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            report[match.group(4)] = int(match.group(2))
+    return report
+
+
+def test_web_import_skips_heavy_optional_modules():
+    report = _import_report("app.main")
+
+    loaded = sorted(name for name in report if name.split(".")[0] in LAZY_MODULES)
+    assert loaded == []
+
+
+def test_web_import_within_budget():
+    _import_report("app.main")  # calienta los .pyc
+    report = _import_report("app.main")
+
+    assert report["app.main"] / 1000 < IMPORT_BUDGET_MS, f"import app.main tardó {report['app.main'] / 1000:.0f} ms"
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import sqlite3
+
+from app.config import settings
+from app.db import get_conn, init_db
+from app.models import Kit
+from app.repositories import create_kit, create_stage, create_step, list_kits_with_component, list_stages, list_stages_with_tool, replace_steps
+from app.text import fold_key
+
+
+def _tools(conn) -> list[tuple]:
+    return [tuple(row) for row in conn.execute("SELECT step_id, tool FROM step_tools ORDER BY step_id, tool")]
+
+
+def test_step_tools_follow_writes_and_feed_queries(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "lists.db"))
+    create_stage("Incubación", 2)
+    create_stage("Fructificación", 3)
+    incubation, fruiting = list_stages()
+    step_id = create_step(incubation.id, "Controlar ambiente", "...", ["Higrómetro", " Termómetro "], None)
+    create_step(fruiting.id, "Rociar", "...", ["Rociador"], None)
+
+    with get_conn() as conn:
+        assert _tools(conn)[:2] == [(step_id, "Higrómetro"), (step_id, "Termómetro")]
+        conn.execute("UPDATE tutorial_steps SET tools_json = ? WHERE id = ?", ('["Higrómetro", 3, "bad"', step_id))
+        assert [row[1] for row in _tools(conn) if row[0] == step_id] == []
+        conn.execute("UPDATE tutorial_steps SET tools_json = ? WHERE id = ?", ('["Higrómetro", 3]', step_id))
+
+    assert [stage.id for stage in list_stages_with_tool("higró")] == [incubation.id]
+    assert [stage.id for stage in list_stages_with_tool("ROC")] == [fruiting.id]
+    assert [stage.id for stage in list_stages_with_tool("HIGRÓMETRO")] == [incubation.id]
+    assert [stage.id for stage in list_stages_with_tool("higrometro")] == [incubation.id]
+    assert list_stages_with_tool("%") == []
+
+    replace_steps(incubation.id, [])
+    assert list_stages_with_tool("higró") == []
+
+
+def test_migration_backfills_kit_components_from_json(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "legacy.db")
+    monkeypatch.setattr(settings, "db_path", db_path)
+    create_kit(Kit(name="Kit Ostra", description="...", price=10, components_json=["Spawn ostra 1kg", "Rociador"]))
+    create_kit(Kit(name="Kit Melena", description="...", price=10, components_json=["Spawn melena 1kg"]))
+    with get_conn() as conn:
+        # Simula una base anterior a las tablas normalizadas.
+        conn.execute("DROP TRIGGER trg_kit_components_insert")
+        conn.execute("DELETE FROM kit_components")
+
+    init_db(db_path)
+
+    assert [kit.name for kit in list_kits_with_component("spawn")] == ["Kit Melena", "Kit Ostra"]
+    assert [kit.name for kit in list_kits_with_component("rociador")] == ["Kit Ostra"]
+
+
+def test_migration_adds_normalized_keys_to_legacy_rows(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "legacy_keys.db")
+    monkeypatch.setattr(settings, "db_path", db_path)
+    create_stage("Incubación", 2)
+    stage = list_stages()[0]
+    create_step(stage.id, "Medir", "...", ["Termómetro digital"], None)
+    with get_conn() as conn:
+        # Simula filas escritas antes de la columna `tool_key`.
+        conn.execute("UPDATE step_tools SET tool_key = ''")
+
+    init_db(db_path)
+
+    with get_conn() as conn:
+        assert conn.execute("SELECT tool_key FROM step_tools").fetchone()[0] == "termometro digital"
+    assert [found.id for found in list_stages_with_tool("Termo")] == [stage.id]
+
+
+def test_triggers_work_from_plain_sqlite_connections(tmp_path, monkeypatch):
+    db_path = str(tmp_path / "plain.db")
+    monkeypatch.setattr(settings, "db_path", db_path)
+    create_stage("Incubación", 2)
+    stage = list_stages()[0]
+    create_kit(Kit(name="Kit Ostra", description="...", price=10, components_json=["Rociador"]))
+
+    # Conexión sin nada registrado por la app (CLI, backups, scripts externos).
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute(
+            "INSERT INTO tutorial_steps (stage_id, title, content, tools_json) VALUES (?, 'Medir', '...', ?)",
+            (stage.id, '[" ÚLTIMO Termómetro "]'),
+        )
+        conn.execute("UPDATE kits SET components_json = ?", ('["Spawn Ñame"]',))
+        keys = [row[0] for row in conn.execute("SELECT tool_key FROM step_tools UNION ALL SELECT component_key FROM kit_components")]
+    conn.close()
+
+    assert keys == [fold_key(" ÚLTIMO Termómetro "), fold_key("Spawn Ñame")] == ["ultimo termometro", "spawn name"]
+    assert [found.id for found in list_stages_with_tool("último TERMÓ")] == [stage.id]
+    assert [kit.name for kit in list_kits_with_component("SPAWN ñ")] == ["Kit Ostra"]
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+from app import metrics
+from app.config import settings
+from app.main import app
+from app.metrics import BufferedCounter, Counter, generate_latest
+
+client = TestClient(app)
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_metrics_exposes_route_sqlite_and_resolver_series(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "metrics_dir", str(tmp_path))
+
+    assert client.get("/stages").status_code == 200
+    assert client.get("/stages").status_code == 200
+    resp = client.get("/metrics")
+
+    assert resp.status_code == 200
+    body = resp.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/stages",status="200"} 2' in body
+    assert 'http_request_duration_seconds_bucket{le="+Inf",method="GET",route="/stages",status="200"} 2' in body
+    assert 'sqlite_query_duration_seconds_count{statement="SELECT"}' in body
+    assert "http_requests_in_flight 1" in body
+    assert "image_resolver_cache_hit_ratio" in body
+
+
+def test_counters_are_merged_across_processes(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "metrics_dir", str(tmp_path))
+    counter = Counter("test_merge_total", "Contador de prueba.")
+    counter.inc(2, kind="a")
+
+    script = (
+        "from app.config import settings; from app.metrics import IMAGE_GENERATION_JOBS; "
+        f"settings.metrics_dir = {str(tmp_path)!r}; IMAGE_GENERATION_JOBS.inc(3, status='generated')"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+    counter.inc(1, kind="a")
+
+    body = generate_latest()
+    assert 'test_merge_total{kind="a"} 3' in body
+    assert 'image_generation_jobs_total{status="generated"} 3' in body
+    # El archivo del proceso que terminó se suma al de este worker y se borra.
+    assert len(list(tmp_path.glob("counter_*.db"))) == 1
+    assert 'image_generation_jobs_total{status="generated"} 3' in generate_latest()
+
+
+def test_buffered_counter_writes_once_per_flush(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "metrics_dir", str(tmp_path))
+    counter = BufferedCounter("test_buffered_total", "Contador de prueba.")
+    metrics.flush_buffered()
+    writes: list[list] = []
+    original_add = metrics._store.add
+    monkeypatch.setattr(metrics._store, "add", lambda kind, items: (writes.append(items), original_add(kind, items)))
+
+    for _ in range(10):
+        counter.inc(result="hit")
+    counter.inc(result="miss")
+    assert writes == []
+
+    assert 'test_buffered_total{result="hit"} 10' in generate_latest()
+    assert len(writes) == 1
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import threading
+
+from fastapi.testclient import TestClient
+
+from app import profiling
+from app.config import settings
+from app.main import app
+
+client = TestClient(app)
+
+
+def test_profile_flag_requires_configured_token(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profiles_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_token", "")
+
+    resp = client.get("/stages", headers={"X-Profile": "anything"})
+
+    assert resp.status_code == 200
+    assert "x-profile-id" not in resp.headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiled_request_is_stored_and_browsable(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profiles_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_token", "s3cret")
+
+    resp = client.get("/stages?_profile=s3cret")
+    assert resp.status_code == 200
+    profile_id = resp.headers["x-profile-id"]
+    assert (tmp_path / f"{profile_id}.prof").exists()
+
+    listing = client.get("/admin/profiles")
+    assert profile_id in listing.text
+    assert "s3cret" not in listing.text
+
+    detail = client.get(f"/admin/profiles/{profile_id}")
+    assert detail.status_code == 200
+    assert "list_stages" in detail.text
+    assert client.get("/admin/profiles/not-a-profile").status_code == 404
+
+
+def test_overlapping_profiled_request_gets_409(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profiles_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_token", "s3cret")
+
+    with profiling._profile_lock:
+        busy = client.get("/stages?_profile=s3cret")
+    assert busy.status_code == 409
+    assert list(tmp_path.iterdir()) == []
+
+    assert client.get("/stages?_profile=s3cret").status_code == 200
+
+
+def test_profile_is_saved_off_the_event_loop(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "profiles_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "profiling_token", "s3cret")
+    threads = []
+    original = profiling.save_profile
+
+    def recording_save(*args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(profiling, "save_profile", recording_save)
+
+    assert client.get("/stages?_profile=s3cret").status_code == 200
+    assert len(threads) == 1 and threads[0].startswith("static-io")
+
+
+def test_pool_calls_outside_the_profiled_request_are_not_collected():
+    assert profiling._thread_profiles.get() is None
+    assert profiling.profiled_call(sum, [1, 2]) == 3
+
+    collected = []
+    token = profiling._thread_profiles.set(collected)
+    try:
+        assert profiling.profiled_call(sum, [1, 2]) == 3
+    finally:
+        profiling._thread_profiles.reset(token)
+    assert len(collected) == 1
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import inspect
+import sqlite3
+
+import pytest
+
+import app.db as db
+from app import repositories as repo
+from app.config import settings
+from scripts.seed_large import CatalogSpec, seed_catalog
+
+# Funciones de lectura del repositorio: toda consulta nueva tiene que entrar en `_exercise`.
+READ_PREFIXES = ("list_", "get_", "search_", "products_for_", "suggestion_", "catalog_")
+# Consultas que emite SQLite por su cuenta (schema al iniciar, configuración de FTS5).
+INTERNAL_MARKERS = ("sqlite_master", "'main'.")
+
+
+def _exercise() -> set[str]:
+    stages = repo.list_stages()
+    stage_ids = [stage.id for stage in stages[:3]]
+    products = repo.list_products()
+    calls = {
+        "list_stages": lambda: None,
+        "list_stages_page": lambda: (repo.list_stages_page(), repo.list_stages_page((1, stage_ids[0]), 10)),
+        "get_stage": lambda: repo.get_stage(stage_ids[0]),
+        "list_steps_by_stage": lambda: repo.list_steps_by_stage(stage_ids[0]),
+        "get_stages_with_steps": lambda: (repo.get_stages_with_steps(stage_ids), repo.get_stages_with_steps(stage_ids, False)),
+        "list_products": lambda: None,
+        "list_products_page": lambda: (repo.list_products_page(), repo.list_products_page(repo.keyset_values(products[0], repo.PRODUCT_ORDER), 10)),
+        "get_product": lambda: repo.get_product(products[0].id),
+        "list_kits": repo.list_kits,
+        "get_kit": lambda: repo.get_kit(1),
+        "list_kits_page": lambda: (repo.list_kits_page(), repo.list_kits_page(("Kit", 1), 10)),
+        "catalog_version": repo.catalog_version,
+        "search_catalog": lambda: repo.search_catalog("sustrato"),
+        "suggestion_sources": repo.suggestion_sources,
+        "list_distinct_tools": repo.list_distinct_tools,
+        "products_for_tool_slugs": lambda: repo.products_for_tool_slugs(["termometro", "balde"]),
+        "list_stages_with_tool": lambda: repo.list_stages_with_tool("higró"),
+        "list_kits_with_component": lambda: repo.list_kits_with_component("spawn"),
+        "list_changes": lambda: repo.list_changes(100, 50),
+    }
+    for call in calls.values():
+        call()
+    return set(calls)
+
+
+def _bad_steps(plan: list[str]) -> list[str]:
+    bad = []
+    for step in plan:
+        full_scan = step.startswith("SCAN ") and "INDEX" not in step and "VIRTUAL TABLE" not in step
+        if full_scan or "TEMP B-TREE" in step:
+            bad.append(step)
+    return bad
+
+
+@pytest.fixture(scope="module")
+def captured_sql(tmp_path_factory):
+    db_path = str(tmp_path_factory.mktemp("plans") / "plans.db")
+    statements: list[str] = []
+    original_connect = db._connect
+
+    def tracing_connect(path: str) -> sqlite3.Connection:
+        conn = original_connect(path)
+        # El callback recibe el SQL con los parámetros ya expandidos: el plan es el de la consulta real.
+        conn.set_trace_callback(statements.append)
+        return conn
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "db_path", db_path)
+        seed_catalog(CatalogSpec(stages=100, steps=4_000, products=5_000, kits=500, seed=11))
+        mp.setattr(db, "_connect", tracing_connect)
+        exercised = _exercise()
+    return db_path, exercised, list(dict.fromkeys(statements))
+
+
+def test_every_repository_read_is_exercised(captured_sql):
+    _, exercised, _ = captured_sql
+    readers = {
+        name
+        for name, func in inspect.getmembers(repo, inspect.isfunction)
+        if func.__module__ == repo.__name__ and name.startswith(READ_PREFIXES)
+    }
+    assert readers - exercised == set()
+
+
+def test_repository_queries_use_indexes(captured_sql):
+    db_path, _, statements = captured_sql
+    selects = [
+        sql
+        for sql in statements
+        if sql.lstrip().upper().startswith(("SELECT", "WITH")) and not any(marker in sql for marker in INTERNAL_MARKERS)
+    ]
+    assert len(selects) >= 20
+
+    conn = sqlite3.connect(db_path)
+    try:
+        failures = {}
+        for sql in selects:
+            plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}")]
+            if _bad_steps(plan):
+                failures[" ".join(sql.split())] = plan
+    finally:
+        conn.close()
+    assert failures == {}
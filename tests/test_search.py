@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.models import Product
+from app.repositories import create_product, create_stage, create_step, fts_query, list_stages
+
+client = TestClient(app)
+
+
+def _use_db(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "search.db"))
+
+
+def test_fts_query_quotes_terms_and_prefixes_last():
+    assert fts_query('pasteuriz "agua" OR') == '"pasteuriz" "agua" "OR"*'
+    assert fts_query("  ¿? ") is None
+
+
+def test_search_is_accent_insensitive_and_tracks_writes(tmp_path, monkeypatch):
+    _use_db(tmp_path, monkeypatch)
+    create_stage("Preparación", 1)
+    stage_id = list_stages()[0].id
+    create_step(stage_id, "Pasteurización del sustrato", "Mantener <80°C> durante una hora.", ["olla"], 5.0)
+    create_product(Product(name="Termómetro", category="Medición", price=10, affiliate_url="https://example.com"))
+
+    payload = client.get("/api/search?q=pasteurizacion").json()
+    assert [hit["kind"] for hit in payload["results"]] == ["step"]
+    hit = payload["results"][0]
+    assert hit["title"] == "<mark>Pasteurización</mark> del sustrato"
+    assert hit["url"] == f"/stages/{stage_id}"
+
+    assert client.get("/api/search?q=termo&kind=product").json()["results"][0]["title"] == "<mark>Termómetro</mark>"
+    assert client.get("/api/search?q=termo&kind=kit").json()["results"] == []
+    assert client.get("/api/search?q=x&kind=nope").status_code == 400
+
+    page = client.get("/search?q=80")
+    assert page.status_code == 200
+    assert "&lt;<mark>80</mark>" in page.text
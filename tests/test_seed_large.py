@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import sqlite3
+
+from app.services.image_resolver import entity_slot
+from scripts.seed_large import CatalogSpec, seed_catalog, write_mock_images
+
+
+def _counts(db_path: str) -> dict[str, int]:
+    with sqlite3.connect(db_path) as conn:
+        return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("stages", "tutorial_steps", "products", "kits")}
+
+
+def test_seed_catalog_is_reproducible(tmp_path):
+    spec = CatalogSpec(stages=5, steps=40, products=60, kits=7, seed=7)
+    db_path = str(tmp_path / "large.db")
+
+    result, rows = seed_catalog(spec, db_path=db_path)
+    _, again = seed_catalog(spec, db_path=db_path)
+
+    assert result.counts == {"stages": 5, "tutorial_steps": 40, "products": 60, "kits": 7}
+    assert _counts(db_path) == result.counts
+    assert rows == again
+
+
+def test_mock_images_follow_resolver_slots(tmp_path):
+    spec = CatalogSpec(stages=2, steps=3, products=4, kits=1, seed=1)
+    _, rows = seed_catalog(spec, db_path=str(tmp_path / "large.db"))
+
+    written = write_mock_images(rows, tmp_path / "generated", ratio=1.0, seed=1)
+
+    assert written == 2 * 3 + 3 + 4 + 2
+    stage_id, stage_name = rows["stages"][0][:2]
+    assert (tmp_path / "generated" / "stages" / f"{entity_slot('stage', stage_id, stage_name)}-card-1" / "md.webp").exists()
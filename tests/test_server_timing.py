@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.timing import server_timing_header
+
+client = TestClient(app)
+
+
+def test_sampled_request_reports_phases(monkeypatch):
+    monkeypatch.setattr(settings, "server_timing_sample_rate", 1.0)
+
+    resp = client.get("/stages")
+
+    assert resp.status_code == 200
+    header = resp.headers["server-timing"]
+    assert "db;dur=" in header
+    assert "render;dur=" in header
+    assert "total;dur=" in header
+
+
+def test_unsampled_request_has_no_header(monkeypatch):
+    monkeypatch.setattr(settings, "server_timing_sample_rate", 0.0)
+
+    resp = client.get("/health")
+
+    assert "server-timing" not in resp.headers
+
+
+def test_server_timing_header_format():
+    header = server_timing_header({"db": [0.0015, 2]}, 0.004)
+    assert header == 'db;dur=1.50;desc="SQLite x2", total;dur=4.00'
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.db import get_conn
+from app.main import app
+from app.repositories import create_stage, create_step, get_stage, list_stages, replace_steps
+
+client = TestClient(app)
+
+
+def _summary(stage_id: int) -> tuple[int, float]:
+    stage = get_stage(stage_id)
+    return stage.step_count, stage.total_cost_usd
+
+
+def test_summary_tracks_step_writes(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "summary.db"))
+    create_stage("Preparación", 1)
+    create_stage("Incubación", 2)
+    first, second = (stage.id for stage in list_stages())
+    assert _summary(first) == (0, 0)
+
+    step_id = create_step(first, "Hidratar", "...", [], 10.5)
+    create_step(first, "Pasteurizar", "...", [], None)
+    create_step(first, "Escurrir", "...", [], 4.25)
+    assert _summary(first) == (3, 14.75)
+
+    with get_conn() as conn:
+        conn.execute("UPDATE tutorial_steps SET estimated_cost_usd = 2, stage_id = ? WHERE id = ?", (second, step_id))
+    assert _summary(first) == (2, 4.25)
+    assert _summary(second) == (1, 2.0)
+
+    replace_steps(first, [{"title": "Único", "content": "...", "tools": [], "estimated_cost_usd": 1}])
+    assert _summary(first) == (1, 1.0)
+
+    with get_conn() as conn:
+        conn.execute("DELETE FROM stages WHERE id = ?", (second,))
+        assert conn.execute("SELECT COUNT(*) FROM stage_summary WHERE stage_id = ?", (second,)).fetchone()[0] == 0
+
+    rows = client.get("/api/stages?fields=id,step_count,total_cost_usd").json()
+    assert rows == [{"id": first, "step_count": 1, "total_cost_usd": 1.0}]
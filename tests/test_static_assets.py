@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import app.static_files as static_files
+import scripts.build_assets as build_assets
+
+
+def _static_tree(tmp_path, monkeypatch):
+    static_root = tmp_path / "static"
+    (static_root / "css").mkdir(parents=True)
+    (static_root / "css" / "styles.css").write_text("body { color: #333; }\n" * 40, encoding="utf-8")
+    (static_root / "img").mkdir()
+    (static_root / "img" / "logo.png").write_bytes(b"\x89PNG fake")
+    monkeypatch.setattr(build_assets, "STATIC_ROOT", static_root)
+    monkeypatch.setattr(build_assets, "DIST_ROOT", static_root / "dist")
+    monkeypatch.setattr(build_assets, "MANIFEST_PATH", static_root / "dist" / "manifest.json")
+    return static_root
+
+
+def test_build_writes_hashed_assets_and_manifest(tmp_path, monkeypatch):
+    static_root = _static_tree(tmp_path, monkeypatch)
+
+    result = build_assets.build()
+
+    hashed_css = result.assets["css/styles.css"]
+    assert hashed_css.startswith("dist/css/styles.") and hashed_css.endswith(".css")
+    assert (static_root / f"{hashed_css}.gz").exists()
+    assert not (static_root / f"{result.assets['img/logo.png']}.gz").exists()
+    manifest = json.loads((static_root / "dist" / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["assets"]["css/styles.css"] == hashed_css
+
+    (static_root / "css" / "styles.css").write_text("body { color: red; }\n", encoding="utf-8")
+    rebuilt = build_assets.build()
+    assert rebuilt.assets["css/styles.css"] != hashed_css
+    assert hashed_css in rebuilt.removed
+
+
+def test_static_handler_negotiates_encoding_and_immutable_cache(tmp_path, monkeypatch):
+    static_root = _static_tree(tmp_path, monkeypatch)
+    hashed_css = build_assets.build().assets["css/styles.css"]
+
+    app = FastAPI()
+    app.mount("/static", static_files.PrecompressedStaticFiles(directory=str(static_root)), name="static")
+    client = TestClient(app)
+
+    resp = client.get(f"/static/{hashed_css}", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "gzip"
+    assert resp.headers["cache-control"] == static_files.IMMUTABLE_CACHE_CONTROL
+    assert resp.headers["content-type"].startswith("text/css")
+    assert "Accept-Encoding" in resp.headers["vary"]
+    assert "color: #333" in resp.text
+
+    plain = client.get(f"/static/{hashed_css}", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    original = client.get("/static/css/styles.css", headers={"Accept-Encoding": "gzip"})
+    assert "immutable" not in original.headers.get("cache-control", "")
+    assert original.status_code == 200
+
+
+def test_hashed_asset_path_uses_manifest(tmp_path, monkeypatch):
+    manifest = tmp_path / "manifest.json"
+    manifest.write_text(json.dumps({"assets": {"css/styles.css": "dist/css/styles.abc123.css"}}), encoding="utf-8")
+    monkeypatch.setattr(static_files, "ASSET_MANIFEST_PATH", manifest)
+
+    assert static_files.hashed_asset_path("css/styles.css") == "dist/css/styles.abc123.css"
+    assert static_files.hashed_asset_path("js/app.js") == "js/app.js"
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.models import Product
+from app.repositories import create_product, create_stage, create_step, list_stages
+from app import suggest
+from app.suggest import PrefixIndex, suggest_index
+
+client = TestClient(app)
+
+
+def test_prefix_index_prefers_label_start_and_ignores_accents():
+    index = PrefixIndex(
+        [
+            ("Termómetro digital", "product"),
+            ("Medir con termómetro", "step"),
+            ("Termómetro", "tool"),
+            ("Termómetro", "tool"),
+            ("Balde", "tool"),
+        ]
+    )
+
+    labels = [item["label"] for item in index.complete("TERMO", 10)]
+    assert labels == ["Termómetro", "Termómetro digital", "Medir con termómetro"]
+    assert index.complete("termometro d", 10) == [{"label": "Termómetro digital", "kind": "product"}]
+    assert index.complete("x", 10) == []
+    assert index.memory_bytes() > 0
+
+
+def test_suggest_endpoint_rebuilds_after_catalog_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "suggest.db"))
+    monkeypatch.setattr(settings, "suggest_recheck_ms", 0)
+    create_stage("Inoculación", 1)
+    create_step(list_stages()[0].id, "Hidratar paja", "...", ["Rociador"], None)
+
+    assert client.get("/api/suggest?q=roc").json()["suggestions"] == [{"label": "Rociador", "kind": "tool"}]
+    assert client.get("/api/suggest?q=hum").json()["suggestions"] == []
+
+    create_product(Product(name="Humidificador ultrasónico", category="Control", price=30, affiliate_url="https://example.com"))
+    # El pedido que detecta el cambio todavía responde con el índice anterior; el nuevo se arma en segundo plano.
+    assert client.get("/api/suggest?q=hum").json()["suggestions"] == []
+    suggest_index.wait(5)
+    assert client.get("/api/suggest?q=hum").json()["suggestions"] == [{"label": "Humidificador ultrasónico", "kind": "product"}]
+
+
+def test_suggest_rechecks_catalog_version_at_most_once_per_window(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "throttle.db"))
+    monkeypatch.setattr(settings, "suggest_recheck_ms", 60_000)
+    create_stage("Fructificación", 1)
+    calls = []
+    original = suggest.catalog_version
+
+    def counting_version():
+        calls.append(1)
+        return original()
+
+    monkeypatch.setattr(suggest, "catalog_version", counting_version)
+
+    for _ in range(5):
+        assert client.get("/api/suggest?q=fru").status_code == 200
+    assert len(calls) == 1
+    assert suggest_index.fresh() is not None
+
+    monkeypatch.setattr(settings, "suggest_recheck_ms", 0)
+    assert suggest_index.fresh() is None
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import app.templating as templating
+from app.config import settings
+
+
+def test_production_templates_are_precompiled_with_bytecode_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "jinja"
+    monkeypatch.setattr(settings, "app_env", "production")
+    monkeypatch.setattr(settings, "template_cache_dir", str(cache_dir))
+
+    templates = templating._build_templates()
+
+    assert templates.env.auto_reload is False
+    assert len(templates.env.cache) == len(templates.env.list_templates(extensions=["html"]))
+    assert len(list(cache_dir.glob("__jinja2_*.cache"))) >= 8
+
+
+def test_development_templates_keep_auto_reload(monkeypatch):
+    monkeypatch.setattr(settings, "app_env", "development")
+
+    templates = templating._build_templates()
+
+    assert templates.env.auto_reload is True
+    assert templates.env.bytecode_cache is None
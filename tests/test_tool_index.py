@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.models import Product
+from app.repositories import create_product, create_stage, create_step, list_stages
+from app.services.tool_index import build_tool_product_rows, rebuild_tool_index
+
+client = TestClient(app)
+
+
+def _product(product_id: int, name: str, price: float = 10) -> Product:
+    return Product(id=product_id, name=name, category="Control", price=price, affiliate_url="https://example.com")
+
+
+def test_rows_match_by_token_overlap_and_rank_specific_names_first():
+    products = [
+        _product(1, "Termómetro digital con sonda", 20),
+        _product(2, "Termómetro digital", 15),
+        _product(3, "Bolsas con filtro x50"),
+        _product(4, "Alcohol isopropílico"),
+        _product(5, "Higrómetro"),
+    ]
+    rows = build_tool_product_rows(["Termómetro", "Bolsas con filtro", "Alcohol 70%", "Estantería", "termometro"], products)
+
+    assert rows == [
+        ("termometro", 2, 1.0, 0),
+        ("termometro", 1, 1.0, 1),
+        ("bolsas-con-filtro", 3, 1.0, 0),
+        ("alcohol-70", 4, 0.5, 0),
+    ]
+
+
+def test_stage_detail_links_step_tools_to_products(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "tools.db"))
+    create_stage("Pasteurización", 1)
+    stage_id = list_stages()[0].id
+    create_step(stage_id, "Controlar temperatura", "...", ["Termómetro", "Olla"], None)
+    create_product(Product(name="Termómetro digital", category="Control", price=12.5, affiliate_url="https://example.com"))
+
+    assert rebuild_tool_index() == {"tools": 2, "tools_matched": 1, "links": 1}
+    html = client.get(f"/stages/{stage_id}").text
+    assert "Termómetro digital</a> (USD 12.50)" in html
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import time
+
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.main import app
+from app.warmup import state
+
+
+def test_ready_is_503_before_warmup(monkeypatch):
+    monkeypatch.setattr(state, "ready", False)
+
+    resp = TestClient(app).get("/ready")
+
+    assert resp.status_code == 503
+    assert resp.json()["ready"] is False
+
+
+def test_lifespan_warmup_marks_worker_ready(monkeypatch):
+    monkeypatch.setattr(settings, "warmup_enabled", True)
+    monkeypatch.setattr(state, "ready", False)
+
+    with TestClient(app) as client:
+        deadline = time.time() + 20
+        resp = client.get("/ready")
+        while resp.status_code != 200 and time.time() < deadline:
+            time.sleep(0.05)
+            resp = client.get("/ready")
+
+    assert resp.status_code == 200
+    payload = resp.json()
+    assert payload["errors"] == []
+    assert set(payload["steps_ms"]) == {"catalog", "suggest", "templates", "render"}